@@ -0,0 +1,96 @@
+"""
+user-029: totalling the price of a 50k droplet inventory per region and per tag, columnar against a python loop.
+
+The droplets come from DropletManager.retrieve_all_droplets(lazy=True, shared_payloads=True), as
+retrieve_droplet_columns lists them, with the listing itself replaced by synthetic records. Times building
+the columns (the size join included) and the totals separately, best of five runs. Building the droplets is not timed.
+One size slug in four is missing from the catalog, so those totals are NaN in both versions.
+
+    python benchmarks/bench_inventory_columns.py
+"""
+import time
+
+from syntheticinventory import SIZE, droplet_records
+from cloudapi_digitalocean.digitaloceanobjects.droplet import DropletManager
+from cloudapi_digitalocean.digitaloceanobjects.inventorycolumns import droplet_columns
+from cloudapi_digitalocean.digitaloceanobjects.size import Size, SizeAttributes
+
+SIZE_SLUGS = ["s-1vcpu-1gb", "s-2vcpu-2gb", "s-4vcpu-8gb", "s-8vcpu-16gb"]
+REGIONS = ["nyc3", "ams3", "fra1", "sgp1", "sfo3"]
+TAGS = [["web", "production"], ["web", "staging"], ["worker", "production"], ["db"]]
+
+
+def droplets(count):
+    records = droplet_records(count)
+    for n, record in enumerate(records):
+        record["size_slug"] = SIZE_SLUGS[n % len(SIZE_SLUGS)]
+        record["region"] = dict(record["region"], slug=REGIONS[n % len(REGIONS)])
+        record["tags"] = TAGS[n % len(TAGS)]
+    manager = DropletManager()
+    manager.retrieve_all_droplet_records = lambda: records
+    return manager.retrieve_all_droplets(lazy=True, shared_payloads=True)
+
+
+def sizes():
+    catalog = []
+    # The last slug is left out of the catalog.
+    for n, slug in enumerate(SIZE_SLUGS[:-1]):
+        size = Size()
+        size.attributes = SizeAttributes(
+            **dict(SIZE, slug=slug, price_monthly=SIZE["price_monthly"] * 2 ** n)
+        )
+        catalog.append(size)
+    return catalog
+
+
+def build_columns(droplet_list, size_list):
+    return droplet_columns(droplet_list, size_list)
+
+
+def columnar_totals(columns):
+    return (
+        columns.group_totals("region", ["vcpus", "memory", "price_monthly"]),
+        columns.group_totals("tags", ["vcpus", "memory", "price_monthly"]),
+    )
+
+
+def python_loop(droplet_list, size_list):
+    prices = {size.attributes.slug: size.attributes.price_monthly for size in size_list}
+    by_region, by_tag = {}, {}
+    for droplet in droplet_list:
+        attributes = droplet.attributes
+        price = prices.get(attributes.size_slug, float("nan"))
+        groups = [by_region.setdefault(attributes.region["slug"], [0, 0, 0.0])]
+        groups.extend(by_tag.setdefault(tag, [0, 0, 0.0]) for tag in attributes.tags)
+        for totals in groups:
+            totals[0] += attributes.vcpus
+            totals[1] += attributes.memory
+            totals[2] += price
+    return by_region, by_tag
+
+
+def best_seconds(run, *args, runs=5):
+    best = None
+    for _ in range(runs):
+        started_at = time.perf_counter()
+        run(*args)
+        seconds = time.perf_counter() - started_at
+        best = seconds if best is None else min(best, seconds)
+    return best
+
+
+def main():
+    droplet_list = droplets(50000)
+    size_list = sizes()
+    loop_seconds = best_seconds(python_loop, droplet_list, size_list)
+    build_seconds = best_seconds(build_columns, droplet_list, size_list)
+    columns = build_columns(droplet_list, size_list)
+    totals_seconds = best_seconds(columnar_totals, columns)
+    print(
+        f"50000 droplets, totals per region and per tag: python loop {loop_seconds:.3f}s, "
+        f"columnar build {build_seconds:.3f}s + totals {totals_seconds:.4f}s"
+    )
+
+
+if __name__ == "__main__":
+    main()
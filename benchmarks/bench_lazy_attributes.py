@@ -0,0 +1,78 @@
+"""
+user-028: building a 10k droplet listing eagerly against LazyDropletAttributes, reading a few fields of each droplet.
+
+Times building the attributes and reading id, name, status, tags and networks, best of five runs.
+Then times the same through DropletManager.retrieve_all_droplets, with the listing itself replaced by the
+synthetic records, so the Droplet() construction of each droplet is included.
+Building the records is not timed.
+
+    python benchmarks/bench_lazy_attributes.py
+"""
+import time
+
+from syntheticinventory import copies, droplet_records
+from cloudapi_digitalocean.common.payloadinterning import intern_fields
+from cloudapi_digitalocean.digitaloceanobjects.droplet import (
+    DropletAttributes,
+    DropletManager,
+    INTERNED_DROPLET_FIELDS,
+    LazyDropletAttributes,
+)
+
+
+def eager(record, shared_payloads):
+    return DropletAttributes(**intern_fields(record, INTERNED_DROPLET_FIELDS, shared_payloads))
+
+
+def lazy(record, shared_payloads):
+    return LazyDropletAttributes(record, shared_payloads=shared_payloads)
+
+
+def best_seconds(build, records, shared_payloads, runs=5):
+    best = None
+    for _ in range(runs):
+        fresh = copies(records)
+        started_at = time.perf_counter()
+        for record in fresh:
+            attributes = build(record, shared_payloads)
+            (attributes.id, attributes.name, attributes.status, attributes.tags, attributes.networks)
+        seconds = time.perf_counter() - started_at
+        best = seconds if best is None else min(best, seconds)
+    return best
+
+
+def best_listing_seconds(lazy, records, shared_payloads, runs=5):
+    best = None
+    manager = DropletManager()
+    for _ in range(runs):
+        fresh = copies(records)
+        manager.retrieve_all_droplet_records = lambda: fresh
+        started_at = time.perf_counter()
+        for droplet in manager.retrieve_all_droplets(lazy=lazy, shared_payloads=shared_payloads):
+            attributes = droplet.attributes
+            (attributes.id, attributes.name, attributes.status, attributes.tags, attributes.networks)
+        seconds = time.perf_counter() - started_at
+        best = seconds if best is None else min(best, seconds)
+    return best
+
+
+def main():
+    records = droplet_records(10000)
+    for shared_payloads in [False, True]:
+        eager_seconds = best_seconds(eager, records, shared_payloads)
+        lazy_seconds = best_seconds(lazy, records, shared_payloads)
+        print(
+            f"10000 droplets, shared_payloads={shared_payloads}: "
+            f"eager {eager_seconds:.3f}s, lazy {lazy_seconds:.3f}s"
+        )
+    for shared_payloads in [False, True]:
+        eager_seconds = best_listing_seconds(False, records, shared_payloads)
+        lazy_seconds = best_listing_seconds(True, records, shared_payloads)
+        print(
+            f"10000 droplets through retrieve_all_droplets, shared_payloads={shared_payloads}: "
+            f"eager {eager_seconds:.3f}s, lazy {lazy_seconds:.3f}s"
+        )
+
+
+if __name__ == "__main__":
+    main()
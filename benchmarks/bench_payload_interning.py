@@ -0,0 +1,41 @@
+"""
+user-027: memory of a 10k droplet listing with and without shared payloads.
+
+Measures everything the listing keeps alive, the decoded records and their DropletAttributes.
+
+    python benchmarks/bench_payload_interning.py
+"""
+import tracemalloc
+
+from syntheticinventory import droplet_records
+from cloudapi_digitalocean.common.payloadinterning import intern_fields
+from cloudapi_digitalocean.digitaloceanobjects.droplet import (
+    DropletAttributes,
+    INTERNED_DROPLET_FIELDS,
+)
+
+
+def listing_megabytes(count, shared_payloads):
+    tracemalloc.start()
+    attributes = [
+        DropletAttributes(**intern_fields(record, INTERNED_DROPLET_FIELDS, shared_payloads))
+        for record in droplet_records(count)
+    ]
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del attributes
+    return current / 1024 / 1024
+
+
+def main():
+    count = 10000
+    separate = listing_megabytes(count, shared_payloads=False)
+    shared = listing_megabytes(count, shared_payloads=True)
+    print(
+        f"{count} droplets: shared_payloads=False {separate:.1f} MB, "
+        f"shared_payloads=True {shared:.1f} MB, {100 * (separate - shared) / separate:.0f}% less"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+user-026: memory of plain @dataclass attributes against slotted_dataclass attributes.
+
+Only the attributes objects are measured, the field values are the same objects in both runs.
+
+    python benchmarks/bench_slotted_attributes.py
+"""
+from dataclasses import MISSING, field, fields, make_dataclass
+import tracemalloc
+
+from syntheticinventory import action_records, droplet_records
+from cloudapi_digitalocean.digitaloceanobjects.action import ActionAttributes
+from cloudapi_digitalocean.digitaloceanobjects.droplet import DropletAttributes
+
+
+def plain_dataclass(cls):
+    """
+    The same fields as a slotted attributes class, as the plain @dataclass it was before user-026.
+    """
+    plain_fields = []
+    for f in fields(cls):
+        if not f.default_factory is MISSING:
+            plain_fields.append((f.name, f.type, field(default_factory=f.default_factory)))
+        else:
+            plain_fields.append((f.name, f.type, field(default=f.default)))
+    return make_dataclass(f"Plain{cls.__name__}", plain_fields)
+
+
+def bytes_per_record(cls, records):
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    instances = [cls(**record) for record in records]
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    allocated = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    del instances
+    return allocated / len(records)
+
+
+def main():
+    for name, cls, records in [
+        ("ActionAttributes, 100k actions", ActionAttributes, action_records(100000)),
+        ("DropletAttributes, 10k droplets", DropletAttributes, droplet_records(10000)),
+    ]:
+        plain = bytes_per_record(plain_dataclass(cls), records)
+        slotted = bytes_per_record(cls, records)
+        print(
+            f"{name}: plain {plain:.0f} B/record, slotted {slotted:.0f} B/record, "
+            f"{100 * (plain - slotted) / plain:.0f}% less"
+        )
+
+
+if __name__ == "__main__":
+    main()
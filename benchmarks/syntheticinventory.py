@@ -0,0 +1,128 @@
+"""
+Synthetic api records for the benchmarks, shaped like the digitalocean api responses.
+Every run builds the same records, so results are comparable between runs.
+"""
+import copy
+import json
+import os
+import random
+import sys
+
+# The benchmarks run from a checkout, not an installed package.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Building the api connection objects only needs a token to be set, no request is sent.
+os.environ.setdefault("DIGITALOCEAN_ACCESS_TOKEN", "benchmark")
+
+REGION = {
+    "name": "New York 3",
+    "slug": "nyc3",
+    "features": ["backups", "ipv6", "metadata", "install_agent", "storage", "image_transfer"],
+    "available": True,
+    "sizes": [f"s-{n}vcpu-{n * 2}gb" for n in range(1, 100)],
+}
+SIZE = {
+    "slug": "s-1vcpu-1gb",
+    "memory": 1024,
+    "vcpus": 1,
+    "disk": 25,
+    "transfer": 1.0,
+    "price_monthly": 5.0,
+    "price_hourly": 0.00743999984115362,
+    "regions": ["ams3", "blr1", "fra1", "lon1", "nyc1", "nyc3", "sfo3", "sgp1", "syd1", "tor1"],
+    "available": True,
+    "description": "Basic",
+}
+IMAGE = {
+    "id": 106569146,
+    "name": "22.04 (LTS) x64",
+    "distribution": "Ubuntu",
+    "slug": "ubuntu-22-04-x64",
+    "public": True,
+    "regions": ["ams3", "blr1", "fra1", "lon1", "nyc1", "nyc3", "sfo3", "sgp1", "syd1", "tor1"],
+    "created_at": "2022-04-21T15:34:56Z",
+    "type": "base",
+    "min_disk_size": 7,
+    "size_gigabytes": 0.51,
+    "description": "Ubuntu 22.04 x64",
+    "tags": [],
+    "status": "available",
+}
+
+
+def droplet_records(count, seed=26):
+    """
+    Returns count droplet records as a listing decodes them, every record its own dicts and lists.
+    """
+    generator = random.Random(seed)
+    template = {
+        "memory": 1024,
+        "vcpus": 1,
+        "disk": 25,
+        "locked": False,
+        "status": "active",
+        "kernel": None,
+        "created_at": "2024-01-01T00:00:00Z",
+        "features": ["monitoring", "droplet_agent", "private_networking"],
+        "backup_ids": [],
+        "next_backup_window": None,
+        "snapshot_ids": [],
+        "image": IMAGE,
+        "volume_ids": [],
+        "size": SIZE,
+        "size_slug": "s-1vcpu-1gb",
+        "region": REGION,
+        "tags": ["web", "production"],
+        "vpc_uuid": "5a4981aa-9653-4bd1-bef5-d6bff52042e4",
+    }
+    # A json round trip, like a listing, so no two records share any nested object.
+    encoded = json.dumps(template)
+    records = []
+    for n in range(count):
+        record = json.loads(encoded)
+        record["id"] = 300000000 + n
+        record["name"] = f"web-{n}"
+        record["networks"] = {
+            "v4": [
+                {
+                    "ip_address": f"10.{n // 65536 % 256}.{n // 256 % 256}.{n % 256}",
+                    "netmask": "255.255.0.0",
+                    "gateway": "10.0.0.1",
+                    "type": "private",
+                },
+                {
+                    "ip_address": f"104.{generator.randrange(256)}.{generator.randrange(256)}.{generator.randrange(256)}",
+                    "netmask": "255.255.240.0",
+                    "gateway": "104.131.176.1",
+                    "type": "public",
+                },
+            ],
+            "v6": [],
+        }
+        records.append(record)
+    return records
+
+
+def action_records(count):
+    """
+    Returns count finished action records as a listing decodes them.
+    """
+    records = []
+    for n in range(count):
+        records.append(
+            {
+                "id": 1500000000 + n,
+                "status": "completed",
+                "type": ["create", "power_on", "snapshot", "resize"][n % 4],
+                "started_at": "2024-01-01T00:00:00Z",
+                "completed_at": "2024-01-01T00:01:00Z",
+                "resource_id": 300000000 + n % 10000,
+                "resource_type": "droplet",
+                "region": None,
+                "region_slug": "nyc3",
+            }
+        )
+    return records
+
+
+def copies(records):
+    return copy.deepcopy(records)
@@ -15,3 +15,14 @@ from .digitaloceanobjects.account import Account as Account
 from .digitaloceanobjects.account import AccountManager as AccountManager
 from .digitaloceanobjects.sshkey import SSHkey as SSHkey
 from .digitaloceanobjects.sshkey import SSHkeyManager as SSHkeyManager
+from .digitaloceanobjects.inventorycolumns import InventoryColumns as InventoryColumns
+from .digitaloceanobjects.inventorystore import InventoryStore as InventoryStore
+from .digitaloceanobjects.inventorystore import enable_inventory_store as enable_inventory_store
+from .digitaloceanobjects.inventorystore import disable_inventory_store as disable_inventory_store
+from .digitaloceanobjects.actionhistory import ActionHistory as ActionHistory
+from .digitaloceanobjects.dropletpipeline import DropletActionPipeline as DropletActionPipeline
+from .digitaloceanobjects.resourceplan import ResourcePlan as ResourcePlan
+from .digitaloceanobjects.teardown import TeardownPlanner as TeardownPlanner
+from .digitaloceanobjects.reconciler import DropletGroupSpec as DropletGroupSpec
+from .digitaloceanobjects.reconciler import Reconciler as Reconciler
+from .digitaloceanobjects.snapshotretention import SnapshotRetentionPolicy as SnapshotRetentionPolicy
@@ -0,0 +1,43 @@
+import queue
+import threading
+
+
+def run_bounded(function, items: list, max_in_flight=8):
+    """
+    Calls function(item) for every item, with at most max_in_flight calls running at a time.
+    An exception only fails its own item, the others carry on.
+
+    Args:
+        function (callable): Called with one item.
+        items (list): Items to work on.
+        max_in_flight (int, optional): Calls running at the same time. Defaults to 8.
+
+    Returns:
+        list: (result, exception) per item, in the same order, one of the two is None.
+    """
+    items = list(items)
+    outcomes = [None] * len(items)
+    work = queue.Queue()
+    for position, item in enumerate(items):
+        work.put((position, item))
+
+    def worker():
+        while True:
+            try:
+                position, item = work.get_nowait()
+            except queue.Empty:
+                return
+            try:
+                outcomes[position] = (function(item), None)
+            except Exception as error:
+                outcomes[position] = (None, error)
+
+    threads = [
+        threading.Thread(target=worker, args=())
+        for _ in range(max(1, min(max_in_flight, len(items))))
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return outcomes
@@ -43,6 +43,11 @@ class ErrorActionFailed(Exception):
         Exception.__init__(self, *args, **kwargs)
 
 
+class ErrorActionTimeout(Exception):
+    def __init__(self, *args, **kwargs):
+        Exception.__init__(self, *args, **kwargs)
+
+
 class ErrorDropletSlugSizeNotFound(Exception):
     def __init__(self, *args, **kwargs):
         Exception.__init__(self, *args, **kwargs)
@@ -101,3 +106,28 @@ class ErrorFloatingIPDoesNotExists(Exception):
 class ErrorSSHkeyDoesNotExists(Exception):
     def __init__(self, *args, **kwargs):
         Exception.__init__(self, *args, **kwargs)
+
+
+class ErrorTagActionNotSupported(Exception):
+    def __init__(self, *args, **kwargs):
+        Exception.__init__(self, *args, **kwargs)
+
+
+class ErrorPipelineStepNotSupported(Exception):
+    def __init__(self, *args, **kwargs):
+        Exception.__init__(self, *args, **kwargs)
+
+
+class ErrorVolumeSizeOutOfRange(Exception):
+    def __init__(self, *args, **kwargs):
+        Exception.__init__(self, *args, **kwargs)
+
+
+class ErrorVolumeDetachFailed(Exception):
+    def __init__(self, *args, **kwargs):
+        Exception.__init__(self, *args, **kwargs)
+
+
+class ErrorSnapshotTransferNotSupported(Exception):
+    def __init__(self, *args, **kwargs):
+        Exception.__init__(self, *args, **kwargs)
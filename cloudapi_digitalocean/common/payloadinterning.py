@@ -0,0 +1,115 @@
+import json
+import sys
+import threading
+import weakref
+
+
+class FrozenDict(dict):
+    """
+    A dict that can't be changed, used for nested payloads (region, size, image...) shared between many records.
+    It is still a dict, so indexing, comparison and json.dumps behave exactly as before.
+    """
+
+    def _immutable(self, *args, **kwargs):
+        raise TypeError(
+            f"{type(self).__name__} is shared between records and can't be changed, copy it with dict() first"
+        )
+
+    __setitem__ = _immutable
+    __delitem__ = _immutable
+    __ior__ = _immutable
+    clear = _immutable
+    pop = _immutable
+    popitem = _immutable
+    setdefault = _immutable
+    update = _immutable
+
+    def __reduce__(self):
+        return (type(self), (dict(self),))
+
+
+class FrozenList(list):
+    """
+    A list that can't be changed, used for nested payloads shared between many records.
+    """
+
+    def _immutable(self, *args, **kwargs):
+        raise TypeError(
+            f"{type(self).__name__} is shared between records and can't be changed, copy it with list() first"
+        )
+
+    __setitem__ = _immutable
+    __delitem__ = _immutable
+    __iadd__ = _immutable
+    __imul__ = _immutable
+    append = _immutable
+    extend = _immutable
+    insert = _immutable
+    remove = _immutable
+    pop = _immutable
+    clear = _immutable
+    sort = _immutable
+    reverse = _immutable
+
+    def __reduce__(self):
+        return (type(self), (list(self),))
+
+
+# Interned payloads are only kept alive by the records using them.
+_interned_payloads = weakref.WeakValueDictionary()
+_interned_payloads_lock = threading.Lock()
+
+
+def intern_payload(payload):
+    """
+    Returns a shared immutable instance equal to payload.
+    Equal dicts and lists decoded from different api responses end up as the same FrozenDict/FrozenList object,
+    strings are interned with sys.intern.
+
+    Args:
+        payload ([type]): Decoded json value.
+
+    Returns:
+        [type]: The shared instance, or payload itself for numbers, booleans and None.
+    """
+    if isinstance(payload, str):
+        return sys.intern(payload)
+    if isinstance(payload, (FrozenDict, FrozenList)):
+        return payload
+    if isinstance(payload, (dict, list)):
+        key = json.dumps(payload, sort_keys=True)
+        with _interned_payloads_lock:
+            interned = _interned_payloads.get(key)
+        if interned is None:
+            if isinstance(payload, dict):
+                interned = FrozenDict(
+                    (sys.intern(k), intern_payload(v)) for k, v in payload.items()
+                )
+            else:
+                interned = FrozenList(intern_payload(v) for v in payload)
+            with _interned_payloads_lock:
+                interned = _interned_payloads.setdefault(key, interned)
+        return interned
+    return payload
+
+
+def intern_fields(data: dict, field_names, shared_payloads=True):
+    """
+    Interns the named fields of a decoded api record in place.
+
+    Args:
+        data (dict): A decoded record, e.g. one droplet from a droplet listing.
+        field_names ([type]): The fields that are repeated between records.
+        shared_payloads (bool, optional): Replace dicts and lists by shared read-only instances too,
+                                          otherwise only strings are interned and the record stays mutable. Defaults to True.
+
+    Returns:
+        dict: data, with the named fields replaced by shared instances.
+    """
+    for field_name in field_names:
+        if field_name in data:
+            if shared_payloads:
+                data[field_name] = intern_payload(data[field_name])
+            elif isinstance(data[field_name], str):
+                data[field_name] = sys.intern(data[field_name])
+    return data
@@ -0,0 +1,108 @@
+import copy
+from dataclasses import MISSING, dataclass, field, fields, make_dataclass
+
+
+def slotted_dataclass(cls=None, *, frozen=False):
+    """
+    Drop in replacement for @dataclass that gives the class __slots__ instead of a per instance __dict__.
+    Large inventories (hundreds of thousands of actions) hold one attributes object per record,
+    without a __dict__ each record is a fraction of the size.
+
+    Python 3.10 has dataclass(slots=True), we still support 3.7 so the class is rebuilt here the same way.
+
+    Args:
+        cls ([type]): The class to decorate.
+        frozen (bool, optional): Make instances immutable. Defaults to False.
+    """
+
+    def wrap(cls):
+        return _add_slots(dataclass(cls, frozen=frozen))
+
+    if cls is None:
+        return wrap
+    return wrap(cls)
+
+
+def _add_slots(cls):
+    field_names = tuple(f.name for f in fields(cls))
+    cls_dict = dict(cls.__dict__)
+    cls_dict["__slots__"] = field_names
+    # Field defaults live in the generated __init__, the class attributes would clash with the slots.
+    for field_name in field_names:
+        cls_dict.pop(field_name, None)
+    cls_dict.pop("__dict__", None)
+    cls_dict.pop("__weakref__", None)
+    cls_dict["__getstate__"] = _getstate
+    cls_dict["__setstate__"] = _setstate
+    qualname = getattr(cls, "__qualname__", None)
+    cls = type(cls)(cls.__name__, cls.__bases__, cls_dict)
+    if qualname is not None:
+        cls.__qualname__ = qualname
+    return cls
+
+
+def _getstate(self):
+    return [getattr(self, f.name) for f in fields(self)]
+
+
+def _setstate(self, state):
+    # object.__setattr__ so frozen instances can be unpickled and copied too.
+    for f, value in zip(fields(self), state):
+        object.__setattr__(self, f.name, value)
+
+
+_frozen_classes = {}
+
+
+def frozen_attributes(attributes):
+    """
+    Returns an immutable, slotted copy of an attributes data class instance.
+    Useful for records that never change again, like completed actions.
+
+    Args:
+        attributes ([type]): Any attributes data class instance, e.g. ActionAttributes.
+
+    Returns:
+        [type]: A Frozen<ClassName> instance with the same public attributes.
+    """
+    cls = type(attributes)
+    if cls not in _frozen_classes:
+        frozen_fields = []
+        for f in fields(cls):
+            if not f.default_factory is MISSING:
+                frozen_fields.append(
+                    (f.name, f.type, field(default_factory=f.default_factory))
+                )
+            else:
+                frozen_fields.append((f.name, f.type, field(default=f.default)))
+        frozen_cls = make_dataclass(
+            f"Frozen{cls.__name__}", frozen_fields, frozen=True
+        )
+        frozen_cls.__module__ = cls.__module__
+        frozen_cls = _add_slots(frozen_cls)
+        # The frozen class is built at runtime, pickle it as a call that rebuilds it.
+        frozen_cls.__reduce__ = lambda self, cls=cls: (
+            frozen_attributes,
+            (cls(*_getstate(self)),),
+        )
+        _frozen_classes[cls] = frozen_cls
+    return _frozen_classes[cls](
+        **{f.name: getattr(attributes, f.name) for f in fields(attributes)}
+    )
+
+
+def thawed_attributes(attributes, cls):
+    """
+    Returns a mutable copy of a frozen attributes instance, the reverse of frozen_attributes.
+    Nested values are deep copied, so changing the copy never changes the frozen original.
+
+    Args:
+        attributes ([type]): A Frozen<ClassName> instance, or any instance with the fields of cls.
+        cls ([type]): The attributes data class to build, e.g. ActionAttributes.
+
+    Returns:
+        [type]: A cls instance with the same field values.
+    """
+    return cls(
+        **{f.name: copy.deepcopy(getattr(attributes, f.name)) for f in fields(cls)}
+    )
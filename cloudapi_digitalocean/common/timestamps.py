@@ -0,0 +1,24 @@
+import datetime
+
+
+def parse_timestamp(value):
+    """
+    Converts an api timestamp ("2014-11-14T16:29:21Z") to a timezone aware UTC datetime.
+
+    Args:
+        value ([type]): ISO8601 string, datetime (naive datetimes are taken as UTC), timedelta (that long before now) or None.
+
+    Returns:
+        datetime.datetime: The timestamp, or None when value is None.
+    """
+    if value is None:
+        return None
+    if isinstance(value, datetime.timedelta):
+        return datetime.datetime.now(datetime.timezone.utc) - value
+    if isinstance(value, str):
+        if value.endswith("Z"):
+            value = value[:-1] + "+00:00"
+        value = datetime.datetime.fromisoformat(value)
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=datetime.timezone.utc)
+    return value
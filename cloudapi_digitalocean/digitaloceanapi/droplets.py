@@ -314,12 +314,72 @@ class Droplets(DigitalOceanAPIConnection):
             f"{self.endpoint}/{droplet_id}/actions", headers=self.headers, data=data
         )
 
+    def perform_action_by_tag(self, tag_name, type, name=None):
+        """
+        Performs an action on every droplet tagged with tag_name in one request, POST /v2/droplets/actions?tag_name=$TAG_NAME.
+
+        Args:
+            tag_name ([type]): Droplets with this tag are acted on.
+            type ([type]): One of power_cycle, power_on, power_off, shutdown, enable_ipv6, enable_backups,
+                           disable_backups, enable_private_networking or snapshot.
+            name ([type], optional): Snapshot name, only used by the snapshot action.
+
+        Returns:
+            [type]: A response containing a list of actions, one per droplet.
+        """
+        data_dict = {}
+        data_dict["type"] = type
+        if not name == None:
+            data_dict["name"] = name
+        data = json.dumps(data_dict)
+        params = {}
+        params["tag_name"] = tag_name
+        return self.post_request(
+            f"{self.endpoint}/actions", headers=self.headers, params=params, data=data
+        )
+
     def list_droplet_resources(self, droplet_id):
         return self.get_request(
             f"{self.endpoint}/{droplet_id}/destroy_with_associated_resources",
             headers=self.headers,
         )
 
+    def destroy_droplet_with_associated_resources_selective(
+        self,
+        droplet_id,
+        floating_ips=[],
+        snapshots=[],
+        volumes=[],
+        volume_snapshots=[],
+    ):
+        """
+        Deletes a droplet and the chosen associated resources in one request,
+        DELETE /v2/droplets/$DROPLET_ID/destroy_with_associated_resources/selective.
+        The deletes run asynchronously, see check_destroy_with_associated_resources_status.
+
+        Args:
+            droplet_id ([type]): Droplet to delete.
+            floating_ips (list, optional): Floating ip ids or addresses to delete with it.
+            snapshots (list, optional): Droplet snapshot ids to delete with it.
+            volumes (list, optional): Volume ids to delete with it.
+            volume_snapshots (list, optional): Volume snapshot ids to delete with it.
+        """
+        arguments = locals()
+        del arguments["self"]
+        del arguments["droplet_id"]
+        data = json.dumps(arguments)
+        return self.delete_request(
+            f"{self.endpoint}/{droplet_id}/destroy_with_associated_resources/selective",
+            headers=self.headers,
+            data=data,
+        )
+
+    def check_destroy_with_associated_resources_status(self, droplet_id):
+        return self.get_request(
+            f"{self.endpoint}/{droplet_id}/destroy_with_associated_resources/status",
+            headers=self.headers,
+        )
+
 
 if __name__ == "__main__":
     digitalocean_droplets = Droplets()
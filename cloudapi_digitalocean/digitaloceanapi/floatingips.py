@@ -1,4 +1,3 @@
-from cloudapi_digitalocean.digitaloceanobjects.droplet import Droplet
 from .digitaloceanapiconnection import DigitalOceanAPIConnection
 import os
 import time
@@ -36,7 +35,7 @@ class FloatingIPs(DigitalOceanAPIConnection):
         return self.post_request(self.endpoint, headers=self.headers, data=data)
 
     def delete_floating_ip(self, ip):
-        self.delete_request(f"{self.endpoint}/{ip}")
+        return self.delete_request(f"{self.endpoint}/{ip}", headers=self.headers)
 
     def assign_floating_ip_to_droplet(self, ip, droplet_id):
         data_dict = {}
@@ -0,0 +1,104 @@
+from .digitaloceanapiconnection import DigitalOceanAPIConnection
+import os
+import time
+import queue
+import threading
+import datetime
+import random
+import json
+
+
+class Images(DigitalOceanAPIConnection):
+    def __init__(self):
+        DigitalOceanAPIConnection.__init__(self)
+        self.endpoint = "/v2/images"
+
+    def list_all_images(self, page=0, per_page=0):
+        arguments = locals()
+        del arguments["self"]
+        # params must be set from a dictionary not a json dump
+        params = arguments
+
+        return self.get_request(self.endpoint, headers=self.headers, params=params)
+
+    def list_all_images_by_type(self, type, page=0, per_page=0):
+        """
+        Args:
+            type ([type]): "distribution" or "application".
+        """
+        arguments = locals()
+        del arguments["self"]
+        # params must be set from a dictionary not a json dump
+        params = arguments
+
+        return self.get_request(self.endpoint, headers=self.headers, params=params)
+
+    def list_all_private_images(self, page=0, per_page=0):
+        arguments = locals()
+        del arguments["self"]
+        arguments["private"] = "true"
+        # params must be set from a dictionary not a json dump
+        params = arguments
+
+        return self.get_request(self.endpoint, headers=self.headers, params=params)
+
+    def retrieve_image_by_id(self, id):
+        return self.get_request(f"{self.endpoint}/{id}", headers=self.headers)
+
+    def update_image(self, id, name=None, distribution=None, description=None):
+        arguments = locals()
+        del arguments["self"]
+        del arguments["id"]
+        data_dict = {}
+        for attr, value in arguments.items():
+            if not value == None:
+                data_dict[attr] = value
+        data = json.dumps(data_dict)
+        return self.put_request(
+            f"{self.endpoint}/{id}", headers=self.headers, data=data
+        )
+
+    def delete_image_id(self, id):
+        return self.delete_request(f"{self.endpoint}/{id}", headers=self.headers)
+
+    def list_actions_for_image(self, id, page=0, per_page=0):
+        arguments = locals()
+        del arguments["self"]
+        del arguments["id"]
+        # params must be set from a dictionary not a json dump
+        params = arguments
+        return self.get_request(
+            f"{self.endpoint}/{id}/actions", headers=self.headers, params=params
+        )
+
+    def retrieve_image_action(self, id, action_id):
+        return self.get_request(
+            f"{self.endpoint}/{id}/actions/{action_id}", headers=self.headers
+        )
+
+    def transfer_image(self, id, region):
+        """
+        Copies an image or snapshot to another region.
+
+        Args:
+            id ([type]): Image or snapshot ID
+            region ([type]): Region slug to copy to, e.g. "nyc3"
+
+        Returns:
+            [type]: Response with the transfer action.
+        """
+        data_dict = {}
+        data_dict["type"] = "transfer"
+        data_dict["region"] = region
+        data = json.dumps(data_dict)
+        return self.post_request(
+            f"{self.endpoint}/{id}/actions", headers=self.headers, data=data
+        )
+
+    def convert_image_to_snapshot(self, id):
+        data_dict = {}
+        data_dict["type"] = "convert"
+        data = json.dumps(data_dict)
+        return self.post_request(
+            f"{self.endpoint}/{id}/actions", headers=self.headers, data=data
+        )
@@ -30,7 +30,7 @@ class Snapshots(DigitalOceanAPIConnection):
 
         return self.get_request(self.endpoint, headers=self.headers, params=params)
 
-    def list_all_volume_snapshots(self):
+    def list_all_volume_snapshots(self, page=0, per_page=0):
         arguments = locals()
         del arguments["self"]
         arguments["resource_type"] = "volume"
@@ -152,7 +152,7 @@ class Volumes(DigitalOceanAPIConnection):
 
     def resize_volume(self, volume_id, size, region=None):
         # size from 1GB to max 16,384GB
-        data_dict = []
+        data_dict = {}
         data_dict["type"] = "resize"
         data_dict["size_gigabytes"] = size
         if not region == None:
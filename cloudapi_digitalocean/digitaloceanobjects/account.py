@@ -35,6 +35,9 @@ class AccountManager:
             newaccount = Account()
             newaccount.attributes = AccountAttributes(**account_data)
             return newaccount
+        raise Exception(
+            f"Could not retrieve the account, {response.status_code} {response.content}"
+        )
 
     def droplet_limit(self):
         return self.retrieve_account_details().attributes.droplet_limit
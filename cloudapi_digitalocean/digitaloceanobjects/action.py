@@ -3,13 +3,23 @@ from __future__ import annotations
 from dataclasses import dataclass, field
 from ..digitaloceanapi.actions import Actions
 from ..common.cloudapiexceptions import *
+from ..common.slotteddataclass import (
+    slotted_dataclass,
+    frozen_attributes,
+    thawed_attributes,
+)
+from collections import OrderedDict
+from .actionhistory import ActionHistory
+from .actionpolling import ActionDurationStats, ActionPoller
+from .inventorycolumns import action_columns
+from ..common.timestamps import parse_timestamp
 import json
 import threading
 import time
 import sys
 
 
-@dataclass
+@slotted_dataclass
 class ActionAttributes:
     id: int = None
     status: str = None
@@ -23,6 +33,17 @@ class ActionAttributes:
 
 
 class ActionManager:
+    # Completed and errored actions never change, keep the most recently used ones for every ActionManager.
+    finished_actions = OrderedDict()
+    finished_actions_lock = threading.Lock()
+    finished_actions_maxsize = 4096
+    # Observed completion times per action type and region, shared by every action poller.
+    duration_stats = ActionDurationStats()
+    # One background thread polls every in-progress action.
+    poller = ActionPoller(duration_stats)
+    # Seconds the waits give an action before raising ErrorActionTimeout, big snapshots and transfers take hours.
+    wait_timeout = 6 * 3600
+
     def __init__(self):
         self.actionapi = Actions()
 
@@ -55,8 +76,7 @@ class ActionManager:
         # Build and return that Droplet object array.
         action_objects = []
         for action_item in action_list:
-            newaction = Action()
-            newaction.attributes = ActionAttributes(**action_item)
+            newaction = Action(ActionAttributes(**action_item))
             action_objects.append(newaction)
         return action_objects
 
@@ -89,87 +109,361 @@ class ActionManager:
         # Build and return that Droplet object array.
         action_objects = []
         for action_item in action_list:
-            newaction = Action()
-            newaction.attributes = ActionAttributes(**action_item)
+            newaction = Action(ActionAttributes(**action_item))
             action_objects.append(newaction)
         return action_objects
 
-    def does_action_exist_id(self, action_id):
-        start_page, end_page = 1, 10
-        actions = self.retrieve_paginated_actions(
-            start_page=start_page, end_page=end_page
-        )
-        for action in actions:
-            if action.attributes.id == action_id:
-                return True
-        full_result_count = len(actions)
+    def iterate_action_records(self, per_page=200):
+        """
+        Yields the raw record (dict) of every action in the account, newest first.
+        Pages are requested as they are consumed, stop iterating to stop paging.
+        """
+        page = 1
         while True:
-            start_page, end_page = start_page + 10, end_page + 10
-            actions = self.retrieve_paginated_actions(
-                start_page=start_page, end_page=end_page
-            )
-            for action in actions:
-                if action.attributes.id == action_id:
-                    print(action.attributes)
-                    return True
-            if len(actions) < full_result_count:
+            response = self.actionapi.list_all_actions(page=page, per_page=per_page)
+            content = json.loads(response.content.decode("utf-8"))
+            for action_item in content["actions"]:
+                yield action_item
+            try:
+                if not content["links"]["pages"]["next"]:
+                    break
+            except KeyError:
+                break
+            page = page + 1
+
+    def sync_action_history(self, path):
+        """
+        Brings the local action history file at path up to date and returns every action in it, newest first.
+
+        Actions come back newest first and finished ones never change, so paging stops at the first action
+        at or below the highest action id already stored. Stored actions that were still in-progress
+        are refreshed with one direct lookup each.
+
+        Args:
+            path (str): Append only history file, see ActionHistory. Created on first sync.
+
+        Returns:
+            [Action]: Every action in the history, newest first.
+        """
+        history = ActionHistory(path)
+        records = history.load()
+        high_water_mark = ActionHistory.high_water_mark(records)
+
+        new_records = []
+        for action_item in self.iterate_action_records():
+            if (not high_water_mark == None) and action_item["id"] <= high_water_mark:
                 break
-        return False
+            new_records.append(action_item)
+
+        new_ids = set(action_item["id"] for action_item in new_records)
+        refreshed_records = []
+        for action_id, action_item in records.items():
+            if action_item["status"] == "in-progress" and not action_id in new_ids:
+                response = self.actionapi.retrieve_existing_action(action_id)
+                if response:
+                    content = json.loads(response.content.decode("utf-8"))
+                    if not content["action"]["status"] == "in-progress":
+                        refreshed_records.append(content["action"])
+
+        # Oldest first, so the file stays in the order actions happened.
+        history.append(list(reversed(new_records)) + refreshed_records)
+        for action_item in new_records + refreshed_records:
+            records[action_item["id"]] = action_item
+
+        action_objects = []
+        for action_id in sorted(records, reverse=True):
+            newaction = Action(ActionAttributes(**records[action_id]))
+            action_objects.append(newaction)
+        return action_objects
+
+    def query_actions(
+        self,
+        since=None,
+        until=None,
+        type=None,
+        resource_type=None,
+        region_slug=None,
+        status=None,
+        columnar=False,
+    ):
+        """
+        Returns the actions that match every given filter, newest first.
+
+        Actions are streamed newest first and filtered as they arrive, paging stops at the first action
+        started before since, so querying recent history only costs a few pages.
+
+        Args:
+            since ([type], optional): Oldest started_at to include, a datetime, ISO8601 string or timedelta before now.
+            until ([type], optional): Newest started_at to include, same formats as since.
+            type (str or list, optional): Action type(s), e.g. "resize".
+            resource_type (str or list, optional): e.g. "droplet", "volume".
+            region_slug (str or list, optional): e.g. "fra1".
+            status (str or list, optional): e.g. "completed", "errored".
+            columnar (bool, optional): Return InventoryColumns (needs numpy) instead of Action objects. Defaults to False.
+
+        Returns:
+            [Action] or InventoryColumns: The matching actions.
+        """
+        since = parse_timestamp(since)
+        until = parse_timestamp(until)
+        filters = {}
+        for name, value in [
+            ("type", type),
+            ("resource_type", resource_type),
+            ("region_slug", region_slug),
+            ("status", status),
+        ]:
+            if not value == None:
+                filters[name] = set([value]) if isinstance(value, str) else set(value)
+
+        action_list = []
+        for action_item in self.iterate_action_records():
+            started_at = parse_timestamp(action_item.get("started_at"))
+            if (not since == None) and (not started_at == None) and started_at < since:
+                break
+            if (not until == None) and (not started_at == None) and started_at > until:
+                continue
+            if all(action_item.get(name) in values for name, values in filters.items()):
+                action_list.append(action_item)
+
+        if columnar:
+            return action_columns(action_list)
+        action_objects = []
+        for action_item in action_list:
+            newaction = Action(ActionAttributes(**action_item))
+            action_objects.append(newaction)
+        return action_objects
+
+    def does_action_exist_id(self, action_id):
+        try:
+            self.retrive_action(action_id)
+        except ErrorActionDoesNotExists:
+            return False
+        return True
 
     def retrive_action(self, action_id, check_if_exists=True):
-        if check_if_exists:
-            if not self.does_action_exist_id(action_id):
+        """
+        Returns the Action with action_id, looked up with a single GET /v2/actions/{action_id}.
+        Finished actions never change, they are served from a bounded LRU shared by every ActionManager,
+        every lookup gets its own mutable copy of the attributes.
+
+        Args:
+            action_id ([type]): [description]
+            check_if_exists (bool, optional): Kept for compatibility, a missing action always raises ErrorActionDoesNotExists.
+
+        Returns:
+            Action: [description]
+        """
+        action_attributes = ActionManager.finished_action(action_id)
+        if action_attributes is None:
+            response = self.actionapi.retrieve_existing_action(action_id)
+            if response.status_code == 404:
                 raise ErrorActionDoesNotExists(
                     f"action with id:{action_id} does not exist"
                 )
-        response = self.actionapi.retrieve_existing_action(action_id)
-        content = json.loads(response.content.decode("utf-8"))
-        action = Action()
-        action.attributes = ActionAttributes(**content["action"])
-        return action
+            if not response:
+                raise Exception(
+                    f"Could not retrieve action {action_id}, {response.content}"
+                )
+            content = json.loads(response.content.decode("utf-8"))
+            action_attributes = ActionAttributes(**content["action"])
+            ActionManager.remember_finished_action(action_attributes)
+        return Action(action_attributes)
+
+    @classmethod
+    def finished_action(cls, action_id):
+        """
+        Returns a mutable copy of the cached attributes of a finished action, None if it isn't cached.
+        """
+        with cls.finished_actions_lock:
+            if action_id in cls.finished_actions:
+                cls.finished_actions.move_to_end(action_id)
+                return thawed_attributes(
+                    cls.finished_actions[action_id], ActionAttributes
+                )
+        return None
+
+    @classmethod
+    def remember_finished_action(cls, action_attributes: ActionAttributes):
+        """
+        Adds a completed or errored action to the shared LRU, in progress actions are ignored.
+        """
+        if not action_attributes.status in ["completed", "errored"]:
+            return
+        with cls.finished_actions_lock:
+            # Frozen copy of a deep copy, the caller keeps a mutable action_attributes of its own.
+            cls.finished_actions[action_attributes.id] = frozen_attributes(
+                thawed_attributes(action_attributes, ActionAttributes)
+            )
+            cls.finished_actions.move_to_end(action_attributes.id)
+            while len(cls.finished_actions) > cls.finished_actions_maxsize:
+                cls.finished_actions.popitem(last=False)
+
+    def wait_for_action_completion(self, action: Action, timeout=None):
+        """
+        Blocks until action is completed or errored, the shared ActionPoller wakes us up as soon as it sees it finish.
 
-    def wait_for_action_completion(self, action: Action):
-        while not action.attributes.status in ["completed", "errored"]:
-            time.sleep(5)
+        Args:
+            action (Action): The action to wait for.
+            timeout (float, optional): Seconds to wait. Defaults to None, ActionManager.wait_timeout.
+
+        Raises:
+            ErrorActionTimeout: If the action didn't finish in time.
+            ErrorActionDoesNotExists: If the action can't be polled, it has no id or the api doesn't know it.
+            ErrorActionFailed: If the action errored.
+        """
+        if timeout == None:
+            timeout = self.wait_timeout
+        if not action.finished.wait(timeout):
+            raise ErrorActionTimeout(
+                f"Action {action.attributes.id},{action.attributes.type} didn't finish within {timeout}s"
+            )
+        if not action.attributes.status in ["completed", "errored"]:
+            raise ErrorActionDoesNotExists(
+                f"Action {action.attributes.id},{action.attributes.type} can't be polled"
+            )
         if action.attributes.status == "errored":
             raise ErrorActionFailed(
-                f"Action {self.attributes.id},{self.attributes.type} failed"
+                f"Action {action.attributes.id},{action.attributes.type} failed"
+            )
+
+    def wait_for_actions_to_finish(self, actions: list, timeout=None):
+        """
+        Blocks until every action in actions is completed or errored, like wait_for_actions_completion,
+        but raises nothing, for batches that report the outcome of each action on its own.
+
+        Args:
+            actions (list): The actions to wait for.
+            timeout (float, optional): Seconds to wait for all of them together. Defaults to None, ActionManager.wait_timeout.
+
+        Returns:
+            [list]: Per action, in the same order, None once it completed, otherwise the
+                    ErrorActionTimeout, ErrorActionDoesNotExists or ErrorActionFailed wait_for_action_completion would raise.
+        """
+        if timeout == None:
+            timeout = self.wait_timeout
+        deadline = time.monotonic() + timeout
+        errors = []
+        for action in actions:
+            if not action.finished.wait(max(0, deadline - time.monotonic())):
+                errors.append(
+                    ErrorActionTimeout(
+                        f"Action {action.attributes.id},{action.attributes.type} didn't finish within {timeout}s"
+                    )
+                )
+            elif not action.attributes.status in ["completed", "errored"]:
+                errors.append(
+                    ErrorActionDoesNotExists(
+                        f"Action {action.attributes.id},{action.attributes.type} can't be polled"
+                    )
+                )
+            elif action.attributes.status == "errored":
+                errors.append(
+                    ErrorActionFailed(
+                        f"Action {action.attributes.id},{action.attributes.type} failed"
+                    )
+                )
+            else:
+                errors.append(None)
+        return errors
+
+    def wait_for_actions_completion(self, actions: list, timeout=None):
+        """
+        Blocks until every action in actions is completed or errored.
+        Raises ErrorActionFailed naming every errored action once they have all finished.
+
+        Args:
+            actions (list): The actions to wait for.
+            timeout (float, optional): Seconds to wait for all of them together. Defaults to None, ActionManager.wait_timeout.
+
+        Raises:
+            ErrorActionTimeout: If any action didn't finish in time.
+            ErrorActionDoesNotExists: If any action can't be polled, it has no id or the api doesn't know it.
+            ErrorActionFailed: If any action errored.
+        """
+        if timeout == None:
+            timeout = self.wait_timeout
+        deadline = time.monotonic() + timeout
+        for action in actions:
+            action.finished.wait(max(0, deadline - time.monotonic()))
+        unfinished_actions = [action for action in actions if not action.finished.is_set()]
+        if len(unfinished_actions) > 0:
+            raise ErrorActionTimeout(
+                "Actions "
+                + ", ".join(
+                    f"{action.attributes.id},{action.attributes.type}"
+                    for action in unfinished_actions
+                )
+                + f" didn't finish within {timeout}s"
+            )
+        unknown_actions = [
+            action
+            for action in actions
+            if not action.attributes.status in ["completed", "errored"]
+        ]
+        if len(unknown_actions) > 0:
+            raise ErrorActionDoesNotExists(
+                "Actions "
+                + ", ".join(
+                    f"{action.attributes.id},{action.attributes.type}"
+                    for action in unknown_actions
+                )
+                + " can't be polled"
+            )
+        errored_actions = [
+            action for action in actions if action.attributes.status == "errored"
+        ]
+        if len(errored_actions) > 0:
+            raise ErrorActionFailed(
+                "Actions "
+                + ", ".join(
+                    f"{action.attributes.id},{action.attributes.type}"
+                    for action in errored_actions
+                )
+                + " failed"
             )
 
 
 class Action:
-    def __init__(self, action_attributes: ActionAttributes):
+    def __init__(self, action_attributes: ActionAttributes, group=None, on_finished=None):
         self.attributes = action_attributes
         self.actionapi = Actions()
-        self.update_on_active_action()
+        self.finished = threading.Event()
+        self.update_on_active_action(group=group, on_finished=on_finished)
 
     def update_action_action(self):
         """
         Updates the Droplet lastaction data class with the latest droplet action information at digital ocean.
         """
         response = self.actionapi.retrieve_existing_action(self.attributes.id)
-        if response:
+        if response.status_code == 404:
+            # The api doesn't know the action, polling again won't change that.
+            self.finished.set()
+        elif response:
             content = json.loads(response.content.decode("utf-8"))
             action_data = dict(content["action"])
             self.attributes = ActionAttributes(**action_data)
+            if self.attributes.status in ["completed", "errored"]:
+                ActionManager.duration_stats.record_action(self.attributes)
+                ActionManager.remember_finished_action(self.attributes)
+                self.finished.set()
 
-    def update_on_active_action(self):
-        def update_action():
-            # On creating a blank action it's id is None before a user defines an action.
-            if self.attributes.id == None:
-                pass
-            while (self.attributes.status == None) or (
-                self.attributes.status == "in-progress"
-            ):
-                if not self.attributes.status in ["completed", "errored"]:
-                    time.sleep(10)
-                    self.update_action_action()
-                else:
-                    break
-                if self.attributes.status == "errored":
-                    raise ErrorActionFailed(
-                        f"Action {self.attributes.id},{self.attributes.type} failed"
-                    )
+    def update_on_active_action(self, group=None, on_finished=None):
+        """
+        Hands an in-progress action to the shared ActionPoller, which keeps the attributes up to date until it finishes.
 
-        thread = threading.Thread(target=update_action, args=())
-        thread.start()
+        Args:
+            group ([type], optional): Shared by actions expected to finish together, see ActionPoller.track.
+            on_finished (callable, optional): Called with this action, on its own thread, once it finished.
+        """
+        # Finished actions never change, there is nothing to poll.
+        if self.attributes.status in ["completed", "errored"]:
+            self.finished.set()
+        # On creating a blank action it's id is None before a user defines an action,
+        # there is nothing to poll and nothing to wait for.
+        elif self.attributes.id == None:
+            self.finished.set()
+            return
+        else:
+            self.finished.clear()
+        ActionManager.poller.track(self, group=group, on_finished=on_finished)
@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import json
+import os
+import threading
+
+
+class ActionHistory:
+    """
+    An append only JSON lines file holding every action record seen on the account.
+
+    A record is appended again whenever it changes (an in-progress action that later completed),
+    on load the last line for an action id wins.
+    The high water mark is the highest action id in the file, a sync appends its new records in one go
+    once it has reached the mark, so an interrupted sync never leaves a gap below it.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+
+    def load(self):
+        """
+        Returns:
+            dict: action id -> raw action record, for every action in the file.
+        """
+        records = {}
+        if not os.path.exists(self.path):
+            return records
+        with self.lock, open(self.path, "r", encoding="utf-8") as history_file:
+            for line in history_file:
+                line = line.strip()
+                if line:
+                    record = json.loads(line)
+                    records[record["id"]] = record
+        return records
+
+    def append(self, records: list):
+        if len(records) == 0:
+            return
+        lines = "".join(
+            json.dumps(record, separators=(",", ":")) + "\n" for record in records
+        )
+        with self.lock, open(self.path, "a", encoding="utf-8") as history_file:
+            history_file.write(lines)
+            history_file.flush()
+            os.fsync(history_file.fileno())
+
+    def compact(self):
+        """
+        Rewrites the file with only the latest record per action, oldest first.
+        """
+        records = self.load()
+        temporary_path = f"{self.path}.compact"
+        with self.lock:
+            with open(temporary_path, "w", encoding="utf-8") as history_file:
+                for action_id in sorted(records):
+                    history_file.write(
+                        json.dumps(records[action_id], separators=(",", ":")) + "\n"
+                    )
+            os.replace(temporary_path, self.path)
+
+    @staticmethod
+    def high_water_mark(records: dict):
+        return max(records) if len(records) > 0 else None
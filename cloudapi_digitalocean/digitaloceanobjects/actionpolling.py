@@ -0,0 +1,209 @@
+from __future__ import annotations
+
+import datetime
+import math
+import threading
+import time
+
+from ..common.timestamps import parse_timestamp
+
+
+class ActionDurationStats:
+    """
+    Running statistics of how long actions take to complete, per action type and region.
+
+    Used to decide when to poll an in-progress action: densely around its expected completion time,
+    backing off exponentially the further before or after that time we are.
+    A rename that finishes in a second is then seen almost straight away, while a ten minute snapshot
+    costs a handful of polls instead of one every few seconds.
+    """
+
+    # Polling interval bounds in seconds.
+    min_interval = 1.0
+    max_interval = 60.0
+    # Older observations fade out once a key has this many, so the stats follow changes in the platform.
+    max_weight = 50
+
+    def __init__(self):
+        self.durations = {}
+        self.lock = threading.Lock()
+
+    def record(self, action_type, region_slug, seconds):
+        """
+        Adds one observed completion time (Welford's running mean and variance, with a capped weight).
+        """
+        if seconds is None or seconds < 0:
+            return
+        with self.lock:
+            for key in [(action_type, region_slug), (action_type, None)]:
+                count, mean, m2 = self.durations.get(key, (0, 0.0, 0.0))
+                count = min(count + 1, self.max_weight)
+                delta = seconds - mean
+                mean = mean + delta / count
+                m2 = m2 + delta * (seconds - mean)
+                if count == self.max_weight:
+                    m2 = m2 * (count - 1) / count
+                self.durations[key] = (count, mean, m2)
+
+    def record_action(self, action_attributes):
+        """
+        Records the duration of a completed action, other actions are ignored.
+        """
+        if not action_attributes.status == "completed":
+            return
+        started_at = parse_timestamp(action_attributes.started_at)
+        completed_at = parse_timestamp(action_attributes.completed_at)
+        if started_at is None or completed_at is None:
+            return
+        self.record(
+            action_attributes.type,
+            action_attributes.region_slug,
+            (completed_at - started_at).total_seconds(),
+        )
+
+    def expected(self, action_type, region_slug):
+        """
+        Returns:
+            (float, float): Expected duration and its standard deviation in seconds,
+                            falling back to the type over every region, (None, None) if never seen.
+        """
+        with self.lock:
+            for key in [(action_type, region_slug), (action_type, None)]:
+                if key in self.durations:
+                    count, mean, m2 = self.durations[key]
+                    deviation = math.sqrt(m2 / (count - 1)) if count > 1 else mean / 2
+                    return mean, deviation
+        return None, None
+
+    def next_interval(self, action_attributes, polls=0):
+        """
+        Returns how many seconds to wait before polling an in-progress action again.
+
+        Args:
+            action_attributes ([type]): The action's current attributes.
+            polls (int, optional): How many times the action was already polled. Defaults to 0.
+        """
+        expected, deviation = self.expected(
+            action_attributes.type, action_attributes.region_slug
+        )
+        if expected is None:
+            # Nothing learned yet, plain exponential backoff.
+            return min(self.min_interval * 2 ** polls, self.max_interval)
+
+        started_at = parse_timestamp(action_attributes.started_at)
+        if started_at is None:
+            elapsed = 0.0
+        else:
+            elapsed = (
+                datetime.datetime.now(datetime.timezone.utc) - started_at
+            ).total_seconds()
+
+        width = max(deviation, self.min_interval)
+        distance = abs(elapsed - expected)
+        interval = self.min_interval * 2 ** min(distance / width, 16)
+        if elapsed < expected:
+            # Never sleep past the expected completion time, that's where we want to poll.
+            interval = min(interval, max(expected - elapsed, self.min_interval))
+        return max(self.min_interval, min(interval, self.max_interval))
+
+
+class ActionPoller:
+    """
+    One background thread polling every in-progress action, instead of a thread per action.
+
+    Each action is polled when ActionDurationStats says it is worth it.
+    Actions tracked in the same group (e.g. every action returned by one tag scoped request) are expected to finish
+    together, at each due time only the first unfinished one of a group and type is polled, the rest wait for it.
+    Completion callbacks run on their own threads, so a slow callback never delays polling.
+    """
+
+    def __init__(self, duration_stats: ActionDurationStats):
+        self.duration_stats = duration_stats
+        self.condition = threading.Condition()
+        self.entries = []
+        self.thread = None
+
+    def track(self, action, group=None, on_finished=None):
+        """
+        Polls action until it is completed or errored, then sets action.finished and calls on_finished(action).
+
+        Args:
+            action (Action): An action, possibly still in-progress.
+            group ([type], optional): Any hashable shared by actions expected to finish together. Defaults to None.
+            on_finished (callable, optional): Called with the action once it finished.
+        """
+        if action.finished.is_set():
+            if not on_finished == None:
+                threading.Thread(target=on_finished, args=(action,)).start()
+            return action
+        entry = {
+            "action": action,
+            "group": group,
+            "on_finished": on_finished,
+            "polls": 0,
+            "due": time.monotonic()
+            + self.duration_stats.next_interval(action.attributes, 0),
+        }
+        with self.condition:
+            self.entries.append(entry)
+            if self.thread is None:
+                self.thread = threading.Thread(target=self.poll_actions, args=())
+                self.thread.start()
+            self.condition.notify()
+        return action
+
+    def pending(self):
+        with self.condition:
+            return [entry["action"] for entry in self.entries]
+
+    def poll_actions(self):
+        while True:
+            with self.condition:
+                if len(self.entries) == 0:
+                    self.thread = None
+                    return
+                now = time.monotonic()
+                earliest = min(entry["due"] for entry in self.entries)
+                if earliest > now:
+                    self.condition.wait(earliest - now)
+                    continue
+                due_entries = [entry for entry in self.entries if entry["due"] <= now]
+
+            groups_still_in_progress = set()
+            for entry in due_entries:
+                action = entry["action"]
+                # Ungrouped actions are a group of their own.
+                group_key = (
+                    id(entry) if entry["group"] is None else entry["group"],
+                    action.attributes.type,
+                    action.attributes.region_slug,
+                )
+                if not group_key in groups_still_in_progress:
+                    try:
+                        action.update_action_action()
+                    except Exception:
+                        # Network trouble, try again at the next due time.
+                        pass
+                if action.finished.is_set():
+                    with self.condition:
+                        self.entries.remove(entry)
+                    if not entry["on_finished"] == None:
+                        threading.Thread(
+                            target=entry["on_finished"], args=(action,)
+                        ).start()
+                elif not group_key in groups_still_in_progress:
+                    groups_still_in_progress.add(group_key)
+                    entry["polls"] = entry["polls"] + 1
+                    entry["due"] = time.monotonic() + self.duration_stats.next_interval(
+                        action.attributes, entry["polls"]
+                    )
+                    if not entry["group"] is None:
+                        # The rest of the group waits for this one instead of being polled too.
+                        with self.condition:
+                            for sibling in self.entries:
+                                if sibling["group"] == entry["group"] and (
+                                    sibling["action"].attributes.type,
+                                    sibling["action"].attributes.region_slug,
+                                ) == group_key[1:]:
+                                    sibling["polls"] = entry["polls"]
+                                    sibling["due"] = entry["due"]
@@ -0,0 +1,211 @@
+from __future__ import annotations
+
+from .inventorystore import active_inventory_store
+from ..common.boundedconcurrency import run_bounded
+import json
+import math
+import threading
+import time
+
+
+class BulkFetchCostModel:
+    """
+    Decides whether resources wanted by id are cheaper to fetch with concurrent single GETs,
+    or to pick out of one paginated listing.
+
+    Every request goes through the same rate limited queue, so both ways cost about one queue slot per request,
+    n GETs against one request per listing page. The estimate uses the inventory size seen by the last listing
+    (or the enabled InventoryStore), the measured latency of GETs and listing pages, and, when the remaining
+    hourly rate budget runs low, simply the way with fewer requests.
+    """
+
+    page_size = 200
+    # The api connection is set to 5000 requests an hour, one queue slot every 0.72 seconds.
+    seconds_between_requests = 3600 / 5000
+    # Below this many requests left in the hourly budget, fewer requests beat faster ones.
+    reserved_rate_budget = 250
+    # Weight of the newest latency measurement in the running average.
+    latency_weight = 0.2
+    # While the inventory size is unknown, up to this many ids are always fetched with GETs,
+    # a listing of an account of unknown size could be any number of pages.
+    unknown_size_get_limit = 10
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.inventory_sizes = {}
+        self.latencies = {"get": None, "page": None}
+        self.rate_limit_remaining = None
+
+    def record_latency(self, request_kind, seconds):
+        with self.lock:
+            average = self.latencies[request_kind]
+            if average == None:
+                self.latencies[request_kind] = seconds
+            else:
+                self.latencies[request_kind] = average + self.latency_weight * (
+                    seconds - average
+                )
+
+    def record_response(self, response):
+        remaining = getattr(response, "headers", {}).get("ratelimit-remaining")
+        if not remaining == None:
+            with self.lock:
+                self.rate_limit_remaining = int(remaining)
+
+    def record_inventory_size(self, resource, size):
+        with self.lock:
+            self.inventory_sizes[resource] = size
+
+    def inventory_size(self, resource):
+        """
+        Returns the last known number of resources of a kind, None if never listed.
+        """
+        with self.lock:
+            if resource in self.inventory_sizes:
+                return self.inventory_sizes[resource]
+        # Only a size estimate, records are never served from the store here.
+        store = active_inventory_store()
+        if not store is None:
+            records, synced_at = store.load(resource)
+            if not records is None:
+                return len(records)
+        return None
+
+    def estimate(self, resource, id_count):
+        """
+        Returns:
+            [dict]: "get" and "list", each (requests, seconds) for fetching id_count resources that way.
+        """
+        size = self.inventory_size(resource)
+        # Size unknown, assume a single page, retrieve_records_by_ids learns the size first when it can.
+        pages = 1 if size == None else max(1, math.ceil(size / self.page_size))
+        with self.lock:
+            get_latency = self.latencies["get"] or self.seconds_between_requests
+            page_latency = self.latencies["page"] or 2 * self.seconds_between_requests
+        # GETs are queued together and answered side by side, listing pages follow each other.
+        get_seconds = id_count * self.seconds_between_requests + get_latency
+        list_seconds = pages * max(self.seconds_between_requests, page_latency)
+        return {"get": (id_count, get_seconds), "list": (pages, list_seconds)}
+
+    def choose(self, resource, id_count):
+        """
+        Returns:
+            [str]: "get" or "list".
+        """
+        estimate = self.estimate(resource, id_count)
+        with self.lock:
+            remaining = self.rate_limit_remaining
+        if not remaining == None and remaining < self.reserved_rate_budget + max(
+            estimate["get"][0], estimate["list"][0]
+        ):
+            return "get" if estimate["get"][0] <= estimate["list"][0] else "list"
+        return "get" if estimate["get"][1] <= estimate["list"][1] else "list"
+
+
+# Shared by every manager, so what one listing learns helps the next bulk fetch.
+bulk_fetch_cost_model = BulkFetchCostModel()
+
+
+def retrieve_records_concurrently(request, ids: list, key, max_in_flight=8):
+    """
+    GETs resources by id side by side, each request still goes through the shared rate limited queue.
+    Every id is fetched once, however often it is given.
+
+    Args:
+        request (callable): Takes an id and returns the api response, e.g. Volumes().retrieve_volume_by_id
+        ids (list): Resource ids.
+        key (str): Key of the record in the response, e.g. "volume".
+        max_in_flight (int, optional): GETs waiting on the queue at the same time. Defaults to 8.
+
+    Raises:
+        Exception: The first failed GET in ids order, the request's own exception when it raised one.
+
+    Returns:
+        dict: id -> raw api record, None for ids that don't exist.
+    """
+    ids = list(dict.fromkeys(ids))
+
+    def retrieve(id):
+        started_at = time.monotonic()
+        response = request(id)
+        bulk_fetch_cost_model.record_latency("get", time.monotonic() - started_at)
+        bulk_fetch_cost_model.record_response(response)
+        if response:
+            return json.loads(response.content.decode("utf-8"))[key]
+        if response.status_code == 404:
+            return None
+        raise Exception(
+            f"Could not retrieve {key} {id}, {response.status_code} {response.content}"
+        )
+
+    outcomes = run_bounded(retrieve, ids, max_in_flight=max_in_flight)
+    for _, error in outcomes:
+        if not error == None:
+            raise error
+    return {id: record for id, (record, _) in zip(ids, outcomes)}
+
+
+def resolve_records_from_listing(records: list, ids: list):
+    """
+    Picks the records for ids out of a listing.
+
+    Returns:
+        dict: id -> raw api record, None for ids not in the listing.
+    """
+    by_id = {str(record["id"]): record for record in records}
+    return {id: by_id.get(str(id)) for id in ids}
+
+
+def count_listing_records(list_request):
+    """
+    Returns the total of a listing from a single one record page, None when the response has no meta total.
+
+    Args:
+        list_request (callable): Takes page and per_page, e.g. Volumes().list_all_volumes
+    """
+    response = list_request(page=1, per_page=1)
+    if not response:
+        return None
+    content = json.loads(response.content.decode("utf-8"))
+    try:
+        return content["meta"]["total"]
+    except KeyError:
+        return None
+
+
+def retrieve_records_by_ids(resource, ids: list, request, key, list_records, count_records=None):
+    """
+    Fetches the records for ids the cheaper way, see BulkFetchCostModel.
+
+    While the inventory size is unknown, up to BulkFetchCostModel.unknown_size_get_limit ids are fetched with GETs,
+    for more ids the size is learned first with count_records.
+
+    Args:
+        resource (str): Inventory kind, e.g. "volumes".
+        ids (list): Resource ids.
+        request (callable): Single GET by id.
+        key (str): Key of the record in a single GET response, e.g. "volume".
+        list_records (callable): Returns every record of the kind, following pagination.
+        count_records (callable, optional): Returns the number of records of the kind, or None, e.g. from count_listing_records.
+
+    Returns:
+        dict: id -> raw api record, None for ids that don't exist.
+    """
+    ids = list(dict.fromkeys(ids))
+    if len(ids) == 0:
+        return {}
+    if bulk_fetch_cost_model.inventory_size(resource) == None:
+        if len(ids) <= BulkFetchCostModel.unknown_size_get_limit:
+            return retrieve_records_concurrently(request, ids, key)
+        if not count_records == None:
+            size = count_records()
+            if not size == None:
+                bulk_fetch_cost_model.record_inventory_size(resource, size)
+    if bulk_fetch_cost_model.choose(resource, len(ids)) == "get":
+        return retrieve_records_concurrently(request, ids, key)
+    started_at = time.monotonic()
+    records = list_records()
+    pages = max(1, math.ceil(len(records) / BulkFetchCostModel.page_size))
+    bulk_fetch_cost_model.record_latency("page", (time.monotonic() - started_at) / pages)
+    bulk_fetch_cost_model.record_inventory_size(resource, len(records))
+    return resolve_records_from_listing(records, ids)
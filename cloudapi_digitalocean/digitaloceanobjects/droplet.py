@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from dataclasses import dataclass, field
+from dataclasses import MISSING, dataclass, field, fields
 from ..digitaloceanapi.droplets import Droplets
 from ..digitaloceanapi.volumes import Volumes
 from .action import *
@@ -8,11 +8,51 @@ from .snapshot import *
 from .size import *
 from .volume import *
 from .account import *
+from .inventorycolumns import droplet_columns, _region_slug
+from .inventorystore import resolve_inventory_store
+from .bulkfetch import retrieve_records_by_ids, count_listing_records
+from .dropletpipeline import DropletActionPipeline, RollingOperation
+from .teardown import TeardownPlanner
+from .reconciler import Reconciler
 from ..common.cloudapiexceptions import *
+from ..common.slotteddataclass import slotted_dataclass
+from ..common.payloadinterning import intern_fields, intern_payload
+from ..common.boundedconcurrency import run_bounded
+from ..common.timestamps import parse_timestamp
 import json
+import datetime
+import math
 import threading
 import time
 import re
+import sys
+
+# Actions the api accepts for every droplet with a tag, POST /v2/droplets/actions?tag_name=
+TAG_DROPLET_ACTION_TYPES = [
+    "power_cycle",
+    "power_on",
+    "power_off",
+    "shutdown",
+    "enable_ipv6",
+    "enable_backups",
+    "disable_backups",
+    "enable_private_networking",
+    "snapshot",
+]
+
+# Droplet fields that repeat between droplets, a listing with shared_payloads=True keeps one shared read-only
+# instance of each distinct value, otherwise only their strings are interned.
+INTERNED_DROPLET_FIELDS = (
+    "status",
+    "features",
+    "region",
+    "image",
+    "size",
+    "size_slug",
+    "kernel",
+    "tags",
+    "vpc_uuid",
+)
 
 
 @dataclass
@@ -40,12 +80,15 @@ class DropletManager:
         self.smanager = SnapshotManager()
         self.amanager = ActionManager()
         self.account_manager=AccountManager()
+        self.size_manager = SizeManager()
 
-    def check_limit(self):
+    def check_limit(self, new_droplets=1):
+        """
+        Raises unless new_droplets more droplets fit in the account droplet limit.
+        """
         droplet_limit = self.account_manager.droplet_limit()
-        if not len(self.retrieve_all_droplets()) < droplet_limit:
-            raise ErrorAccountDropletLimitReached
-            (
+        if len(self.retrieve_all_droplet_records()) + new_droplets > droplet_limit:
+            raise ErrorAccountDropletLimitReached(
                 f"You have reached your droplet limit of {droplet_limit}"
             )
 
@@ -102,14 +145,46 @@ class DropletManager:
         Returns:
             [Droplet]:A droplet object containing attributes for a droplet with object id.
         """
-        if not self.does_droplet_id_exist(id):
-            raise ErrorDropletNotFound(f"Droplet with id:{id} does not exists")
+        return self.retrieve_droplets_by_ids([id])[0]
+
+    def retrieve_droplets_by_ids(self, ids: list):
+        """
+        Returns a Droplet object for each id, in the same order.
+        The ids are fetched with concurrent GETs or picked out of one droplet listing, whichever
+        BulkFetchCostModel expects to be cheaper given the inventory size, page size, measured latency and rate budget.
+
+        Args:
+            ids (list): Droplet ids.
+
+        Raises:
+            ErrorDropletNotFound: If any of the droplets doesn't exist.
+        """
+        ids = list(ids)
+        records = retrieve_records_by_ids(
+            "droplets",
+            ids,
+            self.dropletapi.retrieve_droplet_by_id,
+            "droplet",
+            self.retrieve_all_droplet_records,
+            lambda: count_listing_records(self.dropletapi.list_all_droplets),
+        )
+        missing = [id for id in ids if records[id] == None]
+        if len(missing) > 0:
+            raise ErrorDropletNotFound(
+                f"Droplet with id:{', '.join(map(str, missing))} does not exists"
+            )
+        droplet_objects = []
+        for id in ids:
+            newdroplet = Droplet(status="retrieve")
+            newdroplet.attributes = DropletAttributes(**records[id])
+            droplet_objects.append(newdroplet)
+        return droplet_objects
+
+    def droplet_from_record(self, droplet_item: dict):
         newdroplet = Droplet(status="retrieve")
-        response = self.dropletapi.retrieve_droplet_by_id(id)
-        if response:
-            content = json.loads(response.content.decode("utf-8"))
-            droplet_data = dict(content["droplet"])
-            newdroplet.attributes = DropletAttributes(**droplet_data)
+        newdroplet.attributes = DropletAttributes(
+            **intern_fields(droplet_item, INTERNED_DROPLET_FIELDS, False)
+        )
         return newdroplet
 
     def retrieve_droplets_by_name(self, name):
@@ -120,17 +195,14 @@ class DropletManager:
                 return_droplets.append(droplet)
         return return_droplets
 
-    def retrieve_all_droplets(self):
+    def retrieve_all_droplet_records(self):
         """
-        Returns an array of Droplet objects, one for each droplet in digitalocean account.
-
-        Returns:
-            [type]: [description]
+        Returns the raw api record (dict) of every droplet in digitalocean account.
         """
 
         # Build list of droplets from api, but take in to account possible pagination.
         droplet_list = []
-        page, per_page = 1, 10
+        page, per_page = 1, 200
         response = self.dropletapi.list_all_droplets(page=page, per_page=per_page)
         content = json.loads(response.content.decode("utf-8"))
         droplet_list.extend(content["droplets"])
@@ -144,15 +216,64 @@ class DropletManager:
                 droplet_list.extend(content["droplets"])
         except KeyError:
             pass
+        return droplet_list
+
+    def retrieve_all_droplets(self, lazy=False, shared_payloads=False, store=None):
+        """
+        Returns an array of Droplet objects, one for each droplet in digitalocean account.
+        With store, the droplets come from an InventoryStore, which is refreshed in the background once it is stale.
+
+        Args:
+            lazy (bool, optional): Keep each droplet's raw api record and decode attributes the first time they are read,
+                                   see LazyDropletAttributes. Defaults to False.
+            shared_payloads (bool, optional): Share one read-only instance of the nested fields that repeat between droplets
+                                              (region, size, image, tags...), see payloadinterning. Saves memory on large
+                                              listings, but those fields can't be changed in place. Defaults to False.
+            store ([type], optional): An InventoryStore, or True for the one set with enable_inventory_store.
+                                      Defaults to None, a live listing.
+
+        Returns:
+            [type]: [description]
+        """
+        store = resolve_inventory_store(store)
+        if store is None:
+            droplet_list = self.retrieve_all_droplet_records()
+        else:
+            droplet_list = store.serve("droplets", self.retrieve_all_droplet_records)
 
         # Build and return that Droplet object array.
         droplet_objects = []
         for droplet_item in droplet_list:
             newdroplet = Droplet(status="retrieve")
-            newdroplet.attributes = DropletAttributes(**droplet_item)
+            if lazy:
+                newdroplet.attributes = LazyDropletAttributes(
+                    droplet_item, shared_payloads=shared_payloads
+                )
+            else:
+                newdroplet.attributes = DropletAttributes(
+                    **intern_fields(
+                        droplet_item, INTERNED_DROPLET_FIELDS, shared_payloads
+                    )
+                )
             droplet_objects.append(newdroplet)
         return droplet_objects
 
+    def retrieve_droplet_columns(self, droplets: list = None, join_sizes=True):
+        """
+        Returns the droplet inventory as numpy columns for fleet analytics, see InventoryColumns.
+
+        Args:
+            droplets (list, optional): Droplet objects, defaults to every droplet in the account.
+            join_sizes (bool, optional): Join against the size catalog to fill price_monthly and price_hourly. Defaults to True.
+
+        Returns:
+            InventoryColumns: e.g. columns.group_totals("region", ["vcpus", "memory", "disk", "price_monthly"])
+        """
+        if droplets is None:
+            droplets = self.retrieve_all_droplets(lazy=True, shared_payloads=True)
+        sizes = self.size_manager.retrieve_sizes() if join_sizes else None
+        return droplet_columns(droplets, sizes)
+
     # def retrieve_all_droplets_by_tag(self, tag_name=None):
     #    """
     #    Returns an array of Droplet objects, one for each droplet in digitalocean account.
@@ -196,10 +317,10 @@ class DropletManager:
         if isinstance(tag, str):
             tag = [tag]
         return_droplets = []
-        droplets = self.retrieve_all_droplets()
-        for droplet in droplets:
-            if set(list(tag)) == set(droplet.attributes.tags):
-                return_droplets.append(droplet)
+        # Always a live listing, these feed the tag deletes and teardowns.
+        for droplet_item in self.retrieve_all_droplet_records():
+            if set(list(tag)) == set(droplet_item.get("tags") or []):
+                return_droplets.append(self.droplet_from_record(droplet_item))
         if len(return_droplets) > 0:
             return return_droplets
         else:
@@ -221,10 +342,10 @@ class DropletManager:
         if isinstance(tag, str):
             tag = [tag]
         return_droplets = []
-        droplets = self.retrieve_all_droplets()
-        for droplet in droplets:
-            if set(list(tag)).issubset(set(droplet.attributes.tags)):
-                return_droplets.append(droplet)
+        # Always a live listing, these feed the tag deletes and teardowns.
+        for droplet_item in self.retrieve_all_droplet_records():
+            if set(list(tag)).issubset(set(droplet_item.get("tags") or [])):
+                return_droplets.append(self.droplet_from_record(droplet_item))
         if len(return_droplets) > 0:
             return return_droplets
         else:
@@ -246,10 +367,10 @@ class DropletManager:
         if isinstance(tag, str):
             tag = [tag]
         return_droplets = []
-        droplets = self.retrieve_all_droplets()
-        for droplet in droplets:
-            if not set(list(tag)).isdisjoint(set(droplet.attributes.tags)):
-                return_droplets.append(droplet)
+        # Always a live listing, these feed the tag deletes and teardowns.
+        for droplet_item in self.retrieve_all_droplet_records():
+            if not set(list(tag)).isdisjoint(set(droplet_item.get("tags") or [])):
+                return_droplets.append(self.droplet_from_record(droplet_item))
         if len(return_droplets) > 0:
             return return_droplets
         else:
@@ -267,6 +388,175 @@ class DropletManager:
         except:
             pass
 
+    def perform_action_on_tag(self, tag_name, type, name=None, wait=True, timeout=None):
+        """
+        Performs one action on every droplet tagged with tag_name, with a single request.
+        The returned actions are tracked together by the shared ActionPoller.
+
+        Args:
+            tag_name ([type]): Droplets with this tag are acted on.
+            type ([type]): One of TAG_DROPLET_ACTION_TYPES.
+            name ([type], optional): Snapshot name, only used by the snapshot action.
+            wait (bool, optional): Block until every action finished, raising ErrorActionFailed if any errored. Defaults to True.
+            timeout (float, optional): Seconds to wait for all of them, then ErrorActionTimeout is raised.
+                                       Defaults to None, ActionManager.wait_timeout.
+
+        Returns:
+            [Action]: One action per tagged droplet.
+        """
+        if not type in TAG_DROPLET_ACTION_TYPES:
+            raise ErrorTagActionNotSupported(
+                f'"{type}" can\'t be performed by tag, use one of {TAG_DROPLET_ACTION_TYPES}'
+            )
+        response = self.dropletapi.perform_action_by_tag(tag_name, type, name)
+        if not response:
+            raise Exception(
+                f"Could not perform {type} on droplets tagged {tag_name}, {response.content}"
+            )
+        content = json.loads(response.content.decode("utf-8"))
+        # Actions from one request start together and are expected to finish together.
+        group = f"tag:{tag_name}:{type}:{time.monotonic()}"
+        actions = []
+        for action_data in content["actions"]:
+            actions.append(Action(ActionAttributes(**action_data), group=group))
+        if wait:
+            self.amanager.wait_for_actions_completion(actions, timeout=timeout)
+        return actions
+
+    def poweroff_droplets_with_tag(self, tag_name, wait=True):
+        return self.perform_action_on_tag(tag_name, "power_off", wait=wait)
+
+    def poweron_droplets_with_tag(self, tag_name, wait=True):
+        return self.perform_action_on_tag(tag_name, "power_on", wait=wait)
+
+    def powercycle_droplets_with_tag(self, tag_name, wait=True):
+        return self.perform_action_on_tag(tag_name, "power_cycle", wait=wait)
+
+    def shutdown_droplets_with_tag(self, tag_name, wait=True):
+        return self.perform_action_on_tag(tag_name, "shutdown", wait=wait)
+
+    def snapshot_droplets_with_tag(self, tag_name, name, wait=True):
+        return self.perform_action_on_tag(tag_name, "snapshot", name=name, wait=wait)
+
+    def enable_backups_droplets_with_tag(self, tag_name, wait=True):
+        return self.perform_action_on_tag(tag_name, "enable_backups", wait=wait)
+
+    def disable_backups_droplets_with_tag(self, tag_name, wait=True):
+        return self.perform_action_on_tag(tag_name, "disable_backups", wait=wait)
+
+    def enable_ipv6_droplets_with_tag(self, tag_name, wait=True):
+        return self.perform_action_on_tag(tag_name, "enable_ipv6", wait=wait)
+
+    def enable_private_networking_droplets_with_tag(self, tag_name, wait=True):
+        return self.perform_action_on_tag(
+            tag_name, "enable_private_networking", wait=wait
+        )
+
+    def run_pipelines(self, droplets: list, steps: list, wait=True):
+        """
+        Runs the same action pipeline on many droplets at once, see DropletActionPipeline.
+
+        Args:
+            droplets (list): Droplet objects.
+            steps (list): Step names or (name, {arguments}) tuples, e.g. ["shutdown", ("resize", {"size": "s-2vcpu-4gb"}), "power_on"]
+            wait (bool, optional): Block until every pipeline completed or errored, at most ActionManager.wait_timeout. Defaults to True.
+
+        Returns:
+            [list]: One DropletActionPipeline per droplet, in the same order.
+        """
+        # Every pipeline is built, and so checked, before any of them starts.
+        sizes = {}
+        pipelines = [DropletActionPipeline(droplet, steps, sizes) for droplet in droplets]
+        for pipeline in pipelines:
+            pipeline.start()
+        if wait:
+            deadline = time.monotonic() + ActionManager.wait_timeout
+            for pipeline in pipelines:
+                pipeline.wait(max(0, deadline - time.monotonic()))
+        return pipelines
+
+    def rolling(
+        self,
+        droplets: list,
+        operation,
+        max_in_flight=1,
+        max_failure_rate=None,
+        min_finished=1,
+        health_check=None,
+    ):
+        """
+        Runs an operation (e.g. a rebuild or resize) over a fleet, keeping max_in_flight droplets busy at a time.
+        The next droplet starts as soon as one finishes, see RollingOperation.
+
+        Args:
+            droplets (list): Droplet objects.
+            operation ([type]): A callable taking a droplet, e.g. lambda droplet: droplet.rebuild("ubuntu-20-04-x64"),
+                                or pipeline steps, e.g. ["shutdown", ("resize", {"size": "s-2vcpu-4gb"}), "power_on"]
+            max_in_flight (int, optional): Droplets operated on at the same time. Defaults to 1.
+            max_failure_rate (float, optional): Stop starting droplets above this failed/finished ratio. Defaults to None.
+            min_finished (int, optional): Finished droplets needed before the failure rate is trusted. Defaults to 1.
+            health_check (callable, optional): Called with each droplet after its operation, a False return is a failure.
+
+        Returns:
+            [RollingReport]: Per droplet status and timings, and whether the run stopped early.
+        """
+        return RollingOperation(
+            droplets,
+            operation,
+            max_in_flight=max_in_flight,
+            max_failure_rate=max_failure_rate,
+            min_finished=min_finished,
+            health_check=health_check,
+        ).run()
+
+    def plan_teardown(self, droplets: list = None, tag_name=None, bulk=True, wait=True):
+        """
+        Builds the plan to delete droplets, or every droplet tagged with tag_name,
+        together with their volumes, snapshots, volume snapshots and floating ips. See TeardownPlanner.
+
+        Returns:
+            [ResourcePlan]: describe() lists the steps, execute() runs them.
+        """
+        if droplets == None:
+            if tag_name == None:
+                raise ErrorDropletNotFound("Give the droplets or the tag_name to tear down")
+            droplets = self.retrieve_droplets_with_any_tags([tag_name])
+        return TeardownPlanner().plan(droplets, bulk=bulk, wait=wait)
+
+    def teardown(self, droplets: list = None, tag_name=None, bulk=True, wait=True, dry_run=False):
+        """
+        Deletes droplets, or every droplet tagged with tag_name, together with their associated resources.
+        Independent branches are deleted in parallel.
+
+        Args:
+            droplets (list, optional): Droplet objects.
+            tag_name ([type], optional): Tear down every droplet with this tag instead.
+            bulk (bool, optional): One selective destroy request per droplet, instead of one request per resource. Defaults to True.
+            wait (bool, optional): Wait for bulk destroys to finish. Defaults to True.
+            dry_run (bool, optional): Only build the plan. Defaults to False.
+
+        Returns:
+            [ResourcePlan]: The plan with per step status and latencies, see describe().
+        """
+        plan = self.plan_teardown(droplets=droplets, tag_name=tag_name, bulk=bulk, wait=wait)
+        return plan.execute(dry_run=dry_run)
+
+    def reconcile(self, specs: list, dry_run=False):
+        """
+        Brings the account to the desired state, e.g.
+        [DropletGroupSpec(name="web", count=3, region="nyc3", size="s-1vcpu-1gb", image="ubuntu-20-04-x64",
+                          tags=["web"], volume_size_gigabytes=10, floating_ip=True)]
+        Only the missing creates, attaches, resizes and deletes are run, see Reconciler.
+
+        Args:
+            specs (list): DropletGroupSpec objects.
+            dry_run (bool, optional): Only build the plan. Defaults to False.
+
+        Returns:
+            [ResourcePlan]: The plan with per step status and latencies, see describe().
+        """
+        return Reconciler(self).apply(specs, dry_run=dry_run)
+
     def delete_droplet(self, droplet: Droplet):
         if not droplet.deleted==False:
             raise ErrorDropletNotFound(f"{droplet.attributes.id} was already deleted")
@@ -283,14 +573,13 @@ class DropletManager:
 
     
     def does_droplet_id_exist(self, id):
-        droplets = self.retrieve_all_droplets()
-        for droplet in droplets:
-            if str(droplet.attributes.id) == str(id):
+        for droplet_item in self.retrieve_all_droplet_records():
+            if str(droplet_item["id"]) == str(id):
                 return True
         return False
 
 
-@dataclass
+@slotted_dataclass
 class DropletAttributes:
     id: int = None
     name: str = None
@@ -315,6 +604,53 @@ class DropletAttributes:
     vpc_uuid: list = field(default_factory=list)
 
 
+_DROPLET_ATTRIBUTE_FIELDS = {f.name: f for f in fields(DropletAttributes)}
+
+
+class LazyDropletAttributes(DropletAttributes):
+    """
+    DropletAttributes that keeps the raw api record and decodes a field the first time it is read.
+    Reads look exactly like DropletAttributes, droplet.attributes.networks etc.
+    Listings where only a few fields are used skip decoding and interning the rest.
+    """
+
+    __slots__ = ("_raw", "_shared_payloads")
+
+    def __init__(self, droplet_data: dict, shared_payloads=False):
+        self._raw = droplet_data
+        self._shared_payloads = shared_payloads
+
+    def __getattr__(self, name):
+        # Only called while the slot for name is still empty, i.e. not decoded yet.
+        if name not in _DROPLET_ATTRIBUTE_FIELDS:
+            raise AttributeError(
+                f"'{type(self).__name__}' object has no attribute '{name}'"
+            )
+        if name in self._raw:
+            value = self._raw[name]
+            if name in INTERNED_DROPLET_FIELDS:
+                if self._shared_payloads:
+                    value = intern_payload(value)
+                elif isinstance(value, str):
+                    value = sys.intern(value)
+        else:
+            attribute_field = _DROPLET_ATTRIBUTE_FIELDS[name]
+            if attribute_field.default_factory is MISSING:
+                value = attribute_field.default
+            else:
+                value = attribute_field.default_factory()
+        setattr(self, name, value)
+        return value
+
+    def __eq__(self, other):
+        if not isinstance(other, DropletAttributes):
+            return NotImplemented
+        return all(
+            getattr(self, name) == getattr(other, name)
+            for name in _DROPLET_ATTRIBUTE_FIELDS
+        )
+
+
 @dataclass
 class DropletArguments:
 
@@ -347,6 +683,9 @@ class DropletArguments:
 
 
 class Droplet:
+    # Pages of its snapshot listing create_snapshot reads at most to find the new snapshot.
+    snapshot_lookup_max_pages = 5
+
     def __init__(self, status=None):
         self.arguments = DropletArguments()
         self.attributes = DropletAttributes()
@@ -440,8 +779,7 @@ class Droplet:
         if response:
             content = json.loads(response.content.decode("utf-8"))
             action_data = dict(content["action"])
-            newaction = Action()
-            newaction.attributes = ActionAttributes(**action_data)
+            newaction = Action(ActionAttributes(**action_data))
             self.action_manager.wait_for_action_completion(newaction)
             self.lastaction = newaction
 
@@ -453,8 +791,7 @@ class Droplet:
         if response:
             content = json.loads(response.content.decode("utf-8"))
             action_data = dict(content["action"])
-            newaction = Action()
-            newaction.attributes = ActionAttributes(**action_data)
+            newaction = Action(ActionAttributes(**action_data))
             self.action_manager.wait_for_action_completion(newaction)
             self.lastaction = newaction
 
@@ -466,8 +803,7 @@ class Droplet:
         if response:
             content = json.loads(response.content.decode("utf-8"))
             action_data = dict(content["action"])
-            newaction = Action()
-            newaction.attributes = ActionAttributes(**action_data)
+            newaction = Action(ActionAttributes(**action_data))
             self.action_manager.wait_for_action_completion(newaction)
             self.lastaction = newaction
 
@@ -479,8 +815,7 @@ class Droplet:
         if response:
             content = json.loads(response.content.decode("utf-8"))
             action_data = dict(content["action"])
-            newaction = Action()
-            newaction.attributes = ActionAttributes(**action_data)
+            newaction = Action(ActionAttributes(**action_data))
             self.action_manager.wait_for_action_completion(newaction)
             self.lastaction = newaction
 
@@ -492,8 +827,7 @@ class Droplet:
         if response:
             content = json.loads(response.content.decode("utf-8"))
             action_data = dict(content["action"])
-            newaction = Action()
-            newaction.attributes = ActionAttributes(**action_data)
+            newaction = Action(ActionAttributes(**action_data))
             self.action_manager.wait_for_action_completion(newaction)
             self.lastaction = newaction
 
@@ -505,8 +839,7 @@ class Droplet:
         if response:
             content = json.loads(response.content.decode("utf-8"))
             action_data = dict(content["action"])
-            newaction = Action()
-            newaction.attributes = ActionAttributes(**action_data)
+            newaction = Action(ActionAttributes(**action_data))
             self.action_manager.wait_for_action_completion(newaction)
             self.lastaction = newaction
 
@@ -519,8 +852,7 @@ class Droplet:
         if response:
             content = json.loads(response.content.decode("utf-8"))
             action_data = dict(content["action"])
-            newaction = Action()
-            newaction.attributes = ActionAttributes(**action_data)
+            newaction = Action(ActionAttributes(**action_data))
             self.action_manager.wait_for_action_completion(newaction)
             self.lastaction = newaction
 
@@ -537,11 +869,15 @@ class Droplet:
             self.lastaction = newaction
             #print(newaction.attributes.started_at)
             #print(newaction.attributes.completed_at)
-            snapshot_objects=self.retrieve_snapshots()
-            for snapshot_object in snapshot_objects:
-                if (snapshot_object.attributes.name==name) and (snapshot_object.attributes.created_at==newaction.attributes.started_at):
-                    return snapshot_object
-            return None 
+            # The snapshot action doesn't name the snapshot id, so it is looked up by name and start time.
+            snapshot_item = self.find_snapshot_record(
+                name, started_at=newaction.attributes.started_at
+            )
+            if snapshot_item == None:
+                return None
+            newdropletsnapshot = DropletSnapshot()
+            newdropletsnapshot.attributes = DropletSnapshotAttributes(**snapshot_item)
+            return newdropletsnapshot
 
     def restore_droplet(self, image_id):
         if not self.deleted==False:
@@ -555,11 +891,17 @@ class Droplet:
             self.action_manager.wait_for_action_completion(newaction)
             self.lastaction = newaction
 
-    def resize_droplet(self, slug_size, disk_resize=False):
-        if not self.deleted==False:
-            raise ErrorDropletNotFound(f"{self.attributes.id} was deleted")
+    def check_resize(self, slug_size, desired_size=None):
+        """
+        Raises unless the droplet can be resized to slug_size.
+
+        Args:
+            slug_size ([type]): Target size slug.
+            desired_size (Size, optional): The Size for slug_size when already looked up.
+        """
+        if desired_size == None:
+            desired_size = self.size_manager.retrieve_size(slug_size)
         # OK, if you try and resize to a smaller disk you will fail.
-        desired_size = self.size_manager.retrieve_size(slug_size)
         target_disk_size = desired_size.attributes.disk
         current_disk_size = self.attributes.disk
         if target_disk_size < current_disk_size:
@@ -567,6 +909,11 @@ class Droplet:
                 "You can't resize to a smaller disk, resize to same disk size with different RAM memory instead"
             )
 
+    def resize_droplet(self, slug_size, disk_resize=False):
+        if not self.deleted==False:
+            raise ErrorDropletNotFound(f"{self.attributes.id} was deleted")
+        self.check_resize(slug_size)
+
         id = self.attributes.id
         response = self.dropletapi.resize_droplet(
             id, slug_size, disk_resize=disk_resize
@@ -574,13 +921,30 @@ class Droplet:
         if response:
             content = json.loads(response.content.decode("utf-8"))
             action_data = dict(content["action"])
-            newaction = Action()
-            newaction.attributes = ActionAttributes(**action_data)
+            newaction = Action(ActionAttributes(**action_data))
             self.action_manager.wait_for_action_completion(newaction)
             self.lastaction = newaction
 
             self.poweron()
 
+    def run_pipeline(self, steps: list, wait=True):
+        """
+        Runs a sequence of actions on this droplet, each step starting as soon as the previous one completed.
+
+        Args:
+            steps (list): Step names or (name, {arguments}) tuples, e.g. ["shutdown", ("resize", {"size": "s-2vcpu-4gb"}), "power_on"]
+            wait (bool, optional): Block until the pipeline completed or errored. Defaults to True.
+
+        Returns:
+            [DropletActionPipeline]: status, per step results and timings.
+        """
+        if not self.deleted==False:
+            raise ErrorDropletNotFound(f"{self.attributes.id} was deleted")
+        pipeline = DropletActionPipeline(self, steps).start()
+        if wait:
+            pipeline.wait()
+        return pipeline
+
     def delete(self):
         if not self.deleted==False:
             raise ErrorDropletNotFound(f"{self.attributes.id} was deleted")
@@ -617,6 +981,71 @@ class Droplet:
             dropletsnapshot_objects.append(newdropletsnapshot)
         return dropletsnapshot_objects
 
+    def find_snapshot_record(self, name, started_at=None, per_page=200):
+        """
+        Looks up a snapshot of the droplet by name, reading at most Droplet.snapshot_lookup_max_pages pages.
+
+        The api lists oldest first, so after the first page (for the total) the pages are read from the last one back,
+        but nothing is assumed about the order of the records, every record of a page read is matched.
+        With started_at, only a snapshot created at or after it matches, e.g. the one a snapshot action made.
+
+        Args:
+            name ([type]): Snapshot name.
+            started_at ([type], optional): Timestamp the snapshot can't be older than.
+            per_page (int, optional): Snapshots per page. Defaults to 200.
+
+        Returns:
+            [dict]: The raw api record, the newest match, or None when none of the pages read has it.
+        """
+        if not self.deleted==False:
+            raise ErrorDropletNotFound(f"{self.attributes.id} was deleted")
+        id = self.attributes.id
+        started_at = parse_timestamp(started_at)
+
+        def matches(snapshot_item):
+            if not snapshot_item.get("name") == name:
+                return False
+            if started_at == None:
+                return True
+            created_at = parse_timestamp(snapshot_item.get("created_at"))
+            return not created_at == None and created_at >= started_at
+
+        def newest(snapshot_items):
+            # Records without a created_at sort as the oldest.
+            return max(
+                snapshot_items,
+                key=lambda snapshot_item: parse_timestamp(snapshot_item.get("created_at"))
+                or datetime.datetime.min.replace(tzinfo=datetime.timezone.utc),
+            )
+
+        response = self.dropletapi.list_snapshots_for_droplet(id=id, page=1, per_page=per_page)
+        if not response:
+            raise ErrorDropletNotFound(
+                f"Could not list the snapshots of droplet {id}, {response.content}"
+            )
+        content = json.loads(response.content.decode("utf-8"))
+        found = [item for item in content["snapshots"] if matches(item)]
+        try:
+            total = content["meta"]["total"]
+        except KeyError:
+            total = len(content["snapshots"])
+        last_page = max(1, math.ceil(total / per_page))
+        pages = list(range(last_page, 1, -1))[: max(0, self.snapshot_lookup_max_pages - 1)]
+        for page in pages:
+            if len(found) > 0 and not started_at == None:
+                # Only one snapshot can match a snapshot action, no need to read further.
+                break
+            response = self.dropletapi.list_snapshots_for_droplet(
+                id=id, page=page, per_page=per_page
+            )
+            if not response:
+                raise ErrorDropletNotFound(
+                    f"Could not list the snapshots of droplet {id}, {response.content}"
+                )
+            content = json.loads(response.content.decode("utf-8"))
+            found.extend(item for item in content["snapshots"] if matches(item))
+        return newest(found) if len(found) > 0 else None
+
     def retrieve_snapshot_by_id(self,snapshot_id):
         snapshots=self.retrieve_snapshots()
         for snapshot in snapshots:
@@ -628,77 +1057,124 @@ class Droplet:
         if not self.deleted==False:
             raise ErrorDropletNotFound(f"{self.attributes.id} was deleted")
         self.update()
-        volume_ids = self.attributes.volume_ids
-        # build volume objects and add to list
-        volume_objects = []
-        for volume_id in volume_ids:
-            newvolume = self.volume_manager.retrieve_volume_by_id(volume_id)
-            volume_objects.append(newvolume)
-        return volume_objects
+        return self.volume_manager.retrieve_volumes_by_ids(self.attributes.volume_ids)
 
     def count_associated_volumes(self):
         if not self.deleted==False:
             raise ErrorDropletNotFound(f"{self.attributes.id} was deleted")
-        volumes = self.retrieve_associated_volumes()
-        return len(volumes)
+        # The droplet lists its volume ids, no need to fetch the volumes.
+        self.update()
+        return len(self.attributes.volume_ids)
 
     def retrieve_associated_volume_snapshots(self):
         if not self.deleted==False:
             raise ErrorDropletNotFound(f"{self.attributes.id} was deleted")
         self.update() 
-        volume_snapshot_ids = self.attributes.snapshot_ids
-        # build volume objects and add to list
-        volume_snapshot_objects = []
-        for volume_snapshot_id in volume_snapshot_ids:
-            newvolume_snapshot = self.snapshot_manager.retrieve_snapshot_id(
-                volume_snapshot_id
-            )
-            volume_snapshot_objects.append(newvolume_snapshot)
-        return volume_snapshot_objects
+        # snapshot_ids are the droplet's own snapshots, a listing only needs droplet snapshots.
+        return self.snapshot_manager.retrieve_snapshots_by_ids(
+            self.attributes.snapshot_ids, resource_type="droplet"
+        )
 
     def count_associated_volume_snapshots(self):
         if not self.deleted==False:
             raise ErrorDropletNotFound(f"{self.attributes.id} was deleted")
-        volume_snapshots = self.retrieve_associated_volume_snapshots()
-        return len(volume_snapshots)
+        self.update()
+        return len(self.attributes.snapshot_ids)
 
     def attach_a_volume(self, target_volume:Volume):
+        """
+        Attaches a volume, detaching it from its current droplet first if needed.
+        The region check, the attached volume count and the volume's current attachment come from
+        one droplet GET and one volume GET, made concurrently.
+        """
+        self.attach_volumes([target_volume])
 
+    def attach_volumes(self, target_volumes: list):
+        """
+        Attaches volumes to this droplet, e.g. the 7 data volumes of a new node.
 
-        # Must check if the target_volume is in the same region
-        if not self.attributes.region == target_volume.attributes.region:
-            raise ErrorNotSameRegion(
-                f"Volume {target_volume.attributes.id} not is same regions as Droplet {self.attributes.id}"
-            )
+        One droplet GET and one GET per volume (concurrently) decide everything up front,
+        volumes attached elsewhere are detached concurrently, volumes already attached here are skipped.
+        The attaches then run one after the other, a droplet only takes one volume attach at a time.
 
+        Args:
+            target_volumes (list): Volume objects.
+        """
+        if not self.deleted==False:
+            raise ErrorDropletNotFound(f"{self.attributes.id} was deleted")
+        _update_concurrently([self] + list(target_volumes))
+
+        # Must check if the target volumes are in the same region
+        region_slug = _region_slug(self.attributes.region)
+        for target_volume in target_volumes:
+            if not _region_slug(target_volume.attributes.region) == region_slug:
+                raise ErrorNotSameRegion(
+                    f"Volume {target_volume.attributes.id} not is same regions as Droplet {self.attributes.id}"
+                )
+
+        attached_volume_ids = list(self.attributes.volume_ids or [])
+        to_attach = [
+            target_volume
+            for target_volume in target_volumes
+            if not target_volume.attributes.id in attached_volume_ids
+        ]
         # Only 7 volumes allowed to be attached per droplet.
-        self.update()
-        if not self.count_associated_volumes() <=7 :
+        if len(attached_volume_ids) + len(to_attach) > 7:
             raise ErrorDropletAttachedVolumeCountAlreadAtLimit(
-                f"Droplet id:{self.attributes.id} already has the maximum of 7 attached volumes"
+                f"Droplet id:{self.attributes.id} has {len(attached_volume_ids)} attached volumes, attaching {len(to_attach)} more is over the maximum of 7"
             )
-        # Volumes can only be attached to one droplet
-        ##remove volume from other droplets first
-        target_volume.detach_from_droplets()
+        if len(to_attach) == 0:
+            return
 
-        response = self.volumeapi.attach_volume_to_droplet(
-            target_volume.attributes.id, self.attributes.id,self.attributes.region['slug']
+        # Volumes can only be attached to one droplet
+        ##remove volume from other droplets first, only for the volumes that are attached somewhere
+        attached_elsewhere = [
+            target_volume
+            for target_volume in to_attach
+            if len(target_volume.attributes.droplet_ids or []) > 0
+        ]
+        outcomes = run_bounded(
+            lambda target_volume: target_volume.detach_from_droplet_ids(
+                target_volume.attributes.droplet_ids
+            ),
+            attached_elsewhere,
+            max_in_flight=len(attached_elsewhere),
         )
-        if response:
-            content = json.loads(response.content.decode("utf-8"))
-            action_data = dict(content["action"])
-            newaction=Action(ActionAttributes(**action_data))
-            self.action_manager.wait_for_action_completion(newaction)
-            self.lastaction=newaction 
-            self.update()
-            target_volume.update()
+        for _, error in outcomes:
+            if not error == None:
+                raise error
+
+        for target_volume in to_attach:
+            response = self.volumeapi.attach_volume_to_droplet(
+                target_volume.attributes.id, self.attributes.id, region_slug
+            )
+            if response:
+                content = json.loads(response.content.decode("utf-8"))
+                action_data = dict(content["action"])
+                newaction=Action(ActionAttributes(**action_data))
+                self.action_manager.wait_for_action_completion(newaction)
+                self.lastaction=newaction
+                target_volume.lastaction=newaction
+            else:
+                raise Exception(
+                    f"Could not attach volume {target_volume.attributes.id} to droplet {self.attributes.id}, {response.content}"
+                )
+        _update_concurrently([self] + to_attach)
 
     def detach_a_volume(self, target_volume:Volume):
         target_volume.detach_from_droplets()
-        self.update()
-        target_volume.update()
+        _update_concurrently([self, target_volume])
+
+
 
 
+def _update_concurrently(objects: list):
+    # Droplet and Volume updates are independent GETs, run them side by side.
+    # Every update runs, then the first error is raised, so no caller goes on with stale attributes.
+    outcomes = run_bounded(lambda item: item.update(), objects, max_in_flight=len(objects))
+    for _, error in outcomes:
+        if not error == None:
+            raise error
 
 
 if __name__ == "__main__":
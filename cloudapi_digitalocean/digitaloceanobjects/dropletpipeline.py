@@ -0,0 +1,321 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from ..digitaloceanapi.droplets import Droplets
+from ..common.cloudapiexceptions import *
+from .action import *
+from .size import SizeManager
+import json
+import threading
+import time
+
+
+# How each pipeline step is submitted, step name -> (Droplets api method, required arguments, optional arguments).
+PIPELINE_STEPS = {
+    "reboot": ("reboot_droplet", [], []),
+    "shutdown": ("shutdown_droplet", [], []),
+    "power_on": ("poweron_droplet", [], []),
+    "power_off": ("poweroff_droplet", [], []),
+    "power_cycle": ("powercycle_droplet", [], []),
+    "rebuild": ("rebuild_droplet", ["image"], []),
+    "rename": ("rename_droplet", ["name"], []),
+    "snapshot": ("create_snapshot_from_droplet", ["name"], []),
+    "restore": ("restore_droplet", ["image_id"], []),
+    "resize": ("resize_droplet", ["size"], ["disk_resize"]),
+}
+
+
+@dataclass
+class PipelineStepResult:
+    type: str = None
+    action: object = None
+    submitted_at: float = None
+    finished_at: float = None
+    seconds: float = None
+    error: str = None
+
+
+class DropletActionPipeline:
+    """
+    Runs a sequence of droplet actions, e.g. shutdown -> resize -> power_on -> snapshot.
+
+    Each step is submitted as soon as the shared ActionPoller sees the previous step finish, no thread blocks
+    in between, so the pipelines of many droplets run side by side and share the api rate budget.
+    The pipeline stops at the first step that errors or can't be submitted.
+
+    Steps are a step name from PIPELINE_STEPS, or a (name, {arguments}) tuple:
+        ["shutdown", ("resize", {"size": "s-2vcpu-4gb"}), "power_on", ("snapshot", {"name": "after-resize"})]
+    """
+
+    def __init__(self, droplet, steps: list, sizes: dict = None):
+        """
+        Every step is checked here, before anything is submitted, so a bad step never leaves droplets half way through.
+
+        Args:
+            droplet (Droplet): The droplet to run the steps on, None only checks the steps.
+            steps (list): Step names or (name, {arguments}) tuples.
+            sizes (dict, optional): Size slug -> Size, shared between pipelines so each resize target is looked up once.
+
+        Raises:
+            ErrorPipelineStepNotSupported: For an unknown step, or a step with unknown or missing arguments.
+            ErrorDropletSlugSizeNotFound: For a resize to a size that doesn't exist.
+            ErrorDropletResizeDiskError: For a resize the droplet can't take, see Droplet.check_resize.
+        """
+        self.droplet = droplet
+        self.steps = []
+        for step in steps:
+            step_type, arguments = (step, {}) if isinstance(step, str) else step
+            if not step_type in PIPELINE_STEPS:
+                raise ErrorPipelineStepNotSupported(
+                    f'"{step_type}" is not a pipeline step, use one of {list(PIPELINE_STEPS)}'
+                )
+            method_name, required_arguments, optional_arguments = PIPELINE_STEPS[step_type]
+            unknown_arguments = set(arguments) - set(required_arguments + optional_arguments)
+            if len(unknown_arguments) > 0:
+                raise ErrorPipelineStepNotSupported(
+                    f'"{step_type}" does not take {sorted(unknown_arguments)}'
+                )
+            missing_arguments = set(required_arguments) - set(arguments)
+            if len(missing_arguments) > 0:
+                raise ErrorPipelineStepNotSupported(
+                    f'"{step_type}" needs {sorted(missing_arguments)}'
+                )
+            self.steps.append((step_type, dict(arguments)))
+        if not droplet == None:
+            sizes = {} if sizes == None else sizes
+            for step_type, arguments in self.steps:
+                if step_type == "resize":
+                    if not arguments["size"] in sizes:
+                        sizes[arguments["size"]] = SizeManager().retrieve_size(
+                            arguments["size"]
+                        )
+                    droplet.check_resize(arguments["size"], sizes[arguments["size"]])
+        self.dropletapi = Droplets()
+        self.results = []
+        self.status = None
+        self.started_at = None
+        self.finished_at = None
+        self.finished = threading.Event()
+
+    def start(self):
+        """
+        Submits the first step and returns, the rest follow as each step completes.
+        """
+        self.status = "in-progress"
+        self.started_at = time.monotonic()
+        self.submit_next_step()
+        return self
+
+    def wait(self, timeout=None):
+        """
+        Blocks until the pipeline completed or errored.
+
+        Args:
+            timeout (float, optional): Seconds to wait. Defaults to None, ActionManager.wait_timeout.
+
+        Raises:
+            ErrorActionTimeout: If the pipeline didn't finish in time, it carries on in the background.
+
+        Returns:
+            DropletActionPipeline: self, see status and results.
+        """
+        if timeout == None:
+            timeout = ActionManager.wait_timeout
+        if not self.finished.wait(timeout):
+            raise ErrorActionTimeout(
+                f"Pipeline of droplet {self.droplet.attributes.id} didn't finish within {timeout}s"
+            )
+        return self
+
+    def submit_next_step(self):
+        if len(self.results) == len(self.steps):
+            self.finish("completed")
+            return
+        step_type, arguments = self.steps[len(self.results)]
+        result = PipelineStepResult(type=step_type, submitted_at=time.monotonic())
+        self.results.append(result)
+        method_name = PIPELINE_STEPS[step_type][0]
+        # This runs on the poller callback thread for every step after the first,
+        # anything that goes wrong must finish the pipeline or wait() never returns.
+        try:
+            response = getattr(self.dropletapi, method_name)(
+                self.droplet.attributes.id, **arguments
+            )
+            if not response:
+                raise Exception(f"Could not submit {step_type}, {response.content}")
+            content = json.loads(response.content.decode("utf-8"))
+            action_attributes = ActionAttributes(**content["action"])
+            if action_attributes.id == None:
+                raise Exception(f"Submitting {step_type} returned no action to follow")
+            result.action = Action(action_attributes, on_finished=self.step_finished)
+            self.droplet.lastaction = result.action
+        except Exception as error:
+            result.error = str(error)
+            self.finish("errored")
+
+    def step_finished(self, action: Action):
+        result = self.results[-1]
+        result.finished_at = time.monotonic()
+        result.seconds = result.finished_at - result.submitted_at
+        # Only a completed action moves on, an errored one or one the poller gave up on
+        # (the api doesn't know it) leaves the droplet in an unknown state.
+        if not action.attributes.status == "completed":
+            result.error = f"Action {action.attributes.id},{action.attributes.type} {action.attributes.status}"
+            self.finish("errored")
+            return
+        self.submit_next_step()
+
+    def finish(self, status):
+        self.status = status
+        self.finished_at = time.monotonic()
+        self.finished.set()
+
+    @property
+    def seconds(self):
+        if self.started_at is None or self.finished_at is None:
+            return None
+        return self.finished_at - self.started_at
+
+
+@dataclass
+class RollingDropletResult:
+    droplet: object = None
+    status: str = "skipped"
+    started_at: float = None
+    finished_at: float = None
+    seconds: float = None
+    error: str = None
+    pipeline: DropletActionPipeline = None
+
+
+@dataclass
+class RollingReport:
+    results: list = None
+    stopped_early: bool = False
+    seconds: float = None
+
+    def count(self, status):
+        return sum(1 for result in self.results if result.status == status)
+
+    @property
+    def failure_rate(self):
+        done = self.count("completed") + self.count("failed")
+        return self.count("failed") / done if done > 0 else 0.0
+
+
+class RollingOperation:
+    """
+    Runs an operation over a fleet of droplets with at most max_in_flight of them busy at any time.
+
+    The next droplet starts the moment one finishes, so throughput is the best the availability limit allows.
+    Once the failure rate of the finished droplets goes over max_failure_rate no new droplet is started,
+    the ones in flight are finished and the rest are reported as skipped.
+    """
+
+    def __init__(
+        self,
+        droplets: list,
+        operation,
+        max_in_flight=1,
+        max_failure_rate=None,
+        min_finished=1,
+        health_check=None,
+    ):
+        """
+        Args:
+            droplets (list): Droplet objects, operated on in this order.
+            operation ([type]): A callable taking a droplet (a raised exception or a False return is a failure),
+                                or DropletActionPipeline steps, e.g. [("rebuild", {"image": "ubuntu-20-04-x64"})].
+            max_in_flight (int, optional): Droplets operated on at the same time. Defaults to 1.
+            max_failure_rate (float, optional): Stop starting droplets above this failed/finished ratio. Defaults to None, never stop.
+            min_finished (int, optional): Finished droplets needed before the failure rate is trusted. Defaults to 1.
+            health_check (callable, optional): Called with each droplet after its operation, a False return is a failure.
+        """
+        if max_in_flight < 1:
+            raise ValueError("max_in_flight must be at least 1")
+        self.sizes = {}
+        if not callable(operation):
+            # Fail on bad steps, and on resizes any droplet can't take, before any droplet is touched.
+            DropletActionPipeline(None, operation)
+            for droplet in droplets:
+                DropletActionPipeline(droplet, operation, self.sizes)
+        self.droplets = list(droplets)
+        self.operation = operation
+        self.max_in_flight = max_in_flight
+        self.max_failure_rate = max_failure_rate
+        self.min_finished = min_finished
+        self.health_check = health_check
+        self.condition = threading.Condition()
+
+    def run(self):
+        """
+        Returns:
+            [RollingReport]: One RollingDropletResult per droplet, in the same order, with its status and timings.
+        """
+        report = RollingReport(
+            results=[RollingDropletResult(droplet=droplet) for droplet in self.droplets]
+        )
+        started_at = time.monotonic()
+        in_flight = 0
+        finished = 0
+        failed = 0
+        position = 0
+        with self.condition:
+            while position < len(report.results) or in_flight > 0:
+                if (
+                    not self.max_failure_rate == None
+                    and finished >= self.min_finished
+                    and failed / finished > self.max_failure_rate
+                ):
+                    report.stopped_early = True
+                if (
+                    in_flight < self.max_in_flight
+                    and position < len(report.results)
+                    and not report.stopped_early
+                ):
+                    result = report.results[position]
+                    position = position + 1
+                    in_flight = in_flight + 1
+                    result.status = "in-progress"
+                    threading.Thread(target=self.operate, args=(result,)).start()
+                    continue
+                if in_flight == 0:
+                    break
+                self.condition.wait()
+                # Recount, several droplets may have finished since the last wake up.
+                finished = sum(
+                    1 for r in report.results if r.status in ("completed", "failed")
+                )
+                failed = sum(1 for r in report.results if r.status == "failed")
+                in_flight = sum(1 for r in report.results if r.status == "in-progress")
+        report.seconds = time.monotonic() - started_at
+        return report
+
+    def operate(self, result: RollingDropletResult):
+        result.started_at = time.monotonic()
+        succeeded = False
+        try:
+            if callable(self.operation):
+                succeeded = not self.operation(result.droplet) is False
+            else:
+                result.pipeline = DropletActionPipeline(
+                    result.droplet, self.operation, self.sizes
+                ).start()
+                result.pipeline.wait()
+                succeeded = result.pipeline.status == "completed"
+                if not succeeded:
+                    result.error = next(
+                        (r.error for r in result.pipeline.results if r.error), None
+                    )
+            if succeeded and not self.health_check == None:
+                succeeded = bool(self.health_check(result.droplet))
+                if not succeeded:
+                    result.error = "Health check failed"
+        except Exception as error:
+            succeeded = False
+            result.error = str(error)
+        with self.condition:
+            result.finished_at = time.monotonic()
+            result.seconds = result.finished_at - result.started_at
+            result.status = "completed" if succeeded else "failed"
+            self.condition.notify()
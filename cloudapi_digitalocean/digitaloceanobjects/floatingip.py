@@ -8,13 +8,14 @@ from .droplet import *
 from .region import *
 from .account import *
 from ..common.cloudapiexceptions import *
+from ..common.slotteddataclass import slotted_dataclass
 import json
 import threading
 import time
 import re
 
 
-@dataclass
+@slotted_dataclass
 class FloatingIPAttributes:
     ip: str = None
     region: object = None
@@ -31,7 +32,7 @@ class FloatingIPManager:
 
     def check_limit(self):
         floating_ip_limit = self.account_manager.floating_ip_limit()
-        if not len(self.retreive_all_floating_ips()) < floating_ip_limit:
+        if not len(self.retrieve_all_floating_ips()) < floating_ip_limit:
             raise ErrorAccountFloatingIPLimitReached(
                 f"You have reached your floating ip limit of {floating_ip_limit}"
             )
@@ -79,7 +80,7 @@ class FloatingIPManager:
             return newfloatingip
 
     def check_droplet_for_floating_ip(self, droplet: Droplet):
-        floating_ips = self.retreive_all_floating_ips()
+        floating_ips = self.retrieve_all_floating_ips()
         for floating_ip in floating_ips:
             if not floating_ip.attributes.droplet == None:
                 if floating_ip.attributes.droplet["id"] == droplet.attributes.id:
@@ -100,7 +101,7 @@ class FloatingIPManager:
             raise ErrorRegionDoesNotExist(f'"{region_slug}" not a valid region')
 
     def retrieve_floating_ip(self, ip):
-        floatingips = self.retreive_all_floating_ips()
+        floatingips = self.retrieve_all_floating_ips()
         for floatingip in floatingips:
             if floatingip.attributes.ip == ip:
                 return floatingip
@@ -121,24 +122,24 @@ class FloatingIP:
         self.floatingipapi.delete_floating_ip(self.attributes.ip)
 
     def unassign(self):
-        newaction = Action()
         response = self.floatingipapi.unassign_floating_ip(self.attributes.ip)
         if response:
             content = json.loads(response.content.decode("utf-8"))
-            newaction.attributes = ActionAttributes(content["action"])
+            newaction = Action(ActionAttributes(**content["action"]))
             self.action_manager.wait_for_action_completion(newaction)
+            self.lastaction = newaction
 
     def attach_to_droplet(self, droplet: Droplet):
         if not self.floatingip_manager.check_droplet_for_floating_ip(droplet) == None:
             self.unassign()
-        newaction = Action()
         response = self.floatingipapi.assign_floating_ip_to_droplet(
             self.attributes.ip, droplet.attributes.id
         )
         if response:
             content = json.loads(response.content.decode("utf-8"))
-            newaction.attributes = ActionAttributes(content["action"])
+            newaction = Action(ActionAttributes(**content["action"]))
             self.action_manager.wait_for_action_completion(newaction)
+            self.lastaction = newaction
 
     def retrieve_all_actions(self):
         action_list = []
@@ -160,8 +161,7 @@ class FloatingIP:
         # Build and return that Droplet object array.
         action_objects = []
         for action_item in action_list:
-            newaction = Action()
-            newaction.attributes = ActionAttributes(**action_item)
+            newaction = Action(ActionAttributes(**action_item))
             action_objects.append(newaction)
         return action_objects
 
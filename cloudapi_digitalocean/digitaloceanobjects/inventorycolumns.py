@@ -0,0 +1,372 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+def _require_numpy():
+    if numpy is None:
+        raise ImportError(
+            "Columnar inventory export needs numpy, install it with: pip install numpy"
+        )
+
+
+def categorical(values: list):
+    """
+    Encodes a list of labels as integer codes.
+
+    Args:
+        values (list): One label per row, e.g. the region slug of every droplet.
+
+    Returns:
+        (numpy.ndarray, list): The code of each row, and the label of each code.
+    """
+    _require_numpy()
+    categories = {}
+    codes = numpy.fromiter(
+        (categories.setdefault(value, len(categories)) for value in values),
+        dtype=numpy.int32,
+        count=len(values),
+    )
+    return codes, list(categories)
+
+
+def tag_matrix(tag_lists: list):
+    """
+    Encodes the tags of every row as a boolean membership matrix.
+
+    Args:
+        tag_lists (list): One list of tags per row.
+
+    Returns:
+        (numpy.ndarray, list): matrix[row, code] is True if the row has the tag, and the tag of each code.
+    """
+    _require_numpy()
+    categories = {}
+    rows, codes = [], []
+    for row, tags in enumerate(tag_lists):
+        for tag in tags:
+            rows.append(row)
+            codes.append(categories.setdefault(tag, len(categories)))
+    matrix = numpy.zeros((len(tag_lists), len(categories)), dtype=bool)
+    matrix[rows, codes] = True
+    return matrix, list(categories)
+
+
+@dataclass
+class InventoryColumns:
+    """
+    A columnar copy of an inventory, one row per droplet or volume.
+
+    records:    A numpy structured array, categorical columns (region, size_slug, status...) hold integer codes.
+    categories: The label for each code, indexed by column name, e.g. categories["region"][code] == "nyc3".
+    tags:       Boolean tag membership matrix, tags[row, code] with labels in categories["tags"].
+    """
+
+    records: object = None
+    categories: dict = field(default_factory=dict)
+    tags: object = None
+
+    def __len__(self):
+        return len(self.records)
+
+    def code(self, column, label):
+        """
+        Returns the code for label in a categorical column, or -1 if no row has it.
+        """
+        try:
+            return self.categories[column].index(label)
+        except ValueError:
+            return -1
+
+    def mask(self, column, label):
+        """
+        Returns a boolean row mask, True where the categorical column equals label.
+        """
+        return self.records[column] == self.code(column, label)
+
+    def tag_mask(self, tag):
+        """
+        Returns a boolean row mask, True for rows tagged with tag.
+        """
+        code = self.code("tags", tag)
+        if code < 0:
+            return numpy.zeros(len(self.records), dtype=bool)
+        return self.tags[:, code]
+
+    def group_counts(self, by, where=None):
+        """
+        Counts rows per label of a categorical column (or per tag when by="tags").
+
+        Args:
+            by (str): Categorical column name, or "tags".
+            where (numpy.ndarray, optional): Boolean row mask to count only some rows.
+
+        Returns:
+            dict: label -> count
+        """
+        if by == "tags":
+            tags = self.tags if where is None else self.tags[where]
+            counts = tags.sum(axis=0)
+        else:
+            codes = self.records[by] if where is None else self.records[by][where]
+            counts = numpy.bincount(codes, minlength=len(self.categories[by]))
+        return dict(zip(self.categories[by], counts.tolist()))
+
+    def missing(self, column):
+        """
+        Returns a boolean row mask, True where the numeric column is NaN, e.g. a price with no size in the catalog.
+        """
+        return numpy.isnan(self.records[column].astype(numpy.float64))
+
+    def group_totals(self, by, columns, where=None):
+        """
+        Sums numeric columns per label of a categorical column (or per tag when by="tags").
+        A total is NaN when any of its rows is missing a value, see missing().
+
+        Args:
+            by (str): Categorical column name, or "tags".
+            columns (list): Numeric column names to total, e.g. ["vcpus", "memory", "price_monthly"].
+            where (numpy.ndarray, optional): Boolean row mask to total only some rows.
+
+        Returns:
+            dict: label -> {column: total}
+        """
+        if isinstance(columns, str):
+            columns = [columns]
+        records = self.records if where is None else self.records[where]
+        totals = {}
+        if by == "tags":
+            tags = (self.tags if where is None else self.tags[where]).astype(
+                numpy.float64
+            )
+            for column in columns:
+                values = records[column].astype(numpy.float64)
+                missing = numpy.isnan(values)
+                # A NaN in the product would spread to every tag, so sum the known values
+                # and mark only the tags that have a missing row.
+                total = tags.T @ numpy.where(missing, 0.0, values)
+                total[(tags.T @ missing.astype(numpy.float64)) > 0] = numpy.nan
+                totals[column] = total
+        else:
+            for column in columns:
+                totals[column] = numpy.bincount(
+                    records[by],
+                    weights=records[column].astype(numpy.float64),
+                    minlength=len(self.categories[by]),
+                )
+        return {
+            label: {column: totals[column][code].item() for column in columns}
+            for code, label in enumerate(self.categories[by])
+        }
+
+    def totals(self, columns, where=None):
+        """
+        Sums numeric columns over every row (or the rows in where).
+        A total is NaN when any of its rows is missing a value, see missing().
+
+        Returns:
+            dict: column -> total
+        """
+        if isinstance(columns, str):
+            columns = [columns]
+        records = self.records if where is None else self.records[where]
+        return {
+            column: numpy.sum(records[column].astype(numpy.float64)).item()
+            for column in columns
+        }
+
+
+def droplet_columns(droplets: list, sizes: list = None):
+    """
+    Builds InventoryColumns from Droplet objects.
+
+    Args:
+        droplets (list): Droplet objects.
+        sizes (list, optional): Size objects from SizeManager.retrieve_sizes(), joined on size slug
+                                to fill price_monthly and price_hourly. Prices are NaN when not given, or for a
+                                size slug that is not in sizes, so price totals over those rows are NaN too.
+
+    Returns:
+        InventoryColumns: Columns id, region, size_slug, status, vcpus, memory, disk, price_monthly, price_hourly.
+    """
+    _require_numpy()
+    attributes = [droplet.attributes for droplet in droplets]
+    region_codes, regions = categorical(
+        [_region_slug(a.region) for a in attributes]
+    )
+    size_codes, size_slugs = categorical([a.size_slug for a in attributes])
+    status_codes, statuses = categorical([a.status for a in attributes])
+    tags, tag_labels = tag_matrix([a.tags or [] for a in attributes])
+
+    records = numpy.zeros(
+        len(attributes),
+        dtype=[
+            ("id", numpy.int64),
+            ("region", numpy.int32),
+            ("size_slug", numpy.int32),
+            ("status", numpy.int32),
+            ("vcpus", numpy.int32),
+            ("memory", numpy.int64),
+            ("disk", numpy.int64),
+            ("price_monthly", numpy.float64),
+            ("price_hourly", numpy.float64),
+        ],
+    )
+    records["id"] = [a.id or 0 for a in attributes]
+    records["region"] = region_codes
+    records["size_slug"] = size_codes
+    records["status"] = status_codes
+    records["vcpus"] = [a.vcpus or 0 for a in attributes]
+    records["memory"] = [a.memory or 0 for a in attributes]
+    records["disk"] = [a.disk or 0 for a in attributes]
+
+    # Join against the size catalog per size slug category, then broadcast to rows by code.
+    price_monthly = numpy.full(len(size_slugs), numpy.nan)
+    price_hourly = numpy.full(len(size_slugs), numpy.nan)
+    if sizes is not None:
+        catalog = {size.attributes.slug: size.attributes for size in sizes}
+        for code, slug in enumerate(size_slugs):
+            if slug in catalog:
+                price_monthly[code] = catalog[slug].price_monthly
+                price_hourly[code] = catalog[slug].price_hourly
+    if len(attributes) > 0:
+        records["price_monthly"] = price_monthly[size_codes]
+        records["price_hourly"] = price_hourly[size_codes]
+
+    return InventoryColumns(
+        records=records,
+        categories={
+            "region": regions,
+            "size_slug": size_slugs,
+            "status": statuses,
+            "tags": tag_labels,
+        },
+        tags=tags,
+    )
+
+
+def volume_columns(volumes: list):
+    """
+    Builds InventoryColumns from Volume objects.
+
+    Args:
+        volumes (list): Volume objects.
+
+    Returns:
+        InventoryColumns: Columns id, region, filesystem_type, size_gigabytes, droplet_id (-1 when unattached).
+    """
+    _require_numpy()
+    attributes = [volume.attributes for volume in volumes]
+    region_codes, regions = categorical(
+        [_region_slug(a.region) for a in attributes]
+    )
+    filesystem_codes, filesystem_types = categorical(
+        [a.filesystem_type for a in attributes]
+    )
+    tags, tag_labels = tag_matrix([a.tags or [] for a in attributes])
+
+    records = numpy.zeros(
+        len(attributes),
+        dtype=[
+            ("id", "U36"),
+            ("region", numpy.int32),
+            ("filesystem_type", numpy.int32),
+            ("size_gigabytes", numpy.int64),
+            ("droplet_id", numpy.int64),
+        ],
+    )
+    records["id"] = [a.id or "" for a in attributes]
+    records["region"] = region_codes
+    records["filesystem_type"] = filesystem_codes
+    records["size_gigabytes"] = [a.size_gigabytes or 0 for a in attributes]
+    records["droplet_id"] = [
+        a.droplet_ids[0] if a.droplet_ids else -1 for a in attributes
+    ]
+
+    return InventoryColumns(
+        records=records,
+        categories={
+            "region": regions,
+            "filesystem_type": filesystem_types,
+            "tags": tag_labels,
+        },
+        tags=tags,
+    )
+
+
+def action_columns(action_records: list):
+    """
+    Builds InventoryColumns from raw action records (dicts).
+
+    Args:
+        action_records (list): Raw api action records.
+
+    Returns:
+        InventoryColumns: Columns id, type, status, resource_type, region_slug, resource_id,
+                          started_at and completed_at (numpy datetime64, NaT when missing).
+    """
+    _require_numpy()
+    type_codes, types = categorical([record.get("type") for record in action_records])
+    status_codes, statuses = categorical(
+        [record.get("status") for record in action_records]
+    )
+    resource_type_codes, resource_types = categorical(
+        [record.get("resource_type") for record in action_records]
+    )
+    region_codes, regions = categorical(
+        [record.get("region_slug") for record in action_records]
+    )
+
+    records = numpy.zeros(
+        len(action_records),
+        dtype=[
+            ("id", numpy.int64),
+            ("type", numpy.int32),
+            ("status", numpy.int32),
+            ("resource_type", numpy.int32),
+            ("region_slug", numpy.int32),
+            ("resource_id", numpy.int64),
+            ("started_at", "datetime64[s]"),
+            ("completed_at", "datetime64[s]"),
+        ],
+    )
+    records["id"] = [record.get("id") or 0 for record in action_records]
+    records["type"] = type_codes
+    records["status"] = status_codes
+    records["resource_type"] = resource_type_codes
+    records["region_slug"] = region_codes
+    records["resource_id"] = [record.get("resource_id") or 0 for record in action_records]
+    records["started_at"] = [
+        _datetime64(record.get("started_at")) for record in action_records
+    ]
+    records["completed_at"] = [
+        _datetime64(record.get("completed_at")) for record in action_records
+    ]
+
+    return InventoryColumns(
+        records=records,
+        categories={
+            "type": types,
+            "status": statuses,
+            "resource_type": resource_types,
+            "region_slug": regions,
+        },
+    )
+
+
+def _datetime64(timestamp):
+    if not timestamp:
+        return numpy.datetime64("NaT")
+    return numpy.datetime64(timestamp.rstrip("Z"), "s")
+
+
+def _region_slug(region):
+    # Listings return the whole region object, freshly created resources may only have the slug.
+    if isinstance(region, dict):
+        return region.get("slug")
+    return region or None
@@ -0,0 +1,192 @@
+from __future__ import annotations
+
+from contextlib import contextmanager
+import json
+import os
+import sqlite3
+import threading
+import time
+
+
+class InventoryStore:
+    """
+    An on disk (SQLite) copy of the last synced inventory and catalogs, for warm startup of short lived jobs.
+
+    Each kind ("droplets", "volumes", "sizes", "regions") is stored as the raw api records with the time they were synced.
+    The store is opt-in per call: a manager retrieve_all method given store= answers from it straight away and,
+    once the stored copy is older than revalidate_interval, refreshes it from the api in a background thread,
+    so the next call (or the next job) sees fresher data.
+    Existence checks, limit checks and deletes never use the store, they always list live.
+    """
+
+    def __init__(self, path, max_age=None, revalidate_interval=60):
+        """
+        Args:
+            path (str): SQLite database file, created if it doesn't exist.
+            max_age (float, optional): Seconds after which stored records are too old to serve and are fetched
+                                       from the api before returning. Defaults to None, any age is served.
+            revalidate_interval (float, optional): Seconds a stored copy is served without a background refresh,
+                                                   so repeated reads don't each start a full re-list. Defaults to 60.
+        """
+        self.path = path
+        self.max_age = max_age
+        self.revalidate_interval = revalidate_interval
+        self.revalidation_threads = {}
+        self.lock = threading.Lock()
+        with self.connect() as connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS inventory (kind TEXT PRIMARY KEY, synced_at REAL NOT NULL, records TEXT NOT NULL)"
+            )
+
+    @contextmanager
+    def connect(self):
+        # One connection per call, so background revalidation threads never share a connection.
+        connection = sqlite3.connect(self.path, timeout=30)
+        try:
+            with connection:
+                yield connection
+        finally:
+            connection.close()
+
+    def save(self, kind, records: list, synced_at=None):
+        if synced_at is None:
+            synced_at = time.time()
+        with self.connect() as connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO inventory (kind, synced_at, records) VALUES (?, ?, ?)",
+                (kind, synced_at, json.dumps(records, separators=(",", ":"))),
+            )
+
+    def load(self, kind):
+        """
+        Returns:
+            (list, float): The stored records and the time they were synced, (None, None) if kind was never stored.
+        """
+        with self.connect() as connection:
+            row = connection.execute(
+                "SELECT records, synced_at FROM inventory WHERE kind = ?", (kind,)
+            ).fetchone()
+        if row is None:
+            return None, None
+        return json.loads(row[0]), row[1]
+
+    def synced_at(self, kind):
+        with self.connect() as connection:
+            row = connection.execute(
+                "SELECT synced_at FROM inventory WHERE kind = ?", (kind,)
+            ).fetchone()
+        return None if row is None else row[0]
+
+    def forget(self, kind=None):
+        with self.connect() as connection:
+            if kind is None:
+                connection.execute("DELETE FROM inventory")
+            else:
+                connection.execute("DELETE FROM inventory WHERE kind = ?", (kind,))
+
+    def serve(self, kind, fetch):
+        """
+        Returns the records for kind from the store, and revalidates them in the background once they are
+        older than revalidate_interval. When nothing usable is stored, fetch is called now and its result stored.
+
+        Args:
+            kind (str): Inventory kind, e.g. "droplets".
+            fetch (callable): Returns the current list of raw api records for kind.
+        """
+        records, synced_at = self.load(kind)
+        if records is None or (
+            self.max_age is not None and time.time() - synced_at > self.max_age
+        ):
+            records = fetch()
+            if records is not None:
+                self.save(kind, records)
+            return records
+        if time.time() - synced_at >= self.revalidate_interval:
+            self.revalidate(kind, fetch)
+        return records
+
+    def revalidate(self, kind, fetch):
+        """
+        Refreshes kind from the api in a background thread, unless a refresh of kind is already running.
+        """
+
+        def refresh():
+            records = fetch()
+            if records is not None:
+                self.save(kind, records)
+
+        with self.lock:
+            thread = self.revalidation_threads.get(kind)
+            if thread is not None and thread.is_alive():
+                return
+            thread = threading.Thread(target=refresh, args=(), daemon=True)
+            self.revalidation_threads[kind] = thread
+        thread.start()
+
+    def wait_for_revalidation(self, timeout=None):
+        """
+        Blocks until running background refreshes finish, call before a job exits to keep the store fresh.
+        """
+        with self.lock:
+            threads = list(self.revalidation_threads.values())
+        for thread in threads:
+            thread.join(timeout)
+
+
+_active_inventory_store = None
+
+
+def enable_inventory_store(path=None, max_age=None, revalidate_interval=60):
+    """
+    Sets the store that retrieve_all calls given store=True use, nothing uses it unless a call asks for it.
+
+    Args:
+        path (str, optional): SQLite file, defaults to the DIGITALOCEAN_INVENTORY_STORE env variable.
+        max_age (float, optional): See InventoryStore.
+        revalidate_interval (float, optional): See InventoryStore.
+
+    Returns:
+        InventoryStore: The enabled store.
+    """
+    global _active_inventory_store
+    if path is None:
+        path = os.getenv("DIGITALOCEAN_INVENTORY_STORE")
+    if path is None:
+        raise Exception(
+            'No inventory store path given and "DIGITALOCEAN_INVENTORY_STORE" ENV Variable not set.'
+        )
+    _active_inventory_store = InventoryStore(
+        path, max_age=max_age, revalidate_interval=revalidate_interval
+    )
+    return _active_inventory_store
+
+
+def disable_inventory_store():
+    global _active_inventory_store
+    _active_inventory_store = None
+
+
+def active_inventory_store():
+    """
+    Returns the store set with enable_inventory_store, or None.
+    """
+    return _active_inventory_store
+
+
+def resolve_inventory_store(store):
+    """
+    Turns the store= argument of a retrieve_all call into an InventoryStore, or None for a live listing.
+
+    Args:
+        store ([type]): None or False for a live listing, True for the store set with enable_inventory_store,
+                        or an InventoryStore.
+    """
+    if store is None or store is False:
+        return None
+    if store is True:
+        if _active_inventory_store is None:
+            raise Exception(
+                "store=True but no inventory store is enabled, see enable_inventory_store"
+            )
+        return _active_inventory_store
+    return store
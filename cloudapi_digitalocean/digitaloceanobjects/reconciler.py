@@ -0,0 +1,467 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from ..digitaloceanapi.droplets import Droplets
+from ..digitaloceanapi.volumes import Volumes
+from ..digitaloceanapi.floatingips import FloatingIPs
+from ..common.cloudapiexceptions import *
+from .action import *
+from .resourceplan import ResourcePlan, action_step, request_step
+import json
+import re
+import threading
+
+
+@dataclass
+class DropletGroupSpec:
+    """
+    The desired state of a group of identical droplets.
+
+    Droplets are named "{name}-1" ... "{name}-{count}", their volumes "{name}-{n}-volume".
+    Droplets of the group numbered above count are surplus and deleted, with their group volume and floating ip.
+    """
+
+    name: str = None
+    count: int = 1
+    region: str = None
+    size: str = None
+    image: object = None
+    tags: list = field(default_factory=list)
+    volume_size_gigabytes: int = None
+    floating_ip: bool = False
+    ssh_keys: list = field(default_factory=list)
+    monitoring: bool = None
+    vpc_uuid: str = None
+    user_data: str = None
+
+    def droplet_name(self, number):
+        return f"{self.name}-{number}"
+
+    def volume_name(self, number):
+        return f"{self.name}-{number}-volume"
+
+    def droplet_number(self, droplet_name):
+        """
+        Returns the number of a droplet of this group from its name, None for other droplets.
+        """
+        match = re.match(f"^{re.escape(self.name)}-([0-9]+)$", droplet_name or "")
+        return int(match.group(1)) if match else None
+
+
+def _retrieve_all_records(list_request, key, per_page=200):
+    # Every page of a listing, the same pagination the managers use.
+    records = []
+    page = 1
+    response = list_request(page=page, per_page=per_page)
+    if not response:
+        raise Exception(f"Could not list {key}, {response.content}")
+    content = json.loads(response.content.decode("utf-8"))
+    records.extend(content[key])
+    try:
+        while content["links"]["pages"]["next"]:
+            page = page + 1
+            response = list_request(page=page, per_page=per_page)
+            content = json.loads(response.content.decode("utf-8"))
+            records.extend(content[key])
+    except KeyError:
+        pass
+    return records
+
+
+class Reconciler:
+    """
+    Brings droplets, their volumes and floating ips to the state described by DropletGroupSpecs.
+
+    The current state is read once (one droplet, volume and floating ip listing, in parallel) and diffed against the specs,
+    the differences become a ResourcePlan of only the creates, attaches, resizes and deletes needed,
+    run as a parallel dependency graph. A converged environment costs the three listings and nothing else.
+
+    New droplets are created with their new volume already attached and get their floating ip once active,
+    their names and the account droplet limit are checked when planning, as DropletManager.create_new_droplet does.
+    Existing droplets are resized (power off, resize, power on) when their size slug differs, droplets that were
+    not active are left powered off. Volumes are grown (never shrunk) and attached when they are not attached to their droplet.
+    The group volume of a surplus droplet is deleted with it, unless it is attached to another droplet.
+    Tags are only applied to new droplets.
+    """
+
+    def __init__(self, droplet_manager=None):
+        """
+        Args:
+            droplet_manager (DropletManager, optional): Checks new droplet names and the droplet limit. Defaults to None, a new one.
+        """
+        if droplet_manager == None:
+            # droplet.py imports this module, so the manager is only imported once both are loaded.
+            from .droplet import DropletManager
+
+            droplet_manager = DropletManager()
+        self.droplet_manager = droplet_manager
+        self.dropletapi = Droplets()
+        self.volumeapi = Volumes()
+        self.floatingipapi = FloatingIPs()
+
+    def retrieve_inventory(self):
+        """
+        Returns:
+            [dict]: "droplets", "volumes" and "floating_ips", the raw api records of each.
+        """
+        listings = {
+            "droplets": self.dropletapi.list_all_droplets,
+            "volumes": self.volumeapi.list_all_volumes,
+            "floating_ips": self.floatingipapi.list_all_floating_ips,
+        }
+        inventory = {}
+        errors = []
+
+        def retrieve(key):
+            try:
+                inventory[key] = _retrieve_all_records(listings[key], key)
+            except Exception as error:
+                errors.append(error)
+
+        threads = [threading.Thread(target=retrieve, args=(key,)) for key in listings]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        if len(errors) > 0:
+            raise errors[0]
+        return inventory
+
+    def plan(self, specs: list, inventory: dict = None):
+        """
+        Diffs the specs against the inventory.
+
+        Args:
+            specs (list): DropletGroupSpec objects.
+            inventory (dict, optional): From retrieve_inventory(), read now when not given.
+
+        Returns:
+            [ResourcePlan]: The steps needed, empty when everything already matches.
+        """
+        if inventory == None:
+            inventory = self.retrieve_inventory()
+        droplets = {droplet["name"]: droplet for droplet in inventory["droplets"]}
+        floating_ips = {}
+        for floating_ip in inventory["floating_ips"]:
+            if not floating_ip.get("droplet") == None:
+                floating_ips[floating_ip["droplet"]["id"]] = floating_ip
+        plan = ResourcePlan()
+        new_droplets = 0
+        for spec in specs:
+            volumes = {
+                volume["name"]: volume
+                for volume in inventory["volumes"]
+                if volume["region"]["slug"] == spec.region
+            }
+            for number in range(1, spec.count + 1):
+                droplet = droplets.get(spec.droplet_name(number))
+                volume = volumes.get(spec.volume_name(number))
+                if droplet == None:
+                    self.droplet_manager.is_valid_droplet_name(spec.droplet_name(number))
+                    self.plan_new_droplet(plan, spec, number, volume)
+                    new_droplets = new_droplets + 1
+                else:
+                    self.plan_existing_droplet(
+                        plan, spec, number, droplet, volume, floating_ips
+                    )
+            for droplet in inventory["droplets"]:
+                number = spec.droplet_number(droplet["name"])
+                if not number == None and number > spec.count:
+                    self.plan_surplus_droplet(
+                        plan,
+                        spec,
+                        droplet,
+                        volumes.get(spec.volume_name(number)),
+                        floating_ips,
+                    )
+        if new_droplets > 0:
+            self.droplet_manager.check_limit(new_droplets=new_droplets)
+        return plan
+
+    def plan_new_droplet(self, plan, spec, number, volume):
+        name = spec.droplet_name(number)
+        created = {}
+        volume_dependencies = []
+        if not spec.volume_size_gigabytes == None:
+            if volume == None:
+                volume_key = f"volume:{spec.volume_name(number)}"
+                volume_dependencies.append(volume_key)
+
+                def create_volume():
+                    response = self.volumeapi.create_new_volume(
+                        size_gigabytes=spec.volume_size_gigabytes,
+                        name=spec.volume_name(number),
+                        region=spec.region,
+                        tags=spec.tags,
+                    )
+                    if not response:
+                        raise Exception(response.content)
+                    created["volume_id"] = json.loads(
+                        response.content.decode("utf-8")
+                    )["volume"]["id"]
+
+                plan.add(
+                    volume_key,
+                    f"Create {spec.volume_size_gigabytes}GB volume {spec.volume_name(number)} in {spec.region}",
+                    create_volume,
+                )
+            else:
+                created["volume_id"] = volume["id"]
+                if volume["size_gigabytes"] < spec.volume_size_gigabytes:
+                    resize_key = f"volume:{volume['id']}:resize"
+                    volume_dependencies.append(resize_key)
+                    plan.add(
+                        resize_key,
+                        f"Grow volume {volume['name']} from {volume['size_gigabytes']}GB to {spec.volume_size_gigabytes}GB",
+                        action_step(
+                            lambda: self.volumeapi.resize_volume(
+                                volume["id"], spec.volume_size_gigabytes, region=spec.region
+                            )
+                        ),
+                    )
+                if len(volume["droplet_ids"] or []) > 0:
+                    detach_key = f"volume:{volume['id']}:detach"
+                    volume_dependencies.append(detach_key)
+                    plan.add(
+                        detach_key,
+                        f"Detach volume {volume['name']} from droplet {volume['droplet_ids'][0]}",
+                        action_step(
+                            lambda: self.volumeapi.detach_volume_from_droplet(
+                                volume["id"], volume["droplet_ids"][0]
+                            )
+                        ),
+                    )
+
+        def create_droplet():
+            response = self.dropletapi.create_new_droplet(
+                name=name,
+                region=spec.region,
+                size=spec.size,
+                image=spec.image,
+                ssh_keys=spec.ssh_keys,
+                monitoring=spec.monitoring,
+                vpc_uuid=spec.vpc_uuid,
+                user_data=spec.user_data,
+                volumes=[created["volume_id"]] if "volume_id" in created else [],
+                tags=spec.tags,
+            )
+            if not response:
+                raise Exception(response.content)
+            content = json.loads(response.content.decode("utf-8"))
+            created["droplet_id"] = content["droplet"]["id"]
+            # Wait for the create action, the droplet is active once it completed.
+            actions = [
+                Action(
+                    ActionAttributes(
+                        id=link["id"],
+                        status="in-progress",
+                        type="create",
+                        region_slug=spec.region,
+                    )
+                )
+                for link in content.get("links", {}).get("actions", [])
+            ]
+            for error in ActionManager().wait_for_actions_to_finish(actions):
+                if not error == None:
+                    raise error
+
+        droplet_key = f"droplet:{name}"
+        plan.add(
+            droplet_key,
+            f"Create {spec.size} droplet {name} in {spec.region}"
+            + (" with its volume attached" if "volume_id" in created or len(volume_dependencies) > 0 else ""),
+            create_droplet,
+            depends_on=volume_dependencies,
+        )
+        if spec.floating_ip:
+            plan.add(
+                f"floating_ip:{name}",
+                f"Assign a new floating ip to droplet {name}",
+                lambda: self.create_floating_ip(created["droplet_id"]),
+                depends_on=[droplet_key],
+            )
+
+    def plan_existing_droplet(self, plan, spec, number, droplet, volume, floating_ips):
+        name = droplet["name"]
+        droplet_id = droplet["id"]
+        droplet_dependencies = []
+        if not droplet["size_slug"] == spec.size:
+            steps = []
+            if droplet["status"] == "active":
+                steps.append(
+                    (
+                        "power_off",
+                        "Power off",
+                        lambda: self.dropletapi.poweroff_droplet(droplet_id),
+                    )
+                )
+            steps.append(
+                (
+                    "resize",
+                    f"Resize from {droplet['size_slug']} to {spec.size}",
+                    lambda: self.dropletapi.resize_droplet(droplet_id, spec.size),
+                )
+            )
+            if droplet["status"] == "active":
+                steps.append(
+                    (
+                        "power_on",
+                        "Power on",
+                        lambda: self.dropletapi.poweron_droplet(droplet_id),
+                    )
+                )
+            previous = []
+            for step_type, description, request in steps:
+                key = f"droplet:{name}:{step_type}"
+                plan.add(
+                    key,
+                    f"{description} droplet {name}",
+                    action_step(request),
+                    depends_on=previous,
+                )
+                previous = [key]
+            droplet_dependencies = previous
+
+        if not spec.volume_size_gigabytes == None:
+            if volume == None:
+                volume_key = f"volume:{spec.volume_name(number)}"
+                created = {}
+
+                def create_volume():
+                    response = self.volumeapi.create_new_volume(
+                        size_gigabytes=spec.volume_size_gigabytes,
+                        name=spec.volume_name(number),
+                        region=spec.region,
+                        tags=spec.tags,
+                    )
+                    if not response:
+                        raise Exception(response.content)
+                    created["volume_id"] = json.loads(
+                        response.content.decode("utf-8")
+                    )["volume"]["id"]
+
+                plan.add(
+                    volume_key,
+                    f"Create {spec.volume_size_gigabytes}GB volume {spec.volume_name(number)} in {spec.region}",
+                    create_volume,
+                )
+                plan.add(
+                    f"{volume_key}:attach",
+                    f"Attach volume {spec.volume_name(number)} to droplet {name}",
+                    action_step(
+                        lambda: self.volumeapi.attach_volume_to_droplet(
+                            created["volume_id"], droplet_id, spec.region
+                        )
+                    ),
+                    depends_on=[volume_key] + droplet_dependencies,
+                )
+            else:
+                self.plan_existing_volume(
+                    plan, spec, droplet, volume, droplet_dependencies
+                )
+
+        if spec.floating_ip and not droplet_id in floating_ips:
+            plan.add(
+                f"floating_ip:{name}",
+                f"Assign a new floating ip to droplet {name}",
+                lambda: self.create_floating_ip(droplet_id),
+                depends_on=droplet_dependencies,
+            )
+
+    def plan_existing_volume(self, plan, spec, droplet, volume, droplet_dependencies):
+        volume_id = volume["id"]
+        attached_to = volume["droplet_ids"] or []
+        previous = []
+        if volume["size_gigabytes"] < spec.volume_size_gigabytes:
+            key = f"volume:{volume_id}:resize"
+            plan.add(
+                key,
+                f"Grow volume {volume['name']} from {volume['size_gigabytes']}GB to {spec.volume_size_gigabytes}GB",
+                action_step(
+                    lambda: self.volumeapi.resize_volume(
+                        volume_id, spec.volume_size_gigabytes, region=spec.region
+                    )
+                ),
+            )
+            previous = [key]
+        if droplet["id"] in attached_to:
+            return
+        if len(attached_to) > 0:
+            key = f"volume:{volume_id}:detach"
+            plan.add(
+                key,
+                f"Detach volume {volume['name']} from droplet {attached_to[0]}",
+                action_step(
+                    lambda: self.volumeapi.detach_volume_from_droplet(
+                        volume_id, attached_to[0]
+                    )
+                ),
+                depends_on=previous,
+            )
+            previous = [key]
+        plan.add(
+            f"volume:{volume_id}:attach",
+            f"Attach volume {volume['name']} to droplet {droplet['name']}",
+            action_step(
+                lambda: self.volumeapi.attach_volume_to_droplet(
+                    volume_id, droplet["id"], spec.region
+                )
+            ),
+            depends_on=previous + droplet_dependencies,
+        )
+
+    def plan_surplus_droplet(self, plan, spec, droplet, volume, floating_ips):
+        droplet_id = droplet["id"]
+        droplet_dependencies = []
+        if not volume == None and any(
+            not attached == droplet_id for attached in volume["droplet_ids"] or []
+        ):
+            # In use by a droplet that stays, it is not ours to delete.
+            volume = None
+        if not volume == None and droplet_id in (volume["droplet_ids"] or []):
+            detach_key = f"volume:{volume['id']}:detach"
+            plan.add(
+                detach_key,
+                f"Detach volume {volume['name']} from surplus droplet {droplet['name']}",
+                action_step(
+                    lambda: self.volumeapi.detach_volume_from_droplet(
+                        volume["id"], droplet_id
+                    )
+                ),
+            )
+            droplet_dependencies.append(detach_key)
+        if not volume == None:
+            plan.add(
+                f"volume:{volume['id']}",
+                f"Delete volume {volume['name']}",
+                request_step(lambda: self.volumeapi.delete_volume_id(volume["id"])),
+                depends_on=droplet_dependencies,
+            )
+        if droplet_id in floating_ips:
+            ip = floating_ips[droplet_id]["ip"]
+            plan.add(
+                f"floating_ip:{ip}",
+                f"Release floating ip {ip} of surplus droplet {droplet['name']}",
+                request_step(lambda: self.floatingipapi.delete_floating_ip(ip)),
+            )
+        plan.add(
+            f"droplet:{droplet['name']}:delete",
+            f"Delete surplus droplet {droplet['name']}",
+            request_step(lambda: self.dropletapi.delete_droplet_id(droplet_id)),
+            depends_on=droplet_dependencies,
+        )
+
+    def create_floating_ip(self, droplet_id):
+        response = self.floatingipapi.create_new_floating_ip(droplet_id)
+        if not response:
+            raise Exception(response.content)
+        return json.loads(response.content.decode("utf-8"))["floating_ip"]["ip"]
+
+    def apply(self, specs: list, dry_run=False):
+        """
+        Plans and, unless dry_run, runs the steps that bring the account to the specs.
+
+        Returns:
+            [ResourcePlan]: See describe() for the steps, their status and latencies.
+        """
+        return self.plan(specs).execute(dry_run=dry_run)
@@ -4,6 +4,7 @@ from dataclasses import dataclass, field
 from ..digitaloceanapi.regions import Regions
 
 from ..common.cloudapiexceptions import *
+from .inventorystore import resolve_inventory_store
 import json
 import threading
 import time
@@ -23,12 +24,24 @@ class RegionManager:
     def __init__(self):
         self.regionapi = Regions()
 
-    def retrieve_all_regions(self):
-        region_objects = []
+    def retrieve_region_records(self):
         response = self.regionapi.list_all_regions()
         if response:
             content = json.loads(response.content.decode("utf-8"))
-            region_datas = content["regions"]
+            return content["regions"]
+
+    def retrieve_all_regions(self, store=None):
+        """
+        With store (an InventoryStore, or True for the one set with enable_inventory_store) the regions come from the store,
+        which is refreshed in the background once it is stale. Defaults to None, a live listing.
+        """
+        region_objects = []
+        store = resolve_inventory_store(store)
+        if store is None:
+            region_datas = self.retrieve_region_records()
+        else:
+            region_datas = store.serve("regions", self.retrieve_region_records)
+        if not region_datas == None:
             for region_data in region_datas:
                 newregion = Region()
                 newregion.attributes = RegionAttributes(**region_data)
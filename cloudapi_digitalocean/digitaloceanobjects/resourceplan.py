@@ -0,0 +1,202 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from .action import *
+import json
+import threading
+import time
+
+
+def action_step(request):
+    """
+    Wraps a request that returns an action into a plan step run function.
+    The step completes when the action completes, a 404 counts as nothing left to do.
+    An action that errored, can't be polled or isn't done within ActionManager.wait_timeout fails the step.
+
+    Args:
+        request (callable): Sends the request and returns its response.
+    """
+
+    def run():
+        response = request()
+        if response.status_code == 404:
+            return True
+        if not response:
+            raise Exception(response.content)
+        content = json.loads(response.content.decode("utf-8"))
+        action = Action(ActionAttributes(**content["action"]))
+        ActionManager().wait_for_action_completion(action)
+
+    return run
+
+
+def request_step(request):
+    """
+    Wraps a request into a plan step run function, a failed response fails the step
+    and a 404 counts as nothing left to do.
+
+    Args:
+        request (callable): Sends the request and returns its response.
+    """
+
+    def run():
+        response = request()
+        if not response and not response.status_code == 404:
+            raise Exception(response.content)
+
+    return run
+
+
+@dataclass
+class PlanStep:
+    key: str = None
+    description: str = None
+    run: object = None
+    depends_on: list = field(default_factory=list)
+    status: str = "planned"
+    started_at: float = None
+    finished_at: float = None
+    seconds: float = None
+    error: str = None
+    result: object = None
+
+
+class ResourcePlan:
+    """
+    A dependency graph of api steps, e.g. detach a volume before deleting it.
+
+    execute() starts every step whose dependencies completed straight away, so independent branches
+    run in parallel (still within the api rate limit, every request shares one queue).
+    A step that fails, or raises, marks every step depending on it as skipped.
+    """
+
+    def __init__(self):
+        self.steps = {}
+        self.condition = threading.Condition()
+        self.seconds = None
+
+    def add(self, key, description, run, depends_on: list = None):
+        """
+        Args:
+            key (str): Unique step name, other steps depend on it by this key.
+            description (str): What the step does, shown in the plan.
+            run (callable): Does the step, a False return is a failure.
+            depends_on (list, optional): Keys of steps that must complete first, each already added. Defaults to None, no dependencies.
+
+        Raises:
+            ValueError: When the plan already has a step key.
+            KeyError: When a key in depends_on is not a step of the plan, a typo would otherwise drop the ordering silently.
+
+        Returns:
+            [PlanStep]: The added step.
+        """
+        if key in self.steps:
+            raise ValueError(f"Plan already has a step {key}")
+        depends_on = [] if depends_on == None else list(depends_on)
+        unknown_keys = [dependency for dependency in depends_on if not dependency in self.steps]
+        if len(unknown_keys) > 0:
+            raise KeyError(f"Step {key} depends on {unknown_keys}, which are not steps of the plan")
+        step = PlanStep(
+            key=key, description=description, run=run, depends_on=depends_on
+        )
+        self.steps[key] = step
+        return step
+
+    def describe(self):
+        """
+        Returns:
+            [list]: One line per step, dependencies first, with its status and latency once executed.
+        """
+        lines = []
+        for level, steps in enumerate(self.levels()):
+            for step in steps:
+                line = f"[{level}] {step.description} ({step.status}"
+                if not step.seconds == None:
+                    line = line + f", {step.seconds:.2f}s"
+                if not step.error == None:
+                    line = line + f", {step.error}"
+                lines.append(line + ")")
+        return lines
+
+    def levels(self):
+        """
+        Returns:
+            [list]: Lists of steps, each list only depends on the lists before it and runs in parallel.
+        """
+        placed = {}
+        levels = []
+        remaining = list(self.steps.values())
+        while len(remaining) > 0:
+            level = [
+                step
+                for step in remaining
+                if all(
+                    key in placed or not key in self.steps for key in step.depends_on
+                )
+            ]
+            if len(level) == 0:
+                raise ValueError(
+                    f"Plan has a dependency cycle between {[step.key for step in remaining]}"
+                )
+            for step in level:
+                placed[step.key] = len(levels)
+            levels.append(level)
+            remaining = [step for step in remaining if not step.key in placed]
+        return levels
+
+    def execute(self, dry_run=False):
+        """
+        Runs the plan, every step as soon as its dependencies completed.
+
+        Args:
+            dry_run (bool, optional): Only check the plan for cycles, nothing is run. Defaults to False.
+
+        Returns:
+            [ResourcePlan]: self, see steps for status and latencies, and seconds for the whole plan.
+        """
+        self.levels()
+        if dry_run:
+            return self
+        started_at = time.monotonic()
+        with self.condition:
+            while True:
+                progressed = False
+                for step in self.steps.values():
+                    if not step.status == "planned":
+                        continue
+                    dependencies = [
+                        self.steps[key] for key in step.depends_on if key in self.steps
+                    ]
+                    if any(d.status in ("failed", "skipped") for d in dependencies):
+                        step.status = "skipped"
+                        progressed = True
+                    elif all(d.status == "completed" for d in dependencies):
+                        step.status = "in-progress"
+                        threading.Thread(target=self.run_step, args=(step,)).start()
+                        progressed = True
+                if progressed:
+                    continue
+                if not any(
+                    step.status == "in-progress" for step in self.steps.values()
+                ):
+                    break
+                self.condition.wait()
+        self.seconds = time.monotonic() - started_at
+        return self
+
+    def run_step(self, step: PlanStep):
+        step.started_at = time.monotonic()
+        try:
+            step.result = step.run()
+            succeeded = not step.result is False
+        except Exception as error:
+            succeeded = False
+            step.error = str(error)
+        with self.condition:
+            step.finished_at = time.monotonic()
+            step.seconds = step.finished_at - step.started_at
+            step.status = "completed" if succeeded else "failed"
+            self.condition.notify()
+
+    def count(self, status):
+        return sum(1 for step in self.steps.values() if step.status == status)
@@ -3,6 +3,7 @@ from __future__ import annotations
 from dataclasses import dataclass, field
 from ..digitaloceanapi.sizes import Sizes
 from ..common.cloudapiexceptions import *
+from .inventorystore import resolve_inventory_store
 import json
 import threading
 import time
@@ -27,17 +28,28 @@ class SizeManager:
     def __init__(self):
         self.sizeapi = Sizes()
 
-    def retrieve_sizes(self):
+    def retrieve_size_records(self):
         response = self.sizeapi.list_all_sizes()
-        size_list = []
-        return_sizes = []
         if response:
             content = json.loads(response.content.decode("utf-8"))
-            size_list = content["sizes"]
-        for size_data in size_list:
-            newsize = Size()
-            newsize.attributes = SizeAttributes(**size_data)
-            return_sizes.append(newsize)
+            return content["sizes"]
+
+    def retrieve_sizes(self, store=None):
+        """
+        With store (an InventoryStore, or True for the one set with enable_inventory_store) the sizes come from the store,
+        which is refreshed in the background once it is stale. Defaults to None, a live listing.
+        """
+        store = resolve_inventory_store(store)
+        if store is None:
+            size_list = self.retrieve_size_records()
+        else:
+            size_list = store.serve("sizes", self.retrieve_size_records)
+        return_sizes = []
+        if not size_list == None:
+            for size_data in size_list:
+                newsize = Size()
+                newsize.attributes = SizeAttributes(**size_data)
+                return_sizes.append(newsize)
         return return_sizes
 
     def retrieve_size(self, slug):
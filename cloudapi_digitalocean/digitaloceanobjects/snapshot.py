@@ -2,18 +2,104 @@ from __future__ import annotations
 
 from dataclasses import dataclass, field
 from ..common.cloudapiexceptions import *
+from ..common.slotteddataclass import slotted_dataclass
+from ..common.payloadinterning import intern_fields
 from ..digitaloceanapi.snapshots import Snapshots
+from ..digitaloceanapi.images import Images
+from .action import Action, ActionAttributes, ActionManager
+from ..common.boundedconcurrency import run_bounded
+from .bulkfetch import retrieve_records_by_ids, bulk_fetch_cost_model, count_listing_records
+from .snapshotretention import (
+    SnapshotRetentionPolicy,
+    SnapshotRetentionReport,
+    select_snapshots_to_keep,
+)
 import json
 import threading
 import time
 import datetime
 
+# Snapshot fields that repeat between snapshots, a listing with shared_payloads=True keeps one shared read-only
+# instance of each distinct value, otherwise only their strings are interned.
+INTERNED_SNAPSHOT_FIELDS = ("regions", "resource_type", "tags")
+
 
 class SnapshotManager:
     def __init__(self):
         self.snapshotapi = Snapshots()
+        self.imageapi = Images()
+
+    def snapshot_list_request(self, resource_type=None):
+        """
+        Returns the api listing of every snapshot, or only of "droplet" or "volume" snapshots.
+        """
+        return {
+            None: self.snapshotapi.list_all_snapshots,
+            "droplet": self.snapshotapi.list_all_droplet_snapshots,
+            "volume": self.snapshotapi.list_all_volume_snapshots,
+        }[resource_type]
+
+    def iterate_snapshot_records(self, resource_type=None, per_page=200):
+        """
+        Yields the raw api record (dict) of every snapshot, or only of "droplet" or "volume" snapshots.
+        Pages are requested as they are consumed, stop iterating to stop paging.
+        """
+        list_request = self.snapshot_list_request(resource_type)
+        page = 1
+        while True:
+            response = list_request(page=page, per_page=per_page)
+            content = json.loads(response.content.decode("utf-8"))
+            for snapshot_item in content["snapshots"]:
+                yield snapshot_item
+            try:
+                if not content["links"]["pages"]["next"]:
+                    break
+            except KeyError:
+                break
+            page = page + 1
+
+    def retrieve_snapshot_records(self, resource_type=None):
+        """
+        Returns the raw api record (dict) of every snapshot, or only of "droplet" or "volume" snapshots.
+        """
+        return list(self.iterate_snapshot_records(resource_type))
+
+    def retrieve_snapshots_by_ids(self, ids: list, resource_type=None):
+        """
+        Returns a Snapshot object for each id, in the same order.
+        The ids are fetched with concurrent GETs or picked out of one snapshot listing, whichever
+        BulkFetchCostModel expects to be cheaper.
+
+        Args:
+            ids (list): Snapshot ids.
+            resource_type (str, optional): "droplet" or "volume" when all ids are of that kind, narrows the listing.
+
+        Raises:
+            ErrorSnapshotNotFound: If any of the snapshots doesn't exist.
+        """
+        ids = list(ids)
+        records = retrieve_records_by_ids(
+            "snapshots" if resource_type == None else f"{resource_type}_snapshots",
+            ids,
+            self.snapshotapi.retrieve_snapshot_by_id,
+            "snapshot",
+            lambda: self.retrieve_snapshot_records(resource_type),
+            lambda: count_listing_records(self.snapshot_list_request(resource_type)),
+        )
+        missing = [id for id in ids if records[id] == None]
+        if len(missing) > 0:
+            raise ErrorSnapshotNotFound(
+                f"Snapshot with id:{', '.join(map(str, missing))} not found"
+            )
+        snapshot_objects = []
+        for id in ids:
+            newsnapshot = Snapshot()
+            newsnapshot.attributes = SnapshotAttributes(**records[id])
+            newsnapshot.arguments = SnapshotArguments()
+            snapshot_objects.append(newsnapshot)
+        return snapshot_objects
 
-    def retrieve_all_snapshots(self):
+    def retrieve_all_snapshots(self, shared_payloads=False):
         snapshot_list = []
         page, per_page = 1, 10
         response = self.snapshotapi.list_all_snapshots(page=page, per_page=per_page)
@@ -34,12 +120,16 @@ class SnapshotManager:
         snapshot_objects = []
         for snapshot_item in snapshot_list:
             newsnapshot = Snapshot()
-            newsnapshot.attributes = SnapshotAttributes(**snapshot_item)
+            newsnapshot.attributes = SnapshotAttributes(
+                **intern_fields(
+                    snapshot_item, INTERNED_SNAPSHOT_FIELDS, shared_payloads
+                )
+            )
             newsnapshot.arguments = SnapshotArguments()
             snapshot_objects.append(newsnapshot)
         return snapshot_objects
 
-    def retrieve_all_droplet_snapshots(self):
+    def retrieve_all_droplet_snapshots(self, shared_payloads=False):
         snapshot_list = []
         page, per_page = 1, 10
         response = self.snapshotapi.list_all_droplet_snapshots(
@@ -62,12 +152,16 @@ class SnapshotManager:
         snapshot_objects = []
         for snapshot_item in snapshot_list:
             newsnapshot = Snapshot()
-            newsnapshot.attributes = SnapshotAttributes(**snapshot_item)
+            newsnapshot.attributes = SnapshotAttributes(
+                **intern_fields(
+                    snapshot_item, INTERNED_SNAPSHOT_FIELDS, shared_payloads
+                )
+            )
             newsnapshot.arguments = SnapshotArguments()
             snapshot_objects.append(newsnapshot)
         return snapshot_objects
 
-    def retrieve_all_volume_snapshots(self):
+    def retrieve_all_volume_snapshots(self, shared_payloads=False):
         snapshot_list = []
         page, per_page = 1, 10
         response = self.snapshotapi.list_all_volume_snapshots(
@@ -90,29 +184,29 @@ class SnapshotManager:
         snapshot_objects = []
         for snapshot_item in snapshot_list:
             newsnapshot = Snapshot()
-            newsnapshot.attributes = SnapshotAttributes(**snapshot_item)
+            newsnapshot.attributes = SnapshotAttributes(
+                **intern_fields(
+                    snapshot_item, INTERNED_SNAPSHOT_FIELDS, shared_payloads
+                )
+            )
             newsnapshot.arguments = SnapshotArguments()
             snapshot_objects.append(newsnapshot)
         return snapshot_objects
 
     def retrieve_snapshot_id(self, id):
-        if not self.does_snapshot_id_exist(id):
-            raise ErrorSnapshotNotFound(f"Snapshot with id:{id} not found")
-        newsnapshot = Snapshot()
-        response = self.snapshotapi.retrieve_snapshot_by_id(id)
-        if response:
-            content = json.loads(response.content.decode("utf-8"))
-            snapshot_data = dict(content["snapshots"])
-            newsnapshot.attributes = SnapshotAttributes(**snapshot_data)
-        return newsnapshot
+        return self.retrieve_snapshots_by_ids([id])[0]
 
     def delete_snapshot(self, snapshot: Snapshot):
         id = snapshot.attributes.id
         self.delete_snapshot_id(id)
 
     def delete_snapshot_id(self, id):
-        if self.does_snapshot_id_exist(id):
-            self.snapshotapi.delete_snapshot_id(id)
+        """
+        Deletes the snapshot, a snapshot that doesn't exist (404) is left as is.
+        """
+        response = self.snapshotapi.delete_snapshot_id(id)
+        if not response and not response.status_code == 404:
+            raise Exception(f"Could not delete snapshot {id}, {response.content}")
 
     def does_snapshot_id_exist(self, id):
         snapshots = self.retrieve_all_snapshots()
@@ -121,6 +215,182 @@ class SnapshotManager:
                 return True
         return False
 
+    def plan_retention(self, policy: SnapshotRetentionPolicy):
+        """
+        Works out which snapshots a retention policy keeps and which it deletes, nothing is deleted.
+        The whole decision comes from one streamed snapshot listing.
+
+        Args:
+            policy (SnapshotRetentionPolicy): What to keep.
+
+        Returns:
+            [SnapshotRetentionReport]: The dry run, see delete and bytes_reclaimed.
+        """
+        records, reasons = select_snapshots_to_keep(
+            self.iterate_snapshot_records(policy.resource_type), policy
+        )
+        report = SnapshotRetentionReport(policy=policy, dry_run=True, reasons=reasons)
+        for record in records:
+            if str(record["id"]) in reasons:
+                report.keep.append(record)
+            else:
+                report.delete.append(record)
+        report.keep.sort(key=lambda record: record["created_at"], reverse=True)
+        report.delete.sort(key=lambda record: record["created_at"])
+        return report
+
+    def apply_retention(
+        self, policy: SnapshotRetentionPolicy, dry_run=False, max_in_flight=8
+    ):
+        """
+        Deletes every snapshot the retention policy doesn't keep, see plan_retention.
+
+        The deletes are sent side by side, oldest snapshot first, each one still goes through the shared
+        rate limited queue. When the remaining hourly rate budget is known and can't cover all of them
+        while leaving BulkFetchCostModel.reserved_rate_budget, the newest ones are deferred to a later run.
+
+        Args:
+            policy (SnapshotRetentionPolicy): What to keep.
+            dry_run (bool, optional): Only report what would be deleted. Defaults to False.
+            max_in_flight (int, optional): Deletes sent at the same time. Defaults to 8.
+
+        Returns:
+            [SnapshotRetentionReport]: What was kept, deleted, deferred and failed.
+        """
+        started_at = time.monotonic()
+        report = self.plan_retention(policy)
+        if dry_run:
+            report.seconds = time.monotonic() - started_at
+            return report
+        report.dry_run = False
+
+        to_delete = list(report.delete)
+        remaining = bulk_fetch_cost_model.rate_limit_remaining
+        if not remaining == None:
+            budget = max(0, remaining - bulk_fetch_cost_model.reserved_rate_budget)
+            report.deferred = to_delete[budget:]
+            to_delete = to_delete[:budget]
+
+        def delete(record):
+            response = self.snapshotapi.delete_snapshot_id(record["id"])
+            bulk_fetch_cost_model.record_response(response)
+            if not response and not response.status_code == 404:
+                raise Exception(f"{response.status_code} {response.content}")
+
+        outcomes = run_bounded(delete, to_delete, max_in_flight=max_in_flight)
+        for record, (result, error) in zip(to_delete, outcomes):
+            if error == None:
+                report.deleted.append(record)
+            else:
+                report.errors[str(record["id"])] = str(error)
+        report.seconds = time.monotonic() - started_at
+        return report
+
+    def replicate(self, snapshot: Snapshot, regions: list, timeout=None):
+        """
+        Copies a droplet snapshot to other regions, e.g. for disaster recovery.
+
+        Every transfer is started at once and followed by the shared ActionPoller, so the whole replication
+        takes about as long as the slowest region rather than the sum of them.
+        Regions the snapshot is already in are not transferred again.
+
+        Args:
+            snapshot (Snapshot): Snapshot object, a DropletSnapshot works too.
+            regions (list): Region slugs to copy to, e.g. ["nyc3", "ams3"].
+            timeout (float, optional): Seconds to wait for all transfers together. Defaults to None, ActionManager.wait_timeout.
+
+        Raises:
+            ErrorSnapshotTransferNotSupported: For a volume snapshot, only droplet snapshots can be transferred.
+
+        Returns:
+            [SnapshotReplication]: Status and transfer time per region, in the same order.
+        """
+        # DropletSnapshot records come from a droplet's own snapshot listing and have no resource_type.
+        resource_type = getattr(snapshot.attributes, "resource_type", "droplet")
+        if not resource_type == "droplet":
+            raise ErrorSnapshotTransferNotSupported(
+                f"Snapshot {snapshot.attributes.id} is a {resource_type} snapshot, only droplet snapshots can be transferred"
+            )
+        started_at = time.monotonic()
+        replication = SnapshotReplication(snapshot_id=snapshot.attributes.id)
+        present = list(snapshot.attributes.regions or [])
+        targets = []
+        for region in regions:
+            if region in [result.region for result in replication.results]:
+                continue
+            result = SnapshotTransferResult(region=region)
+            if region in present:
+                result.status = "already-present"
+            else:
+                targets.append(result)
+            replication.results.append(result)
+
+        def transfer(result):
+            sent_at = time.monotonic()
+            response = self.imageapi.transfer_image(snapshot.attributes.id, result.region)
+            if not response:
+                if response.status_code == 404:
+                    raise ErrorSnapshotNotFound(
+                        f"Snapshot with id:{snapshot.attributes.id} not found"
+                    )
+                raise Exception(f"Transfer refused, {response.content}")
+            content = json.loads(response.content.decode("utf-8"))
+
+            def transferred(action):
+                result.seconds = time.monotonic() - sent_at
+
+            return Action(ActionAttributes(**content["action"]), on_finished=transferred)
+
+        outcomes = run_bounded(transfer, targets, max_in_flight=max(1, len(targets)))
+        for result, (action, error) in zip(targets, outcomes):
+            result.action = action
+            if not error == None:
+                result.status = "failed"
+                result.error = str(error)
+
+        submitted = [result for result in targets if not result.action == None]
+        errors = ActionManager().wait_for_actions_to_finish(
+            [result.action for result in submitted], timeout=timeout
+        )
+        for result, error in zip(submitted, errors):
+            if error == None or result.action.attributes.status == "errored":
+                result.status = result.action.attributes.status
+            else:
+                # Timed out, or the api doesn't know the action, the copy is unconfirmed.
+                result.status = "failed"
+            if not error == None:
+                result.error = str(error)
+
+        # The listing may share the regions list between snapshots, so it is replaced, not appended to.
+        snapshot.attributes.regions = present + [
+            result.region for result in targets if result.status == "completed"
+        ]
+        replication.seconds = time.monotonic() - started_at
+        return replication
+
+
+@dataclass
+class SnapshotTransferResult:
+    region: str = None
+    action: object = None
+    # "completed", "errored", "failed" (the transfer was refused, timed out or can't be confirmed) or "already-present".
+    status: str = None
+    seconds: float = None
+    error: str = None
+
+
+@dataclass
+class SnapshotReplication:
+    snapshot_id: str = None
+    results: list = field(default_factory=list)
+    seconds: float = None
+
+    @property
+    def ok(self):
+        return all(
+            result.status in ("completed", "already-present") for result in self.results
+        )
+
 
 @dataclass
 class SnapshotArguments:
@@ -128,7 +398,7 @@ class SnapshotArguments:
     tags: list = field(default_factory=list)
 
 
-@dataclass
+@slotted_dataclass
 class SnapshotAttributes:
     id: str = None
     name: str = None
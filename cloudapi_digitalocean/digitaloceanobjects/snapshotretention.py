@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from ..common.timestamps import parse_timestamp
+
+
+@dataclass
+class SnapshotRetentionPolicy:
+    """
+    Which snapshots to keep, everything else in scope is deleted.
+
+    Snapshots are grouped by the resource they were taken of (group_by="resource") or by each of their
+    tags (group_by="tag"), and every group is walked newest first. A snapshot is kept when any rule
+    of any of its groups keeps it. With group_by="tag" untagged snapshots are grouped by their resource,
+    so every resource keeps its own untagged snapshots rather than all untagged snapshots sharing one group.
+
+    keep_last:   the newest keep_last snapshots.
+    keep_daily:  the newest snapshot of each of the last keep_daily days that have a snapshot.
+    keep_weekly: the newest snapshot of each of the last keep_weekly ISO weeks that have a snapshot.
+    """
+
+    keep_last: int = 0
+    keep_daily: int = 0
+    keep_weekly: int = 0
+    group_by: str = "resource"
+    # Only snapshots with this tag are in scope, all others are left alone.
+    tag_name: str = None
+    # None for every snapshot, or only "droplet" or "volume" snapshots.
+    resource_type: str = None
+
+    def validate(self):
+        if not self.group_by in ("resource", "tag"):
+            raise ValueError(f'group_by must be "resource" or "tag", not {self.group_by}')
+        if min(self.keep_last, self.keep_daily, self.keep_weekly) < 0:
+            raise ValueError("Retention counts can't be negative")
+        if self.keep_last + self.keep_daily + self.keep_weekly == 0:
+            raise ValueError("A retention policy that keeps nothing would delete every snapshot")
+
+    def group_keys(self, record):
+        resource_key = (record.get("resource_type"), str(record.get("resource_id")))
+        if self.group_by == "resource":
+            return [resource_key]
+        # Tags are strings, so a resource tuple never collides with a tag group.
+        return list(record.get("tags") or []) or [resource_key]
+
+
+@dataclass
+class SnapshotRetentionReport:
+    policy: SnapshotRetentionPolicy = None
+    dry_run: bool = True
+    # Raw api records (dict), newest first.
+    keep: list = field(default_factory=list)
+    # Raw api records (dict), oldest first, the order they are deleted in.
+    delete: list = field(default_factory=list)
+    # Snapshot id -> rules that kept it, e.g. ["last", "daily"].
+    reasons: dict = field(default_factory=dict)
+    deleted: list = field(default_factory=list)
+    # Left for a later run, the hourly rate budget ran low.
+    deferred: list = field(default_factory=list)
+    # Snapshot id -> error.
+    errors: dict = field(default_factory=dict)
+    seconds: float = None
+
+    @property
+    def gigabytes_reclaimed(self):
+        return sum(record.get("size_gigabytes") or 0 for record in self.delete)
+
+    @property
+    def bytes_reclaimed(self):
+        return int(self.gigabytes_reclaimed * 1024 ** 3)
+
+
+def select_snapshots_to_keep(records, policy: SnapshotRetentionPolicy):
+    """
+    Applies a retention policy to snapshot records in a single pass over them.
+
+    Args:
+        records (iterable): Raw api snapshot records (dict), e.g. a streamed listing.
+        policy (SnapshotRetentionPolicy): What to keep.
+
+    Returns:
+        [tuple]: (records in scope, snapshot id -> rules that kept it).
+    """
+    policy.validate()
+    in_scope = []
+    groups = {}
+    for record in records:
+        if not policy.tag_name == None and not policy.tag_name in (record.get("tags") or []):
+            continue
+        in_scope.append(record)
+        created = parse_timestamp(record.get("created_at"))
+        for key in policy.group_keys(record):
+            groups.setdefault(key, []).append((created, record))
+
+    reasons = {}
+    for group in groups.values():
+        group.sort(key=lambda item: item[0], reverse=True)
+        days, weeks = set(), set()
+        for position, (created, record) in enumerate(group):
+            kept_by = []
+            if position < policy.keep_last:
+                kept_by.append("last")
+            day = created.date()
+            if not day in days and len(days) < policy.keep_daily:
+                days.add(day)
+                kept_by.append("daily")
+            week = tuple(created.isocalendar())[:2]
+            if not week in weeks and len(weeks) < policy.keep_weekly:
+                weeks.add(week)
+                kept_by.append("weekly")
+            for reason in kept_by:
+                if not reason in reasons.setdefault(str(record["id"]), []):
+                    reasons[str(record["id"])].append(reason)
+    return in_scope, reasons
@@ -0,0 +1,249 @@
+from __future__ import annotations
+
+from ..digitaloceanapi.droplets import Droplets
+from ..digitaloceanapi.volumes import Volumes
+from ..digitaloceanapi.floatingips import FloatingIPs
+from ..digitaloceanapi.snapshots import Snapshots
+from ..common.cloudapiexceptions import *
+from .action import *
+from .resourceplan import ResourcePlan, action_step
+import json
+import threading
+import time
+
+
+def _gone(response):
+    # A 404 means someone else already deleted it, which is what we wanted.
+    return bool(response) or response.status_code == 404
+
+
+def _remaining_resources(status):
+    # What a destroy status still lists without a destroyed_at, e.g. ["droplet web-1", "volumes web-1-data"].
+    remaining = []
+    droplet = status.get("droplet") or {}
+    if not droplet.get("destroyed_at"):
+        remaining.append(f"droplet {droplet.get('name', droplet.get('id'))}")
+    for kind, items in (status.get("resources") or {}).items():
+        for item in items or []:
+            if not item.get("destroyed_at"):
+                remaining.append(f"{kind} {item.get('name', item.get('id'))}")
+    return remaining
+
+
+class TeardownPlanner:
+    """
+    Plans and runs the teardown of droplets together with their volumes, snapshots and floating ips.
+
+    The associated resources of every droplet come from one destroy_with_associated_resources GET per droplet,
+    no full listings are needed for existence checks.
+
+    bulk=True:  one selective destroy request per droplet deletes it and all of its resources,
+                droplets are independent branches and are destroyed in parallel.
+    bulk=False: one step per resource, volumes are detached and floating ips unassigned before they are deleted
+                and before their droplet is deleted, snapshots are deleted straight away, all in parallel.
+    """
+
+    # Seconds between destroy status checks when waiting for a bulk destroy.
+    status_interval = 2.0
+    max_status_interval = 30.0
+    # Seconds a bulk destroy may take before its step fails.
+    destroy_timeout = ActionManager.wait_timeout
+
+    def __init__(self):
+        self.dropletapi = Droplets()
+        self.volumeapi = Volumes()
+        self.floatingipapi = FloatingIPs()
+        self.snapshotapi = Snapshots()
+
+    def retrieve_droplet_resources(self, droplet_id):
+        """
+        Returns:
+            [dict]: "floating_ips", "snapshots", "volumes" and "volume_snapshots", each a list of {"id", "name", "cost"}.
+        """
+        response = self.dropletapi.list_droplet_resources(droplet_id)
+        if not response:
+            raise ErrorDropletNotFound(
+                f"Could not list the resources of droplet {droplet_id}, {response.content}"
+            )
+        content = json.loads(response.content.decode("utf-8"))
+        resources = {}
+        for kind in ["floating_ips", "snapshots", "volumes", "volume_snapshots"]:
+            resources[kind] = list(content.get(kind) or [])
+        # Floating ips are also listed under their new name, reserved ips.
+        known_ids = {str(item["id"]) for item in resources["floating_ips"]}
+        for item in content.get("reserved_ips") or []:
+            if not str(item["id"]) in known_ids:
+                resources["floating_ips"].append(item)
+        return resources
+
+    def plan(self, droplets: list, bulk=True, wait=True):
+        """
+        Builds the teardown plan, nothing is deleted until the plan is executed.
+
+        Args:
+            droplets (list): Droplet objects to tear down.
+            bulk (bool, optional): One selective destroy request per droplet. Defaults to True.
+            wait (bool, optional): Bulk steps only complete once the destroy finished. Defaults to True.
+
+        Returns:
+            [ResourcePlan]: The plan, execute(dry_run=True) only validates it.
+        """
+        resources = {}
+
+        def retrieve(droplet):
+            resources[droplet.attributes.id] = self.retrieve_droplet_resources(
+                droplet.attributes.id
+            )
+
+        threads = [
+            threading.Thread(target=retrieve, args=(droplet,)) for droplet in droplets
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        missing = [d.attributes.id for d in droplets if not d.attributes.id in resources]
+        if len(missing) > 0:
+            raise ErrorDropletNotFound(
+                f"Could not list the resources of droplets {missing}"
+            )
+
+        plan = ResourcePlan()
+        for droplet in droplets:
+            if bulk:
+                self.plan_bulk_destroy(plan, droplet, resources[droplet.attributes.id], wait)
+            else:
+                self.plan_destroy(plan, droplet, resources[droplet.attributes.id])
+        return plan
+
+    def plan_bulk_destroy(self, plan, droplet, resources, wait):
+        droplet_id = droplet.attributes.id
+        counts = ", ".join(
+            f"{len(items)} {kind}" for kind, items in resources.items() if len(items) > 0
+        )
+
+        def destroy():
+            response = self.dropletapi.destroy_droplet_with_associated_resources_selective(
+                droplet_id,
+                floating_ips=[str(item["id"]) for item in resources["floating_ips"]],
+                snapshots=[str(item["id"]) for item in resources["snapshots"]],
+                volumes=[str(item["id"]) for item in resources["volumes"]],
+                volume_snapshots=[str(item["id"]) for item in resources["volume_snapshots"]],
+            )
+            if not _gone(response):
+                raise Exception(f"Destroy of droplet {droplet_id} refused, {response.content}")
+            if wait and bool(response):
+                self.wait_for_destroy(droplet_id)
+            droplet.deleted = True
+
+        plan.add(
+            f"droplet:{droplet_id}",
+            f"Destroy droplet {droplet_id} ({droplet.attributes.name})"
+            + (f" with {counts}" if counts else ""),
+            destroy,
+        )
+
+    def wait_for_destroy(self, droplet_id, timeout=None):
+        """
+        Polls the destroy status of a droplet until it completed, with a growing interval.
+
+        Args:
+            droplet_id ([type]): The droplet being destroyed.
+            timeout (float, optional): Seconds to wait. Defaults to None, TeardownPlanner.destroy_timeout.
+
+        Raises:
+            ErrorActionTimeout: If the destroy didn't complete in time, naming what still remains.
+        """
+        if timeout == None:
+            timeout = self.destroy_timeout
+        deadline = time.monotonic() + timeout
+        interval = self.status_interval
+        remaining = None
+        while True:
+            response = self.dropletapi.check_destroy_with_associated_resources_status(
+                droplet_id
+            )
+            if response:
+                content = json.loads(response.content.decode("utf-8"))
+                if content.get("completed_at"):
+                    if content.get("failures"):
+                        raise Exception(
+                            f"Destroy of droplet {droplet_id} had {content['failures']} failures"
+                        )
+                    return
+                remaining = _remaining_resources(content)
+            elif response.status_code == 404:
+                return
+            if time.monotonic() + interval > deadline:
+                raise ErrorActionTimeout(
+                    f"Destroy of droplet {droplet_id} didn't complete within {timeout}s"
+                    + ("" if remaining == None else f", still remaining: {remaining}")
+                )
+            time.sleep(interval)
+            interval = min(interval * 2, self.max_status_interval)
+
+    def plan_destroy(self, plan, droplet, resources):
+        droplet_id = droplet.attributes.id
+        droplet_dependencies = []
+
+        for volume in resources["volumes"]:
+            detach_key = f"volume:{volume['id']}:detach"
+            plan.add(
+                detach_key,
+                f"Detach volume {volume['id']} ({volume['name']}) from droplet {droplet_id}",
+                action_step(
+                    lambda volume_id=volume["id"]: self.volumeapi.detach_volume_from_droplet(
+                        volume_id, droplet_id
+                    )
+                ),
+            )
+            plan.add(
+                f"volume:{volume['id']}",
+                f"Delete volume {volume['id']} ({volume['name']})",
+                lambda volume_id=volume["id"]: _gone(
+                    self.volumeapi.delete_volume_id(volume_id)
+                ),
+                depends_on=[detach_key],
+            )
+            droplet_dependencies.append(detach_key)
+
+        for floatingip in resources["floating_ips"]:
+            unassign_key = f"floating_ip:{floatingip['name']}:unassign"
+            plan.add(
+                unassign_key,
+                f"Unassign floating ip {floatingip['name']} from droplet {droplet_id}",
+                action_step(
+                    lambda ip=floatingip["name"]: self.floatingipapi.unassign_floating_ip(ip)
+                ),
+            )
+            plan.add(
+                f"floating_ip:{floatingip['name']}",
+                f"Delete floating ip {floatingip['name']}",
+                lambda ip=floatingip["name"]: _gone(
+                    self.floatingipapi.delete_floating_ip(ip)
+                ),
+                depends_on=[unassign_key],
+            )
+            droplet_dependencies.append(unassign_key)
+
+        for kind in ["snapshots", "volume_snapshots"]:
+            for snapshot in resources[kind]:
+                plan.add(
+                    f"snapshot:{snapshot['id']}",
+                    f"Delete snapshot {snapshot['id']} ({snapshot['name']})",
+                    lambda snapshot_id=snapshot["id"]: _gone(
+                        self.snapshotapi.delete_snapshot_id(snapshot_id)
+                    ),
+                )
+
+        def delete_droplet():
+            if not _gone(self.dropletapi.delete_droplet_id(droplet_id)):
+                return False
+            droplet.deleted = True
+
+        plan.add(
+            f"droplet:{droplet_id}",
+            f"Delete droplet {droplet_id} ({droplet.attributes.name})",
+            delete_droplet,
+            depends_on=droplet_dependencies,
+        )
@@ -1,18 +1,30 @@
 from __future__ import annotations
 
-from dataclasses import dataclass, field
+from dataclasses import asdict, dataclass, field
 from ..digitaloceanapi.volumes import Volumes
 from ..digitaloceanapi.snapshots import Snapshots
 from ..common.cloudapiexceptions import *
+from ..common.slotteddataclass import slotted_dataclass
+from ..common.payloadinterning import intern_fields
+from ..common.boundedconcurrency import run_bounded
+from ..common.timestamps import parse_timestamp
 from .action import *
 from .snapshot import *
 from .account import *
+from .inventorycolumns import volume_columns
+from .inventorystore import resolve_inventory_store
+from .bulkfetch import retrieve_records_by_ids, count_listing_records
+import datetime
 import json
 import threading
 import time
 
+# Volume fields that repeat between volumes, a listing with shared_payloads=True keeps one shared read-only
+# instance of each distinct value, otherwise only their strings are interned.
+INTERNED_VOLUME_FIELDS = ("region", "filesystem_type", "tags")
 
-@dataclass
+
+@slotted_dataclass
 class VolumeAttributes:
     id: str = None
     region: object = field(default_factory=list)
@@ -26,6 +38,32 @@ class VolumeAttributes:
     tags: list = field(default_factory=list)
 
 
+@dataclass
+class VolumeBatchResult:
+    item: object = None
+    volume: object = None
+    action: object = None
+    error: Exception = None
+    seconds: float = None
+
+    @property
+    def ok(self):
+        return self.error == None
+
+
+@dataclass
+class VolumeSnapshotGroup:
+    timestamp: str = None
+    snapshots: list = field(default_factory=list)
+    errors: list = field(default_factory=list)
+    # Seconds between the first and the last snapshot starting.
+    start_spread: float = None
+
+    @property
+    def ok(self):
+        return all(error == None for error in self.errors)
+
+
 @dataclass
 class VolumeArguments:
     size_gigabytes: int = None
@@ -56,14 +94,100 @@ class VolumeManager:
         self.volumeapi = Volumes()
         self.account_manager = AccountManager()
 
-    def check_limit(self):
-        volume_limit = self.account_manager.volume_limit()
-        if not len(self.retrieve_all_volumes()) < volume_limit:
-            raise ErrorAccountVolumeLimitReached
-            (
+    def check_limit(self, additional_volumes=1):
+        """
+        Raises ErrorAccountVolumeLimitReached unless additional_volumes more volumes fit in the account limit.
+        """
+        volume_limit, remaining = self.remaining_volume_capacity()
+        if additional_volumes > remaining:
+            raise ErrorAccountVolumeLimitReached(
                 f"You have reached your volume limit of {volume_limit}"
             )
 
+    def remaining_volume_capacity(self):
+        """
+        Returns the account volume limit and how many more volumes fit in it.
+        The account and the volume count are two GETs, made concurrently.
+
+        Returns:
+            (int, int): volume limit, volumes that can still be created.
+        """
+        outcomes = run_bounded(
+            lambda request: request(),
+            [self.account_manager.volume_limit, self.count_volumes],
+            max_in_flight=2,
+        )
+        for _, error in outcomes:
+            if not error == None:
+                raise error
+        (volume_limit, _), (volume_count, _) = outcomes
+        return volume_limit, max(0, volume_limit - volume_count)
+
+    def count_volumes(self):
+        """
+        Returns the number of volumes in the account from one single record listing page.
+        """
+        response = self.volumeapi.list_all_volumes(page=1, per_page=1)
+        if not response:
+            raise Exception(f"Could not count volumes, {response.status_code} {response.content}")
+        content = json.loads(response.content.decode("utf-8"))
+        try:
+            return content["meta"]["total"]
+        except KeyError:
+            return len(self.retrieve_all_volume_records())
+
+    def preflight_new_volumes(self, name_regions: list):
+        """
+        Checks volumes can be created before creating them: one filtered GET per name and region
+        for collisions, and one limit check for all of them, every request made concurrently.
+
+        Args:
+            name_regions (list): (name, region) of each volume to create.
+
+        Raises:
+            ErrorVolumeAlreadyExists: If a name is already used in its region, or twice in name_regions.
+            ErrorAccountVolumeLimitReached: If the volumes don't all fit in the account limit.
+        """
+        duplicates = {
+            name_region
+            for name_region in name_regions
+            if name_regions.count(name_region) > 1
+        }
+        if len(duplicates) > 0:
+            raise ErrorVolumeAlreadyExists(
+                f"Volume name, region asked for more than once: {sorted(duplicates)}"
+            )
+        existing = []
+        errors = []
+
+        def check_name(name, region):
+            try:
+                if self.does_volume_name_region_exist(name, region):
+                    existing.append((name, region))
+            except Exception as error:
+                errors.append(error)
+
+        def check_limit():
+            try:
+                self.check_limit(additional_volumes=len(name_regions))
+            except Exception as error:
+                errors.append(error)
+
+        threads = [threading.Thread(target=check_limit, args=())] + [
+            threading.Thread(target=check_name, args=(name, region))
+            for name, region in name_regions
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        if len(existing) > 0:
+            name, region = existing[0]
+            raise ErrorVolumeAlreadyExists(
+                f"Volume name:{name}, region:{region} Already Exists"
+            )
+        if len(errors) > 0:
+            raise errors[0]
 
     def create_new_volume(
         self,
@@ -80,13 +204,13 @@ class VolumeManager:
         arguments = locals()
         del arguments["self"]
 
-        if self.does_volume_name_region_exist(name, region):
-            raise ErrorVolumeAlreadyExists(
-                f"Volume name:{name}, region:{region} Already Exists"
-            )
-
-        self.check_limit()
+        self.preflight_new_volumes([(name, region)])
+        return self.create_volume_without_checks(arguments)
 
+    def create_volume_without_checks(self, arguments: dict):
+        """
+        Creates a volume from create_new_volume arguments, for callers that already ran preflight_new_volumes.
+        """
         newvolume = Volume()
         newvolume.arguments = VolumeArguments(**arguments)
         response = self.volumeapi.create_new_volume(**arguments)
@@ -95,13 +219,234 @@ class VolumeManager:
             volume_data = dict(json.loads(response.content.decode("utf-8"))["volume"])
             newvolume.attributes = VolumeAttributes(**volume_data)
         else:
-            raise Exception(f"Could not create volume {name}")
+            raise Exception(f"Could not create volume {arguments['name']}")
         return newvolume
 
-    def retrieve_all_volumes(self):
+    def create_new_volumes(self, specs: list, max_in_flight=8):
+        """
+        Creates many volumes concurrently, e.g. the data volumes of a database node.
+
+        The pre-flight runs once for the batch (one filtered GET per name, one limit check), then the creates
+        are submitted with at most max_in_flight at a time. A volume that fails a check or its create
+        gets its error in its result, the rest of the batch carries on.
 
+        Args:
+            specs (list): create_new_volume arguments per volume, as dicts or VolumeArguments,
+                          e.g. {"size_gigabytes": 100, "name": "db-1-data-1", "region": "nyc3"}
+            max_in_flight (int, optional): Creates submitted at the same time. Defaults to 8.
+
+        Returns:
+            [list]: One VolumeBatchResult per spec, in the same order.
+        """
+        results = []
+        for spec in specs:
+            arguments = dict(spec) if isinstance(spec, dict) else asdict(spec)
+            results.append(VolumeBatchResult(item=arguments))
+
+        seen = set()
+        for result in results:
+            arguments = result.item
+            name_region = (arguments.get("name"), arguments.get("region"))
+            size_gigabytes = arguments.get("size_gigabytes")
+            if size_gigabytes == None or not 1 <= size_gigabytes <= 16384:
+                result.error = ErrorVolumeSizeOutOfRange(
+                    f"Volume {name_region[0]} size {size_gigabytes} GB is outside 1 to 16384 GB"
+                )
+            elif name_region in seen:
+                result.error = ErrorVolumeAlreadyExists(
+                    f"Volume name:{name_region[0]}, region:{name_region[1]} asked for more than once"
+                )
+            seen.add(name_region)
+
+        pending = [result for result in results if result.error == None]
+        name_checks = run_bounded(
+            lambda result: self.does_volume_name_region_exist(
+                result.item["name"], result.item["region"]
+            ),
+            pending,
+            max_in_flight,
+        )
+        for result, (exists, error) in zip(pending, name_checks):
+            if not error == None:
+                result.error = error
+            elif exists:
+                result.error = ErrorVolumeAlreadyExists(
+                    f"Volume name:{result.item['name']}, region:{result.item['region']} Already Exists"
+                )
+
+        pending = [result for result in results if result.error == None]
+        if len(pending) > 0:
+            volume_limit, remaining = self.remaining_volume_capacity()
+            for result in pending[remaining:]:
+                result.error = ErrorAccountVolumeLimitReached(
+                    f"You have reached your volume limit of {volume_limit}"
+                )
+            pending = pending[:remaining]
+
+        def create(result):
+            started_at = time.monotonic()
+            try:
+                result.volume = self.create_volume_without_checks(result.item)
+            finally:
+                result.seconds = time.monotonic() - started_at
+
+        for result, (_, error) in zip(
+            pending, run_bounded(create, pending, max_in_flight)
+        ):
+            result.error = error
+        return results
+
+    def resize_volumes(self, sizes: dict, max_in_flight=8):
+        """
+        Grows many volumes concurrently.
+
+        Each resize is checked first with the same rules as Volume.resize (at most 16384 GB, only upwards),
+        the valid ones are submitted with at most max_in_flight at a time, then every resize action is waited on together.
+        Failures are reported per volume, the rest of the batch carries on.
+
+        Args:
+            sizes (dict): Volume object -> new size in GB.
+            max_in_flight (int, optional): Resizes submitted at the same time. Defaults to 8.
+
+        Returns:
+            [list]: One VolumeBatchResult per volume, in the same order, with its resize action.
+        """
+        results = [
+            VolumeBatchResult(item=size_gigabytes, volume=volume)
+            for volume, size_gigabytes in sizes.items()
+        ]
+        for result in results:
+            try:
+                result.volume.check_resize(result.item)
+            except Exception as error:
+                result.error = error
+
+        started_at = time.monotonic()
+        pending = [result for result in results if result.error == None]
+        submissions = run_bounded(
+            lambda result: result.volume.submit_resize(result.item),
+            pending,
+            max_in_flight,
+        )
+        for result, (action, error) in zip(pending, submissions):
+            result.action = action
+            result.error = error
+
+        # Waited on without raising, a failed resize is only the error of its own volume.
+        submitted = [result for result in results if not result.action == None]
+        errors = ActionManager().wait_for_actions_to_finish(
+            [result.action for result in submitted]
+        )
+        for result, error in zip(submitted, errors):
+            result.seconds = time.monotonic() - started_at
+            result.volume.lastaction = result.action
+            result.error = error
+        return results
+
+    def snapshot_volumes(
+        self,
+        volumes: list,
+        name_template="{volume_name}-{timestamp}",
+        tags=[],
+        max_in_flight=None,
+    ):
+        """
+        Snapshots many volumes together, e.g. every volume of a database cluster.
+
+        Every snapshot request is sent at once, with no existence scans first (a missing volume fails its own request),
+        so the snapshots start as close together as the api rate limit allows.
+        All snapshots share one consistency group timestamp, used in their names.
+
+        Args:
+            volumes (list): Volume objects.
+            name_template (str, optional): Snapshot name, may use {volume_name}, {volume_id}, {index} and {timestamp}.
+            tags (list, optional): Tags for every snapshot.
+            max_in_flight (int, optional): Requests sent at the same time. Defaults to None, all of them.
+
+        Returns:
+            [VolumeSnapshotGroup]: The snapshots and errors per volume, in the same order, and the start time spread.
+        """
+        volumes = list(volumes)
+        group = VolumeSnapshotGroup(
+            timestamp=datetime.datetime.now(datetime.timezone.utc).strftime(
+                "%Y%m%d%H%M%S"
+            )
+        )
+        response_times = {}
+
+        def snapshot(item):
+            index, volume = item
+            name = name_template.format(
+                volume_name=volume.attributes.name,
+                volume_id=volume.attributes.id,
+                index=index,
+                timestamp=group.timestamp,
+            )
+            newsnapshot = volume.create_snapshot(name, tags)
+            response_times[index] = time.time()
+            return newsnapshot
+
+        outcomes = run_bounded(
+            snapshot,
+            list(enumerate(volumes)),
+            max_in_flight=max_in_flight or len(volumes),
+        )
+        group.snapshots = [newsnapshot for newsnapshot, error in outcomes]
+        group.errors = [error for newsnapshot, error in outcomes]
+
+        # Prefer the start times the api recorded, fall back on when each response arrived.
+        started_at = [
+            parse_timestamp(newsnapshot.attributes.created_at)
+            for newsnapshot in group.snapshots
+            if not newsnapshot == None and newsnapshot.attributes.created_at
+        ]
+        if len(started_at) > 1:
+            group.start_spread = (max(started_at) - min(started_at)).total_seconds()
+        elif len(response_times) > 1:
+            group.start_spread = max(response_times.values()) - min(response_times.values())
+        elif len(response_times) == 1:
+            group.start_spread = 0.0
+        return group
+
+    def retrieve_snapshots_for_volumes(self, volumes: list, max_in_flight=8):
+        """
+        Lists the snapshots of many volumes side by side, each listing still goes through the shared rate limited queue.
+
+        Args:
+            volumes (list): Volume objects.
+            max_in_flight (int, optional): Volumes listed at the same time. Defaults to 8.
+
+        Raises:
+            ErrorVolumeNotFound: If any of the volumes doesn't exist, once every listing finished.
+
+        Returns:
+            [dict]: Volume id -> list of Snapshot objects, in the order of volumes.
+        """
+        volumes = list(volumes)
+        outcomes = run_bounded(
+            lambda volume: volume.retrieve_snapshots(), volumes, max_in_flight=max_in_flight
+        )
+        failures = [
+            (volume.attributes.id, error)
+            for volume, (snapshots, error) in zip(volumes, outcomes)
+            if not error == None
+        ]
+        if len(failures) > 0:
+            errors = [f"{id}: {error}" for id, error in failures]
+            if all(isinstance(error, ErrorVolumeNotFound) for id, error in failures):
+                raise ErrorVolumeNotFound(f"Could not list volume snapshots, {errors}")
+            raise Exception(f"Could not list volume snapshots, {errors}")
+        return {
+            volume.attributes.id: snapshots
+            for volume, (snapshots, error) in zip(volumes, outcomes)
+        }
+
+    def retrieve_all_volume_records(self):
+        """
+        Returns the raw api record (dict) of every volume in digitalocean account.
+        """
         volume_list = []
-        page, per_page = 1, 10
+        page, per_page = 1, 200
         response = self.volumeapi.list_all_volumes(page=page, per_page=per_page)
         content = json.loads(response.content.decode("utf-8"))
         volume_list.extend(content["volumes"])
@@ -113,19 +458,53 @@ class VolumeManager:
                 volume_list.extend(content["volumes"])
         except KeyError:
             pass
+        return volume_list
+
+    def retrieve_all_volumes(self, shared_payloads=False, store=None):
+        """
+        Returns an array of Volume objects, one for each volume in digitalocean account.
+        With store, the volumes come from an InventoryStore, which is refreshed in the background once it is stale.
+
+        Args:
+            shared_payloads (bool, optional): Share one read-only instance of the fields that repeat between volumes
+                                              (region, tags...), see payloadinterning. Defaults to False.
+            store ([type], optional): An InventoryStore, or True for the one set with enable_inventory_store.
+                                      Defaults to None, a live listing.
+        """
+        store = resolve_inventory_store(store)
+        if store is None:
+            volume_list = self.retrieve_all_volume_records()
+        else:
+            volume_list = store.serve("volumes", self.retrieve_all_volume_records)
 
         # Build and return that Volume object array.
         volume_objects = []
         for volume_item in volume_list:
             newvolume = Volume()
-            newvolume.attributes = VolumeAttributes(**volume_item)
+            newvolume.attributes = VolumeAttributes(
+                **intern_fields(volume_item, INTERNED_VOLUME_FIELDS, shared_payloads)
+            )
             newvolume.arguments = VolumeArguments()
             #You need to actually retreive the last action for the volume object before creating an Action
             #newvolume.lastaction = Action()
             volume_objects.append(newvolume)
         return volume_objects
 
-    def retrieve_all_volumes_by_name(self, name):
+    def retrieve_volume_columns(self, volumes: list = None):
+        """
+        Returns the volume inventory as numpy columns for fleet analytics, see InventoryColumns.
+
+        Args:
+            volumes (list, optional): Volume objects, defaults to every volume in the account.
+
+        Returns:
+            InventoryColumns: e.g. columns.group_totals("region", ["size_gigabytes"])
+        """
+        if volumes is None:
+            volumes = self.retrieve_all_volumes(shared_payloads=True)
+        return volume_columns(volumes)
+
+    def retrieve_all_volumes_by_name(self, name, shared_payloads=False):
         volume_list = []
         page, per_page = 1, 10
         response = self.volumeapi.list_all_volumes_by_name(
@@ -148,7 +527,9 @@ class VolumeManager:
         volume_objects = []
         for volume_item in volume_list:
             newvolume = Volume()
-            newvolume.attributes = VolumeAttributes(**volume_item)
+            newvolume.attributes = VolumeAttributes(
+                **intern_fields(volume_item, INTERNED_VOLUME_FIELDS, shared_payloads)
+            )
             newvolume.arguments = VolumeArguments()
             #You need to actually retreive the last action for the volume object before creating an Action
             #newvolume.lastaction = Action()
@@ -156,18 +537,41 @@ class VolumeManager:
         return volume_objects
 
     def retrieve_volume_by_id(self, id):
-        if self.does_volume_id_exist(id):
+        return self.retrieve_volumes_by_ids([id])[0]
+
+    def retrieve_volumes_by_ids(self, ids: list):
+        """
+        Returns a Volume object for each id, in the same order.
+        The ids are fetched with concurrent GETs or picked out of one volume listing, whichever
+        BulkFetchCostModel expects to be cheaper, never one listing per id.
+
+        Args:
+            ids (list): Volume ids.
+
+        Raises:
+            ErrorVolumeNotFound: If any of the volumes doesn't exist.
+        """
+        ids = list(ids)
+        records = retrieve_records_by_ids(
+            "volumes",
+            ids,
+            self.volumeapi.retrieve_volume_by_id,
+            "volume",
+            self.retrieve_all_volume_records,
+            lambda: count_listing_records(self.volumeapi.list_all_volumes),
+        )
+        missing = [id for id in ids if records[id] == None]
+        if len(missing) > 0:
+            raise ErrorVolumeNotFound(f"Volume {', '.join(map(str, missing))} does not exist")
+        volume_objects = []
+        for id in ids:
             newvolume = Volume()
-            response = self.volumeapi.retrieve_volume_by_id(id)
-            content = json.loads(response.content.decode("utf-8"))
-            volume_info = content["volume"]
-            newvolume.attributes = VolumeAttributes(**volume_info)
+            newvolume.attributes = VolumeAttributes(**records[id])
             newvolume.arguments = VolumeArguments()
             #You need to actually retreive the last action for the volume object before creating an Action
             #newvolume.lastaction = Action()
-            return newvolume
-        else:
-            raise ErrorVolumeNotFound(f"Volume {id} does not exist")
+            volume_objects.append(newvolume)
+        return volume_objects
 
     def retrieve_volume_by_name_region(self, name, region):
         if self.does_volume_name_region_exist(name, region):
@@ -189,10 +593,13 @@ class VolumeManager:
         if isinstance(tag, str):
             tag = [tag]
         return_volumes = []
-        volumes = self.retrieve_all_volumes()
-        for volume in volumes:
-            if set(list(tag)) == set(volume.attributes.tags):
-                return_volumes.append(volume)
+        # Always a live listing, these feed the tag deletes.
+        for volume_item in self.retrieve_all_volume_records():
+            if set(list(tag)) == set(volume_item.get("tags") or []):
+                newvolume = Volume()
+                newvolume.attributes = VolumeAttributes(**volume_item)
+                newvolume.arguments = VolumeArguments()
+                return_volumes.append(newvolume)
         if len(return_volumes) > 0:
             return return_volumes
         else:
@@ -214,10 +621,13 @@ class VolumeManager:
         if isinstance(tag, str):
             tag = [tag]
         return_volumes = []
-        volumes = self.retrieve_all_volumes()
-        for volume in volumes:
-            if set(list(tag)).issubset(set(volume.attributes.tags)):
-                return_volumes.append(volume)
+        # Always a live listing, these feed the tag deletes.
+        for volume_item in self.retrieve_all_volume_records():
+            if set(list(tag)).issubset(set(volume_item.get("tags") or [])):
+                newvolume = Volume()
+                newvolume.attributes = VolumeAttributes(**volume_item)
+                newvolume.arguments = VolumeArguments()
+                return_volumes.append(newvolume)
         if len(return_volumes) > 0:
             return return_volumes
         else:
@@ -239,10 +649,13 @@ class VolumeManager:
         if isinstance(tag, str):
             tag = [tag]
         return_volumes = []
-        volumes = self.retrieve_all_volumes()
-        for volume in volumes:
-            if not set(list(tag)).isdisjoint(set(volume.attributes.tags)):
-                return_volumes.append(volume)
+        # Always a live listing, these feed the tag deletes.
+        for volume_item in self.retrieve_all_volume_records():
+            if not set(list(tag)).isdisjoint(set(volume_item.get("tags") or [])):
+                newvolume = Volume()
+                newvolume.attributes = VolumeAttributes(**volume_item)
+                newvolume.arguments = VolumeArguments()
+                return_volumes.append(newvolume)
         if len(return_volumes) > 0:
             return return_volumes
         else:
@@ -279,20 +692,18 @@ class VolumeManager:
                 self.volumeapi.delete_volume_name_region(name, region)
 
     def does_volume_id_exist(self, id):
-        volumes = self.retrieve_all_volumes()
-        for volume in volumes:
-            if str(volume.attributes.id) == str(id):
+        for volume_item in self.retrieve_all_volume_records():
+            if str(volume_item["id"]) == str(id):
                 return True
         return False
 
     def does_volume_name_region_exist(self, name, region):
-        volumes = self.retrieve_all_volumes()
-        for volume in volumes:
-            if (str(volume.attributes.name) == str(name)) and (
-                str(volume.attributes.region["slug"]) == str(region)
-            ):
-                return True
-        return False
+        # The api filters on name and region, no need to list every volume.
+        response = self.volumeapi.retrieve_volume_name_region(name, region)
+        if not response:
+            raise Exception(f"Could not look up volume {name} in {region}, {response.content}")
+        content = json.loads(response.content.decode("utf-8"))
+        return len(content["volumes"]) > 0
 
 
 
@@ -353,80 +764,154 @@ class Volume:
 
 
     def create_snapshot(self, name, tags=[]):
+        """
+        Creates a snapshot of the volume, a volume that no longer exists raises ErrorVolumeNotFound.
+        """
         id = self.attributes.id
-        if not self.volume_manager.does_volume_id_exist(id):
-            raise ErrorVolumeNotFound(f"Volume id:{id} not found.")
-        volumename = self.attributes.name
         arguments = {}
         arguments["name"] = name
         arguments["tags"] = tags
-        if self.volume_manager.does_volume_id_exist(id):
-            newsnapshot = Snapshot()
-            newsnapshot.arguments = SnapshotArguments(**arguments)
-            response = self.volumeapi.create_snapshot_from_volume(id, name, tags)
-            if response:
-                content = json.loads(response.content.decode("utf-8"))
-                snapshot_info = content["snapshot"]
-                newsnapshot.attributes = SnapshotAttributes(**snapshot_info)
-                return newsnapshot
-
-        else:
+        newsnapshot = Snapshot()
+        newsnapshot.arguments = SnapshotArguments(**arguments)
+        response = self.volumeapi.create_snapshot_from_volume(id, name, tags)
+        if response:
+            content = json.loads(response.content.decode("utf-8"))
+            snapshot_info = content["snapshot"]
+            newsnapshot.attributes = SnapshotAttributes(**snapshot_info)
+            return newsnapshot
+        elif response.status_code == 404:
             raise ErrorVolumeNotFound(
-                f"Cant create snapshot from non existent volume {id}:{volumename}"
+                f"Cant create snapshot from non existent volume {id}:{self.attributes.name}"
             )
+        raise Exception(f"Could not snapshot volume {id}, {response.content}")
 
-    def retrieve_snapshots(self):
-        # Buildlist of snapshots from api, but take in to account pagination
-        snapshot_list = []
-        page, per_page = 1, 10
-        response = self.volumeapi.list_snapshots_for_volume(
-            id, page=page, per_page=per_page
-        )
-        content = json.loads(response.content.decode("utf-8"))
-        print(content)
-        snapshot_list.extend(content["snapshots"])
-        try:
-            while content["links"]["pages"]["next"]:
-                response = self.volumeapi.list_snapshots_for_volume(
-                    id, page=page, per_page=per_page
+    def iterate_snapshot_records(self, per_page=200):
+        """
+        Yields the raw api record (dict) of every snapshot of the volume.
+        Pages are requested as they are consumed, stop iterating to stop paging.
+        """
+        if not self.deleted==False:
+            raise ErrorVolumeNotFound(f"{self.attributes.id} was deleted")
+        id = self.attributes.id
+        page = 1
+        while True:
+            response = self.volumeapi.list_snapshots_for_volume(
+                id, page=page, per_page=per_page
+            )
+            if not response:
+                if response.status_code == 404:
+                    raise ErrorVolumeNotFound(f"Volume with id:{id} not found")
+                raise Exception(
+                    f"Could not list the snapshots of volume {id}, {response.content}"
                 )
-                content = json.loads(response.content.decode("utf-8"))
-                snapshot_list.extend(content["snapshots"])
-        except KeyError:
-            pass
+            content = json.loads(response.content.decode("utf-8"))
+            for snapshot_item in content["snapshots"]:
+                yield snapshot_item
+            try:
+                if not content["links"]["pages"]["next"]:
+                    break
+            except KeyError:
+                break
+            page = page + 1
 
+    def retrieve_snapshots(self):
         # Build and return that Snapshot object array.
         snapshot_objects = []
-        for snapshot_item in snapshot_list:
+        for snapshot_item in self.iterate_snapshot_records():
             newsnapshot = Snapshot()
             newsnapshot.attributes = SnapshotAttributes(**snapshot_item)
             newsnapshot.arguments = SnapshotArguments()
             snapshot_objects.append(newsnapshot)
         return snapshot_objects
 
+    def detach_from_droplets(self, attach_to=None):
+        """
+        Detaches the volume from every droplet it is attached to, and optionally attaches it to another one.
 
+        Args:
+            attach_to ([type], optional): Droplet object or droplet id to attach the volume to once detached.
 
-    
-
-    def detach_from_droplets(self):
+        Returns:
+            [list]: Every detach action, then the attach action.
+        """
         #If volume is attached to any droplets, we detach it from them.
         self.update()
-        droplet_ids=self.attributes.droplet_ids
-        if len(droplet_ids)>0:
-            for droplet_id in droplet_ids:
-                response = self.volumeapi.detach_volume_from_droplet(
+        return self.detach_from_droplet_ids(self.attributes.droplet_ids, attach_to=attach_to)
+
+    def detach_from_droplet_ids(self, droplet_ids: list, attach_to=None):
+        """
+        Detaches the volume from the given droplets without reading the volume first,
+        for callers that already know where it is attached, e.g. during a failover.
+
+        The detach requests are sent concurrently and every detach action is tracked,
+        the call returns when all of them completed. With attach_to, the attach is sent the moment
+        the last detach completed, with no volume or droplet update in between.
+
+        Args:
+            droplet_ids (list): Droplets the volume is attached to.
+            attach_to ([type], optional): Droplet object or droplet id to attach the volume to once detached.
+
+        Returns:
+            [list]: Every detach action, then the attach action.
+
+        Raises:
+            ErrorVolumeDetachFailed: If a detach was refused or errored, the volume is then not attached anywhere new.
+        """
+        droplet_ids = list(droplet_ids or [])
+
+        def detach(droplet_id):
+            response = self.volumeapi.detach_volume_from_droplet(
                 self.attributes.id, droplet_id
             )
-            if response:
-                content = json.loads(response.content.decode("utf-8"))
-                action_data = dict(content["action"])
-                newaction=Action(ActionAttributes(**action_data))
-                self.action_manager.wait_for_action_completion(newaction)
-                self.lastaction=newaction
-
-        
+            if not response:
+                raise ErrorVolumeDetachFailed(
+                    f"Volume {self.attributes.id} detach from droplet {droplet_id} refused, {response.content}"
+                )
+            content = json.loads(response.content.decode("utf-8"))
+            action_data = dict(content["action"])
+            return Action(ActionAttributes(**action_data))
+
+        outcomes = run_bounded(detach, droplet_ids, max_in_flight=len(droplet_ids))
+        actions = [action for action, error in outcomes if not action == None]
+        # Waited on without raising, so every failed detach is collected into one ErrorVolumeDetachFailed.
+        action_errors = self.action_manager.wait_for_actions_to_finish(actions)
+        if len(actions) > 0:
+            self.lastaction = actions[-1]
+
+        failures = [str(error) for action, error in outcomes if not error == None]
+        failures.extend(
+            f"Volume {self.attributes.id} detach, {error}"
+            for error in action_errors
+            if not error == None
+        )
+        if len(failures) > 0:
+            raise ErrorVolumeDetachFailed("; ".join(failures))
+
+        if not attach_to == None:
+            droplet_id = getattr(getattr(attach_to, "attributes", None), "id", attach_to)
+            region = self.attributes.region
+            response = self.volumeapi.attach_volume_to_droplet(
+                self.attributes.id,
+                droplet_id,
+                region["slug"] if isinstance(region, dict) else region,
+            )
+            if not response:
+                raise Exception(
+                    f"Could not attach volume {self.attributes.id} to droplet {droplet_id}, {response.content}"
+                )
+            content = json.loads(response.content.decode("utf-8"))
+            attach_action = Action(ActionAttributes(**dict(content["action"])))
+            self.action_manager.wait_for_action_completion(attach_action)
+            self.lastaction = attach_action
+            actions.append(attach_action)
+        return actions
 
     def resize(self,size_gigabytes):
+        newaction=self.submit_resize(size_gigabytes)
+        self.action_manager.wait_for_action_completion(newaction)
+        self.lastaction=newaction
+
+    def check_resize(self,size_gigabytes):
         #size from 1GB to max 16,384GB
         if(size_gigabytes>16384):
             raise ErrorVolumeResizeValueTooLarge("Maximum volume resize value of 16384 GB has been requested.")
@@ -436,10 +921,17 @@ class Volume:
         if(target_size<=current_size):
             raise ErrorVolumeResizeDirection("You tried to shrink a volume, this isn't allowed. You can only increase a volumes size")
 
+    def submit_resize(self,size_gigabytes):
+        """
+        Checks and sends a resize without waiting for it.
+
+        Returns:
+            [Action]: The resize action, still in progress.
+        """
+        self.check_resize(size_gigabytes)
         response=self.volumeapi.resize_volume(self.attributes.id,size_gigabytes,self.attributes.region['slug'])
         if response:
             content = json.loads(response.content.decode("utf-8"))
             action_data = dict(content["action"])
-            newaction=Action(ActionAttributes(**action_data))
-            self.action_manager.wait_for_action_completion(newaction)
-            self.lastaction=newaction
+            return Action(ActionAttributes(**action_data))
+        raise Exception(f"Could not resize volume {self.attributes.id}, {response.content}")
@@ -0,0 +1,7 @@
+import os
+import sys
+
+# The tests run from a checkout, not an installed package.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Building the api connection objects only needs a token to be set, the tests never send a request.
+os.environ.setdefault("DIGITALOCEAN_ACCESS_TOKEN", "test")
@@ -0,0 +1,31 @@
+import json
+
+
+class FakeResponse:
+    """
+    Stands in for a requests.Response: falsy on an error status, json body in content.
+    """
+
+    def __init__(self, status_code=200, body=None, headers=None):
+        self.status_code = status_code
+        self.content = json.dumps({} if body is None else body).encode("utf-8")
+        self.headers = {} if headers is None else headers
+
+    def __bool__(self):
+        return self.status_code < 400
+
+
+def action_body(id, status="in-progress", type="attach_volume", region_slug="nyc1"):
+    return {
+        "action": {
+            "id": id,
+            "status": status,
+            "type": type,
+            "started_at": "2024-01-01T00:00:00Z",
+            "completed_at": None,
+            "resource_id": None,
+            "resource_type": "volume",
+            "region": None,
+            "region_slug": region_slug,
+        }
+    }
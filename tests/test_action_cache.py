@@ -0,0 +1,51 @@
+from cloudapi_digitalocean.digitaloceanobjects.action import ActionAttributes, ActionManager
+
+from fakeapi import FakeResponse
+
+
+class FakeActions:
+    def __init__(self, record):
+        self.record = record
+        self.requests = 0
+
+    def retrieve_existing_action(self, action_id):
+        self.requests = self.requests + 1
+        return FakeResponse(200, {"action": dict(self.record)})
+
+
+def finished_record(id):
+    return {
+        "id": id,
+        "status": "completed",
+        "type": "resize",
+        "started_at": "2024-01-01T00:00:00Z",
+        "completed_at": "2024-01-01T00:01:00Z",
+        "resource_id": 7,
+        "resource_type": "droplet",
+        "region": {"slug": "nyc1"},
+        "region_slug": "nyc1",
+    }
+
+
+def test_cached_finished_action_is_a_mutable_copy():
+    manager = ActionManager()
+    manager.actionapi = FakeActions(finished_record(900001))
+
+    first = manager.retrive_action(900001)
+    second = manager.retrive_action(900001)
+    assert manager.actionapi.requests == 1
+    assert type(second.attributes) is ActionAttributes
+
+    second.attributes.status = "errored"
+    second.attributes.region["slug"] = "ams3"
+    third = manager.retrive_action(900001)
+    assert third.attributes.status == "completed"
+    assert third.attributes.region == {"slug": "nyc1"}
+    assert first.attributes.region == {"slug": "nyc1"}
+
+
+def test_caching_does_not_freeze_the_callers_attributes():
+    attributes = ActionAttributes(**finished_record(900002))
+    ActionManager.remember_finished_action(attributes)
+    attributes.status = "errored"
+    assert ActionManager.finished_action(900002).status == "completed"
@@ -0,0 +1,120 @@
+from cloudapi_digitalocean.digitaloceanapi.actions import Actions
+from cloudapi_digitalocean.digitaloceanobjects.action import ActionManager
+from cloudapi_digitalocean.digitaloceanobjects.actionhistory import ActionHistory
+
+from fakeapi import FakeResponse, action_body
+
+
+class FakeActionListing:
+    """
+    The account's actions, newest first, paged like GET /v2/actions.
+    """
+
+    def __init__(self):
+        self.records = []
+        self.pages = []
+        self.lookups = []
+
+    def add(self, count, status="completed"):
+        next_id = self.records[0]["id"] + 1 if self.records else 1
+        for id in range(next_id, next_id + count):
+            self.records.insert(0, action_body(id, status=status)["action"])
+
+    def set_status(self, id, status):
+        for record in self.records:
+            if record["id"] == id:
+                record["status"] = status
+
+    def list_all_actions(self, page=0, per_page=0):
+        self.pages.append(page)
+        start = (page - 1) * per_page
+        links = {"pages": {"next": "next"}} if start + per_page < len(self.records) else {}
+        return FakeResponse(
+            200, {"actions": [dict(r) for r in self.records[start : start + per_page]], "links": links}
+        )
+
+    def retrieve_existing_action(self, action_id):
+        self.lookups.append(action_id)
+        return self.current(action_id)
+
+    def current(self, action_id):
+        for record in self.records:
+            if record["id"] == action_id:
+                return FakeResponse(200, {"action": dict(record)})
+        return FakeResponse(404, {"message": "not found"})
+
+
+def manager_with(listing, monkeypatch):
+    # Returned in-progress actions are polled through their own Actions object, those polls aren't counted as lookups.
+    monkeypatch.setattr(Actions, "retrieve_existing_action", lambda self, action_id: listing.current(action_id))
+    manager = ActionManager()
+    manager.actionapi = listing
+    return manager
+
+
+def test_sync_only_pages_down_to_the_high_water_mark(tmp_path, monkeypatch):
+    path = str(tmp_path / "actions.jsonl")
+    listing = FakeActionListing()
+    listing.add(250)
+    manager = manager_with(listing, monkeypatch)
+
+    actions = manager.sync_action_history(path)
+    assert [a.attributes.id for a in actions] == list(range(250, 0, -1))
+    assert listing.pages == [1, 2]
+
+    # Nothing new: the first record on page 1 is already at the mark.
+    listing.pages = []
+    assert len(manager.sync_action_history(path)) == 250
+    assert listing.pages == [1]
+
+    # 205 new actions push the mark onto page 2, page 3 is never read.
+    listing.add(205)
+    listing.pages = []
+    actions = manager.sync_action_history(path)
+    assert listing.pages == [1, 2]
+    assert [a.attributes.id for a in actions] == list(range(455, 0, -1))
+
+    # Every action was appended once, oldest first.
+    with open(path, encoding="utf-8") as history_file:
+        lines = history_file.readlines()
+    assert len(lines) == 455
+    assert max(ActionHistory(path).load()) == 455
+    assert listing.lookups == []
+
+
+def test_in_progress_action_is_refreshed_once_it_completed(tmp_path, monkeypatch):
+    path = str(tmp_path / "actions.jsonl")
+    listing = FakeActionListing()
+    listing.add(2)
+    listing.add(1, status="in-progress")
+    manager = manager_with(listing, monkeypatch)
+
+    first_sync = manager.sync_action_history(path)
+    assert [a.attributes.status for a in first_sync] == ["in-progress", "completed", "completed"]
+
+    # Still running: looked up directly, nothing is appended for it.
+    listing.lookups = []
+    manager.sync_action_history(path)
+    assert listing.lookups == [3]
+    assert ActionHistory(path).load()[3]["status"] == "in-progress"
+
+    listing.set_status(3, "completed")
+    listing.add(1)
+    listing.lookups = []
+    actions = manager.sync_action_history(path)
+    assert listing.lookups == [3]
+    assert [(a.attributes.id, a.attributes.status) for a in actions] == [
+        (4, "completed"),
+        (3, "completed"),
+        (2, "completed"),
+        (1, "completed"),
+    ]
+    assert ActionHistory(path).load()[3]["status"] == "completed"
+
+    # Once completed it is never looked up again.
+    listing.lookups = []
+    manager.sync_action_history(path)
+    assert listing.lookups == []
+
+    # The first sync handed the in-progress action to the poller, let it see the completion.
+    assert first_sync[0].finished.wait(timeout=30)
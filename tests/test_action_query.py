@@ -0,0 +1,80 @@
+import datetime
+
+import numpy
+
+from cloudapi_digitalocean.digitaloceanobjects.action import ActionManager
+
+from fakeapi import FakeResponse
+
+STARTED = datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc)
+TYPES = ["create", "resize", "snapshot"]
+
+
+def record(id):
+    # One action a minute, the newest has the highest id.
+    started_at = STARTED + datetime.timedelta(minutes=id)
+    return {
+        "id": id,
+        "status": "errored" if id % 10 == 0 else "completed",
+        "type": TYPES[id % 3],
+        "started_at": started_at.strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "completed_at": (started_at + datetime.timedelta(seconds=30)).strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "resource_id": 1000 + id,
+        "resource_type": "droplet" if id % 2 else "volume",
+        "region": None,
+        "region_slug": "fra1" if id % 4 else "nyc3",
+    }
+
+
+class FakeActionListing:
+    def __init__(self, count):
+        self.records = [record(id) for id in range(count, 0, -1)]
+        self.pages = []
+
+    def list_all_actions(self, page=0, per_page=0):
+        self.pages.append(page)
+        start = (page - 1) * per_page
+        links = {"pages": {"next": "next"}} if start + per_page < len(self.records) else {}
+        return FakeResponse(200, {"actions": self.records[start : start + per_page], "links": links})
+
+
+def manager_with(count):
+    manager = ActionManager()
+    manager.actionapi = FakeActionListing(count)
+    return manager
+
+
+def test_since_stops_paging_at_the_first_older_action():
+    manager = manager_with(1000)
+    since = STARTED + datetime.timedelta(minutes=901)
+
+    actions = manager.query_actions(since=since)
+    assert [a.attributes.id for a in actions] == list(range(1000, 900, -1))
+    # 200 per page, the cut is on page 1, the other four pages are never read.
+    assert manager.actionapi.pages == [1]
+
+    manager.actionapi.pages = []
+    actions = manager.query_actions(since="2024-01-01T11:31:00Z", until="2024-01-01T11:40:00Z", type="resize")
+    assert [a.attributes.id for a in actions] == [700, 697, 694, 691]
+    assert manager.actionapi.pages == [1, 2]
+
+
+def test_filters_combine():
+    manager = manager_with(100)
+    actions = manager.query_actions(status="errored", resource_type="volume", region_slug=["nyc3"])
+    assert [a.attributes.id for a in actions] == [100, 80, 60, 40, 20]
+
+
+def test_columnar_output():
+    manager = manager_with(100)
+    columns = manager.query_actions(since=STARTED + datetime.timedelta(minutes=91), columnar=True)
+
+    assert len(columns) == 10
+    assert columns.records["id"].tolist() == list(range(100, 90, -1))
+    assert columns.records["resource_id"].tolist() == list(range(1100, 1090, -1))
+    assert columns.group_counts("type") == {"create": 3, "resize": 4, "snapshot": 3}
+    assert columns.group_counts("status") == {"errored": 1, "completed": 9}
+    assert columns.mask("region_slug", "nyc3").sum() == 3
+    assert columns.records["started_at"][0] == numpy.datetime64("2024-01-01T01:40:00")
+    duration = columns.records["completed_at"] - columns.records["started_at"]
+    assert (duration == numpy.timedelta64(30, "s")).all()
@@ -0,0 +1,91 @@
+import time
+
+import pytest
+
+from cloudapi_digitalocean.common.cloudapiexceptions import (
+    ErrorActionDoesNotExists,
+    ErrorActionFailed,
+    ErrorActionTimeout,
+)
+from cloudapi_digitalocean.digitaloceanobjects.action import (
+    Action,
+    ActionAttributes,
+    ActionManager,
+)
+
+from fakeapi import FakeResponse, action_body
+
+
+class FakeActions:
+    def __init__(self, status_code=200, status="in-progress"):
+        self.status_code = status_code
+        self.status = status
+
+    def retrieve_existing_action(self, action_id):
+        if not self.status_code == 200:
+            return FakeResponse(self.status_code, {"message": "not found"})
+        return FakeResponse(200, action_body(action_id, status=self.status))
+
+
+def polled_action(id, actionapi):
+    action = Action(ActionAttributes(**action_body(id)["action"]))
+    # Swapped in before the first poll, which is at least ActionDurationStats.min_interval away.
+    action.actionapi = actionapi
+    return action
+
+
+def test_action_without_id_does_not_hang():
+    action = Action(ActionAttributes())
+    assert action.finished.is_set()
+    with pytest.raises(ErrorActionDoesNotExists):
+        ActionManager().wait_for_action_completion(action, timeout=1)
+
+
+def test_action_the_api_does_not_know_stops_being_polled():
+    action = polled_action(800001, FakeActions(status_code=404))
+    started_at = time.monotonic()
+    with pytest.raises(ErrorActionDoesNotExists):
+        ActionManager().wait_for_action_completion(action, timeout=30)
+    assert time.monotonic() - started_at < 10
+    assert not action in ActionManager.poller.pending()
+
+
+def test_wait_times_out():
+    actionapi = FakeActions()
+    action = polled_action(800002, actionapi)
+    try:
+        with pytest.raises(ErrorActionTimeout):
+            ActionManager().wait_for_action_completion(action, timeout=0.2)
+    finally:
+        # Let the poller finish with it.
+        actionapi.status = "completed"
+        action.finished.wait(30)
+
+
+def test_errored_action_raises():
+    action = polled_action(800003, FakeActions(status="errored"))
+    with pytest.raises(ErrorActionFailed):
+        ActionManager().wait_for_action_completion(action, timeout=30)
+
+
+def test_waiting_for_several_actions_shares_one_timeout():
+    actionapi = FakeActions()
+    actions = [polled_action(800010 + n, actionapi) for n in range(3)]
+    started_at = time.monotonic()
+    try:
+        with pytest.raises(ErrorActionTimeout):
+            ActionManager().wait_for_actions_completion(actions, timeout=0.3)
+        assert time.monotonic() - started_at < 1
+    finally:
+        actionapi.status = "completed"
+        for action in actions:
+            action.finished.wait(30)
+
+
+def test_waiting_for_several_actions_reports_the_unknown_ones():
+    actions = [
+        polled_action(800020, FakeActions(status="completed")),
+        Action(ActionAttributes()),
+    ]
+    with pytest.raises(ErrorActionDoesNotExists):
+        ActionManager().wait_for_actions_completion(actions, timeout=30)
@@ -0,0 +1,34 @@
+import pytest
+
+from cloudapi_digitalocean.common.cloudapiexceptions import ErrorVolumeNotFound
+from cloudapi_digitalocean.digitaloceanapi.droplets import Droplets
+from cloudapi_digitalocean.digitaloceanapi.volumes import Volumes
+from cloudapi_digitalocean.digitaloceanobjects.droplet import Droplet
+from cloudapi_digitalocean.digitaloceanobjects.volume import Volume
+
+from fakeapi import FakeResponse
+
+
+def test_failed_update_is_raised_before_any_attach(monkeypatch):
+    requests = []
+    monkeypatch.setattr(
+        Droplets,
+        "retrieve_droplet_by_id",
+        lambda self, id: FakeResponse(
+            200, {"droplet": {"id": id, "status": "active", "region": {"slug": "nyc3"}, "volume_ids": []}}
+        ),
+    )
+    monkeypatch.setattr(
+        Volumes,
+        "attach_volume_to_droplet",
+        lambda self, *args, **kwargs: requests.append(args) or FakeResponse(500),
+    )
+    droplet = Droplet(status="active")
+    droplet.attributes.id = 1
+    deleted_volume = Volume()
+    deleted_volume.attributes.id = "v1"
+    deleted_volume.deleted = True
+
+    with pytest.raises(ErrorVolumeNotFound):
+        droplet.attach_volumes([deleted_volume])
+    assert requests == []
@@ -0,0 +1,106 @@
+import threading
+
+import pytest
+
+from cloudapi_digitalocean.digitaloceanobjects import bulkfetch
+from cloudapi_digitalocean.digitaloceanobjects.bulkfetch import (
+    BulkFetchCostModel,
+    retrieve_records_by_ids,
+    retrieve_records_concurrently,
+)
+
+from fakeapi import FakeResponse
+
+
+class FakeVolumeGets:
+    def __init__(self, missing=(), failing=(), raising=()):
+        self.missing = missing
+        self.failing = failing
+        self.raising = raising
+        self.requested = []
+        self.lock = threading.Lock()
+
+    def __call__(self, id):
+        with self.lock:
+            self.requested.append(id)
+        if id in self.raising:
+            raise ConnectionError(f"connection to {id} reset")
+        if id in self.missing:
+            return FakeResponse(404, {"message": "not found"})
+        if id in self.failing:
+            return FakeResponse(500, {"message": "server error"})
+        return FakeResponse(200, {"volume": {"id": id}})
+
+
+def test_each_id_is_fetched_once():
+    request = FakeVolumeGets(missing=["v3"])
+    records = retrieve_records_concurrently(request, ["v1", "v2", "v1", "v3", "v2"], "volume")
+    assert sorted(request.requested) == ["v1", "v2", "v3"]
+    assert records == {"v1": {"id": "v1"}, "v2": {"id": "v2"}, "v3": None}
+
+
+def test_the_request_exception_is_raised():
+    request = FakeVolumeGets(raising=["v2"])
+    with pytest.raises(ConnectionError, match="v2"):
+        retrieve_records_concurrently(request, ["v1", "v2", "v3"], "volume")
+
+
+def test_a_failed_get_is_raised():
+    request = FakeVolumeGets(failing=["v2"])
+    with pytest.raises(Exception, match="volume v2, 500"):
+        retrieve_records_concurrently(request, ["v1", "v2"], "volume")
+
+
+class FakeVolumeListing:
+    def __init__(self, total):
+        self.total = total
+        self.requested = []
+
+    def count(self):
+        self.requested.append("count")
+        return self.total
+
+    def list_records(self):
+        self.requested.append("list")
+        return [{"id": f"v{n}"} for n in range(self.total)]
+
+
+@pytest.fixture
+def cold_cost_model(monkeypatch):
+    # A fresh process, nothing listed yet.
+    model = BulkFetchCostModel()
+    monkeypatch.setattr(bulkfetch, "bulk_fetch_cost_model", model)
+    return model
+
+
+def test_few_ids_of_unknown_inventory_are_fetched_with_gets(cold_cost_model):
+    request = FakeVolumeGets()
+    listing = FakeVolumeListing(total=5000)
+    records = retrieve_records_by_ids(
+        "volumes", ["v1", "v2"], request, "volume", listing.list_records, listing.count
+    )
+    assert sorted(request.requested) == ["v1", "v2"]
+    assert listing.requested == []
+    assert records["v2"] == {"id": "v2"}
+
+
+def test_many_ids_of_a_large_unknown_inventory_learn_the_size_then_get(cold_cost_model):
+    ids = [f"v{n}" for n in range(BulkFetchCostModel.unknown_size_get_limit + 5)]
+    request = FakeVolumeGets()
+    # 25 listing pages, the GETs are cheaper.
+    listing = FakeVolumeListing(total=5000)
+    retrieve_records_by_ids("volumes", ids, request, "volume", listing.list_records, listing.count)
+    assert listing.requested == ["count"]
+    assert len(request.requested) == len(ids)
+    assert cold_cost_model.inventory_size("volumes") == 5000
+
+
+def test_many_ids_of_a_small_unknown_inventory_learn_the_size_then_list(cold_cost_model):
+    ids = [f"v{n}" for n in range(BulkFetchCostModel.unknown_size_get_limit + 5)]
+    request = FakeVolumeGets()
+    # One listing page beats the GETs.
+    listing = FakeVolumeListing(total=30)
+    records = retrieve_records_by_ids("volumes", ids, request, "volume", listing.list_records, listing.count)
+    assert listing.requested == ["count", "list"]
+    assert request.requested == []
+    assert records["v3"] == {"id": "v3"}
@@ -0,0 +1,73 @@
+import pytest
+
+from cloudapi_digitalocean.digitaloceanobjects import bulkfetch
+from cloudapi_digitalocean.digitaloceanobjects.bulkfetch import BulkFetchCostModel
+from cloudapi_digitalocean.digitaloceanobjects.droplet import Droplet
+
+from fakeapi import FakeResponse
+
+
+class FakeApi:
+    """
+    Records every request, GETs by id answer with a record, listings with one record per page.
+    """
+
+    def __init__(self, key):
+        self.key = key
+        self.requested = []
+
+    def retrieve_by_id(self, id):
+        self.requested.append(("get", id))
+        return FakeResponse(200, {self.key: {"id": id, "name": f"{self.key}-{id}"}})
+
+    def list_all(self, page=0, per_page=0):
+        self.requested.append(("list", page))
+        return FakeResponse(200, {f"{self.key}s": [], "meta": {"total": 5000}, "links": {}})
+
+
+class FakeVolumes(FakeApi):
+    def __init__(self):
+        FakeApi.__init__(self, "volume")
+        self.retrieve_volume_by_id = self.retrieve_by_id
+        self.list_all_volumes = self.list_all
+
+
+class FakeSnapshots(FakeApi):
+    def __init__(self):
+        FakeApi.__init__(self, "snapshot")
+        self.retrieve_snapshot_by_id = self.retrieve_by_id
+        self.list_all_snapshots = self.list_all
+        self.list_all_droplet_snapshots = self.list_all
+        self.list_all_volume_snapshots = self.list_all
+
+
+class FakeDroplets:
+    def retrieve_droplet_by_id(self, id):
+        return FakeResponse(
+            200,
+            {"droplet": {"id": id, "status": "active", "volume_ids": ["v1", "v2"], "snapshot_ids": [11, 12, 13]}},
+        )
+
+
+@pytest.fixture
+def droplet(monkeypatch):
+    # A fresh process, no inventory size known yet.
+    monkeypatch.setattr(bulkfetch, "bulk_fetch_cost_model", BulkFetchCostModel())
+    droplet = Droplet(status="active")
+    droplet.attributes.id = 1
+    droplet.dropletapi = FakeDroplets()
+    droplet.volume_manager.volumeapi = FakeVolumes()
+    droplet.snapshot_manager.snapshotapi = FakeSnapshots()
+    return droplet
+
+
+def test_associated_volumes_are_fetched_with_gets_only(droplet):
+    volumes = droplet.retrieve_associated_volumes()
+    assert [volume.attributes.id for volume in volumes] == ["v1", "v2"]
+    assert sorted(droplet.volume_manager.volumeapi.requested) == [("get", "v1"), ("get", "v2")]
+
+
+def test_associated_snapshots_are_fetched_with_gets_only(droplet):
+    snapshots = droplet.retrieve_associated_volume_snapshots()
+    assert [snapshot.attributes.id for snapshot in snapshots] == [11, 12, 13]
+    assert sorted(droplet.snapshot_manager.snapshotapi.requested) == [("get", 11), ("get", 12), ("get", 13)]
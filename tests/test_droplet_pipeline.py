@@ -0,0 +1,132 @@
+import pytest
+
+from cloudapi_digitalocean.common.cloudapiexceptions import (
+    ErrorActionTimeout,
+    ErrorDropletResizeDiskError,
+    ErrorPipelineStepNotSupported,
+)
+from cloudapi_digitalocean.digitaloceanapi.actions import Actions
+from cloudapi_digitalocean.digitaloceanapi.droplets import Droplets
+from cloudapi_digitalocean.digitaloceanapi.sizes import Sizes
+from cloudapi_digitalocean.digitaloceanobjects.droplet import Droplet
+from cloudapi_digitalocean.digitaloceanobjects.dropletpipeline import (
+    DropletActionPipeline,
+    RollingOperation,
+)
+
+from fakeapi import FakeResponse, action_body
+
+SIZES = {
+    "sizes": [
+        {"slug": "s-1vcpu-1gb", "disk": 25, "memory": 1024, "vcpus": 1},
+        {"slug": "s-2vcpu-2gb", "disk": 60, "memory": 2048, "vcpus": 2},
+    ]
+}
+
+
+@pytest.fixture
+def api(monkeypatch):
+    calls = []
+    monkeypatch.setattr(
+        Sizes, "list_all_sizes", lambda self, *args, **kwargs: calls.append("sizes") or FakeResponse(200, SIZES)
+    )
+    for method_name in ["resize_droplet", "rename_droplet", "poweroff_droplet"]:
+        monkeypatch.setattr(
+            Droplets,
+            method_name,
+            lambda self, *args, method_name=method_name, **kwargs: calls.append(method_name)
+            or FakeResponse(422, {"message": "not expected"}),
+        )
+    return calls
+
+
+def droplet_with_disk(id, disk):
+    # An active droplet, so no status polling thread is started.
+    droplet = Droplet(status="active")
+    droplet.attributes.id = id
+    droplet.attributes.disk = disk
+    return droplet
+
+
+def test_missing_step_argument_fails_when_built(api):
+    with pytest.raises(ErrorPipelineStepNotSupported):
+        DropletActionPipeline(droplet_with_disk(1, 25), ["power_off", ("rename", {})])
+    with pytest.raises(ErrorPipelineStepNotSupported):
+        DropletActionPipeline(None, [("resize", {"disk_resize": True})])
+    assert api == []
+
+
+def test_resize_to_smaller_disk_fails_before_any_request(api):
+    droplets = [droplet_with_disk(1, 25), droplet_with_disk(2, 60)]
+    with pytest.raises(ErrorDropletResizeDiskError):
+        RollingOperation(droplets, ["power_off", ("resize", {"size": "s-1vcpu-1gb"})])
+    # The target size was looked up once, and no droplet was touched.
+    assert api == ["sizes"]
+
+
+def test_resize_to_same_or_bigger_disk_builds(api):
+    DropletActionPipeline(droplet_with_disk(1, 25), [("resize", {"size": "s-2vcpu-2gb", "disk_resize": True})])
+    assert api == ["sizes"]
+
+
+class FakeStepApi:
+    """
+    Droplet actions answer with action 930000 + n for the n-th request, the poller sees the status set for it.
+    """
+
+    def __init__(self, monkeypatch, responses=None):
+        self.submitted = []
+        self.statuses = {}
+        self.responses = responses or {}
+
+        def submit(method_name):
+            def request(api, *args, **kwargs):
+                self.submitted.append(method_name)
+                if method_name in self.responses:
+                    return self.responses[method_name]
+                return FakeResponse(201, action_body(930000 + len(self.submitted), type=method_name))
+
+            return request
+
+        for method_name in ["poweroff_droplet", "resize_droplet", "poweron_droplet"]:
+            monkeypatch.setattr(Droplets, method_name, submit(method_name))
+
+        def retrieve_existing_action(api, action_id):
+            status = self.statuses.get(action_id, "completed")
+            if status == "gone":
+                return FakeResponse(404, {"message": "not found"})
+            return FakeResponse(200, action_body(action_id, status=status))
+
+        monkeypatch.setattr(Actions, "retrieve_existing_action", retrieve_existing_action)
+
+
+def test_unconfirmed_step_fails_the_pipeline(monkeypatch):
+    api = FakeStepApi(monkeypatch)
+    # The poller can't confirm the power off, the resize must not follow.
+    api.statuses[930001] = "gone"
+    pipeline = DropletActionPipeline(droplet_with_disk(1, 25), ["power_off", "power_on"]).start().wait(timeout=30)
+    assert pipeline.status == "errored"
+    assert api.submitted == ["poweroff_droplet"]
+    assert "in-progress" in pipeline.results[0].error
+
+
+def test_bad_step_response_on_the_callback_thread_finishes_the_pipeline(monkeypatch):
+    # The second step's response has no action, decoding it fails on the poller callback thread.
+    api = FakeStepApi(monkeypatch, responses={"poweron_droplet": FakeResponse(201, {"unexpected": True})})
+    pipeline = DropletActionPipeline(droplet_with_disk(1, 25), ["power_off", "power_on"]).start().wait(timeout=30)
+    assert pipeline.status == "errored"
+    assert api.submitted == ["poweroff_droplet", "poweron_droplet"]
+    assert not pipeline.results[1].error == None
+
+
+def test_wait_times_out(monkeypatch):
+    api = FakeStepApi(monkeypatch)
+    api.statuses[930001] = "in-progress"
+    pipeline = DropletActionPipeline(droplet_with_disk(1, 25), ["power_off"]).start()
+    try:
+        with pytest.raises(ErrorActionTimeout):
+            pipeline.wait(timeout=0.2)
+    finally:
+        # Let the poller finish with it.
+        api.statuses[930001] = "completed"
+        pipeline.wait(timeout=30)
@@ -0,0 +1,87 @@
+from cloudapi_digitalocean.digitaloceanapi.actions import Actions
+from cloudapi_digitalocean.digitaloceanobjects.droplet import Droplet
+
+from fakeapi import FakeResponse, action_body
+
+
+class FakeDropletSnapshots:
+    def __init__(self, snapshot_items):
+        self.snapshot_items = snapshot_items
+        self.requested = []
+
+    def list_snapshots_for_droplet(self, id, page=1, per_page=20):
+        self.requested.append(page)
+        return FakeResponse(
+            200,
+            {
+                "snapshots": self.snapshot_items[(page - 1) * per_page : page * per_page],
+                "meta": {"total": len(self.snapshot_items)},
+            },
+        )
+
+
+def snapshot(id, created_at, name=None):
+    return {"id": id, "name": name or f"snapshot-{id}", "created_at": created_at}
+
+
+def droplet_with_snapshots(snapshot_items):
+    # An active droplet, so no status polling thread is started.
+    droplet = Droplet(status="active")
+    droplet.attributes.id = 1
+    droplet.dropletapi = FakeDropletSnapshots(snapshot_items)
+    return droplet
+
+
+def test_snapshot_is_found_in_an_out_of_order_listing():
+    # Newest first, and the new snapshot in the middle of the first page.
+    snapshot_items = [
+        snapshot(5, "2024-01-05T00:00:00Z"),
+        snapshot(9, "2024-02-01T00:00:00Z", name="nightly"),
+        snapshot(4, "2024-01-04T00:00:00Z", name="nightly"),
+    ] + [snapshot(n, "2023-12-01T00:00:00Z") for n in range(10, 20)]
+    droplet = droplet_with_snapshots(snapshot_items)
+    found = droplet.find_snapshot_record("nightly", started_at="2024-02-01T00:00:00Z", per_page=3)
+    assert found["id"] == 9
+    # Found on the first page, nothing else is read.
+    assert droplet.dropletapi.requested == [1]
+
+
+def test_lookup_reads_at_most_the_page_cap():
+    snapshot_items = [snapshot(n, "2024-01-01T00:00:00Z") for n in range(30)]
+    snapshot_items[7]["name"] = "nightly"
+    droplet = droplet_with_snapshots(snapshot_items)
+    assert droplet.find_snapshot_record("nightly", per_page=3) == None
+    assert droplet.dropletapi.requested == [1, 10, 9, 8, 7]
+
+
+def test_records_without_timestamps_do_not_break_the_lookup():
+    snapshot_items = [
+        snapshot(1, None, name="nightly"),
+        snapshot(2, "2024-01-02T00:00:00Z", name="nightly"),
+        snapshot(3, None),
+    ]
+    droplet = droplet_with_snapshots(snapshot_items)
+    assert droplet.find_snapshot_record("nightly")["id"] == 2
+    assert droplet.find_snapshot_record("nightly", started_at="2024-01-01T00:00:00Z")["id"] == 2
+    assert droplet.find_snapshot_record("nightly", started_at="2024-03-01T00:00:00Z") == None
+
+
+def test_create_snapshot_finds_the_new_snapshot(monkeypatch):
+    monkeypatch.setattr(
+        Actions,
+        "retrieve_existing_action",
+        lambda self, action_id: FakeResponse(200, action_body(action_id, status="completed", type="snapshot")),
+    )
+    # The snapshot action started at 2024-01-01T00:00:00Z, an older snapshot has the same name.
+    snapshot_items = [
+        snapshot(8, "2024-02-08T00:00:00Z"),
+        snapshot(3, "2024-01-01T00:00:00Z", name="nightly"),
+        snapshot(1, "2023-12-01T00:00:00Z", name="nightly"),
+        snapshot(2, None),
+    ]
+    droplet = droplet_with_snapshots(snapshot_items)
+    droplet.dropletapi.create_snapshot_from_droplet = lambda id, name: FakeResponse(
+        201, action_body(920001, type="snapshot")
+    )
+
+    assert droplet.create_snapshot("nightly").attributes.id == 3
@@ -0,0 +1,79 @@
+import math
+
+import numpy
+
+from cloudapi_digitalocean.digitaloceanobjects.droplet import Droplet, DropletAttributes
+from cloudapi_digitalocean.digitaloceanobjects.inventorycolumns import droplet_columns
+from cloudapi_digitalocean.digitaloceanobjects.size import Size, SizeAttributes
+
+
+def droplet(id, size_slug, region="nyc3", tags=None):
+    # An active droplet, so no status polling thread is started.
+    droplet = Droplet(status="active")
+    droplet.attributes = DropletAttributes(
+        id=id,
+        size_slug=size_slug,
+        region={"slug": region},
+        status="active",
+        vcpus=1,
+        memory=1024,
+        disk=25,
+        tags=tags or [],
+    )
+    return droplet
+
+
+def size(slug, price_monthly, price_hourly):
+    size = Size()
+    size.attributes = SizeAttributes(slug=slug, price_monthly=price_monthly, price_hourly=price_hourly)
+    return size
+
+
+SIZES = [size("s-1vcpu-1gb", 5.0, 0.007), size("s-2vcpu-2gb", 15.0, 0.022)]
+
+
+def test_prices_are_joined_on_size_slug():
+    columns = droplet_columns(
+        [droplet(1, "s-1vcpu-1gb"), droplet(2, "s-2vcpu-2gb"), droplet(3, "s-1vcpu-1gb")],
+        SIZES,
+    )
+    assert columns.records["price_monthly"].tolist() == [5.0, 15.0, 5.0]
+    assert columns.records["price_hourly"].tolist() == [0.007, 0.022, 0.007]
+    assert columns.totals("price_monthly") == {"price_monthly": 25.0}
+    assert columns.group_totals("size_slug", "price_monthly") == {
+        "s-1vcpu-1gb": {"price_monthly": 10.0},
+        "s-2vcpu-2gb": {"price_monthly": 15.0},
+    }
+
+
+def test_a_size_missing_from_the_catalog_is_not_counted_as_free():
+    columns = droplet_columns(
+        [
+            droplet(1, "s-1vcpu-1gb", region="nyc3", tags=["web"]),
+            droplet(2, "gpu-h100x1-80gb", region="nyc3", tags=["ml"]),
+            droplet(3, "s-2vcpu-2gb", region="ams3", tags=["web"]),
+        ],
+        SIZES,
+    )
+
+    assert columns.missing("price_monthly").tolist() == [False, True, False]
+    assert math.isnan(columns.totals("price_monthly")["price_monthly"])
+
+    by_region = columns.group_totals("region", "price_monthly")
+    assert math.isnan(by_region["nyc3"]["price_monthly"])
+    assert by_region["ams3"]["price_monthly"] == 15.0
+
+    # Only the tags with an unpriced droplet lose their total.
+    by_tag = columns.group_totals("tags", "price_monthly")
+    assert by_tag["web"]["price_monthly"] == 20.0
+    assert math.isnan(by_tag["ml"]["price_monthly"])
+
+    # The priced rows can still be totalled on purpose.
+    priced = ~columns.missing("price_monthly")
+    assert columns.totals("price_monthly", where=priced) == {"price_monthly": 20.0}
+
+
+def test_prices_are_nan_without_a_size_catalog():
+    columns = droplet_columns([droplet(1, "s-1vcpu-1gb")])
+    assert numpy.isnan(columns.records["price_monthly"]).all()
+    assert columns.totals("vcpus") == {"vcpus": 1.0}
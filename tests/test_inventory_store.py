@@ -0,0 +1,108 @@
+import time
+
+import pytest
+
+from cloudapi_digitalocean.digitaloceanobjects import inventorystore
+from cloudapi_digitalocean.digitaloceanobjects.droplet import DropletManager
+from cloudapi_digitalocean.digitaloceanobjects.inventorystore import InventoryStore
+from cloudapi_digitalocean.digitaloceanobjects.size import SizeManager
+
+from fakeapi import FakeResponse
+
+
+class FakeDroplets:
+    def __init__(self, droplets):
+        self.droplets = droplets
+        self.listings = 0
+        self.deleted = []
+
+    def list_all_droplets(self, page=0, per_page=0):
+        self.listings = self.listings + 1
+        return FakeResponse(200, {"droplets": [dict(d) for d in self.droplets], "links": {}})
+
+    def delete_droplet_id(self, id):
+        self.deleted.append(id)
+        return FakeResponse(204)
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = InventoryStore(str(tmp_path / "inventory.sqlite"))
+    store.save("droplets", [{"id": 1, "name": "stale", "tags": ["web"]}])
+    yield store
+    store.wait_for_revalidation()
+    inventorystore.disable_inventory_store()
+
+
+def manager_with(droplets):
+    manager = DropletManager()
+    manager.dropletapi = FakeDroplets(droplets)
+    return manager
+
+
+def test_env_variable_alone_does_not_enable_the_store(store, monkeypatch):
+    monkeypatch.setenv("DIGITALOCEAN_INVENTORY_STORE", store.path)
+    manager = manager_with([{"id": 2, "name": "live", "tags": []}])
+    droplets = manager.retrieve_all_droplets()
+    assert [d.attributes.name for d in droplets] == ["live"]
+
+
+def test_store_is_opt_in_per_call_and_revalidation_is_throttled(store):
+    manager = manager_with([{"id": 2, "name": "live", "tags": []}])
+
+    droplets = manager.retrieve_all_droplets(store=store)
+    assert [d.attributes.name for d in droplets] == ["stale"]
+    # The stored copy was just saved, younger than revalidate_interval, so no re-list.
+    store.wait_for_revalidation()
+    assert manager.dropletapi.listings == 0
+
+    store.save("droplets", [{"id": 1, "name": "stale", "tags": ["web"]}], synced_at=time.time() - 120)
+    manager.retrieve_all_droplets(store=store)
+    manager.retrieve_all_droplets(store=store)
+    store.wait_for_revalidation()
+    assert manager.dropletapi.listings == 1
+    assert [d.attributes.name for d in manager.retrieve_all_droplets(store=store)] == ["live"]
+
+
+def test_store_true_needs_an_enabled_store():
+    with pytest.raises(Exception):
+        DropletManager().retrieve_all_droplets(store=True)
+
+
+def test_existence_limit_and_delete_paths_always_list_live(store):
+    inventorystore.enable_inventory_store(store.path)
+    manager = manager_with([{"id": 2, "name": "live", "tags": ["web"]}])
+
+    assert not manager.does_droplet_id_exist(1)
+    assert manager.does_droplet_id_exist(2)
+    manager.delete_droplets_with_any_tags(["web"])
+    assert manager.dropletapi.deleted == [2]
+
+
+class FakeSizes:
+    def __init__(self, responses):
+        self.responses = responses
+        self.listings = 0
+
+    def list_all_sizes(self):
+        self.listings = self.listings + 1
+        return self.responses.pop(0)
+
+
+def test_failed_size_listing_is_never_stored(tmp_path):
+    store = InventoryStore(str(tmp_path / "inventory.sqlite"))
+    manager = SizeManager()
+    manager.sizeapi = FakeSizes(
+        [
+            FakeResponse(500, {"message": "server error"}),
+            FakeResponse(200, {"sizes": [{"slug": "s-1vcpu-1gb", "price_monthly": 5.0}]}),
+        ]
+    )
+
+    assert manager.retrieve_sizes(store=store) == []
+    assert store.load("sizes")[0] is None
+
+    sizes = manager.retrieve_sizes(store=store)
+    assert [s.attributes.slug for s in sizes] == ["s-1vcpu-1gb"]
+    assert manager.sizeapi.listings == 2
+    store.wait_for_revalidation()
@@ -0,0 +1,34 @@
+import copy
+import pickle
+
+from cloudapi_digitalocean.digitaloceanobjects.droplet import (
+    DropletAttributes,
+    LazyDropletAttributes,
+)
+
+RECORD = {
+    "id": 7,
+    "name": "web-7",
+    "status": "active",
+    "region": {"slug": "nyc1"},
+    "tags": ["web"],
+    "networks": {"v4": [{"ip_address": "10.0.0.7", "type": "private"}]},
+}
+
+
+def test_lazy_attributes_read_like_eager_ones():
+    lazy = LazyDropletAttributes(copy.deepcopy(RECORD))
+    eager = DropletAttributes(**copy.deepcopy(RECORD))
+    assert lazy.name == "web-7"
+    assert lazy.volume_ids == []
+    assert lazy == eager
+    assert isinstance(lazy, DropletAttributes)
+
+
+def test_lazy_attributes_can_be_changed_and_pickled():
+    lazy = LazyDropletAttributes(copy.deepcopy(RECORD))
+    lazy.status = "off"
+    lazy.tags.append("db")
+    restored = pickle.loads(pickle.dumps(lazy))
+    assert restored.status == "off"
+    assert restored.tags == ["web", "db"]
@@ -0,0 +1,46 @@
+import pytest
+
+from cloudapi_digitalocean.common.payloadinterning import FrozenList
+from cloudapi_digitalocean.digitaloceanobjects.droplet import DropletManager
+
+from fakeapi import FakeResponse
+
+
+class FakeDroplets:
+    def list_all_droplets(self, page=0, per_page=0):
+        droplets = [
+            {
+                "id": n,
+                "name": f"web-{n}",
+                "status": "active",
+                "region": {"slug": "nyc1", "features": ["backups"]},
+                "tags": ["web"],
+            }
+            for n in range(3)
+        ]
+        return FakeResponse(200, {"droplets": droplets, "links": {}})
+
+
+@pytest.mark.parametrize("lazy", [False, True])
+def test_listing_attributes_are_mutable_by_default(lazy):
+    manager = DropletManager()
+    manager.dropletapi = FakeDroplets()
+    droplets = manager.retrieve_all_droplets(lazy=lazy)
+
+    droplets[0].attributes.tags.append("db")
+    droplets[0].attributes.region["slug"] = "ams3"
+    assert droplets[0].attributes.tags == ["web", "db"]
+    assert droplets[1].attributes.tags == ["web"]
+    assert droplets[1].attributes.region["slug"] == "nyc1"
+
+
+@pytest.mark.parametrize("lazy", [False, True])
+def test_shared_payloads_are_shared_and_read_only(lazy):
+    manager = DropletManager()
+    manager.dropletapi = FakeDroplets()
+    droplets = manager.retrieve_all_droplets(lazy=lazy, shared_payloads=True)
+
+    assert droplets[0].attributes.region is droplets[1].attributes.region
+    assert isinstance(droplets[0].attributes.tags, FrozenList)
+    with pytest.raises(TypeError):
+        droplets[0].attributes.tags.append("db")
@@ -0,0 +1,133 @@
+import pytest
+
+from cloudapi_digitalocean.common.cloudapiexceptions import (
+    ErrorAccountDropletLimitReached,
+    ErrorDropletNameContainsInvalidChars,
+)
+from cloudapi_digitalocean.digitaloceanapi.actions import Actions
+from cloudapi_digitalocean.digitaloceanobjects.droplet import DropletManager
+from cloudapi_digitalocean.digitaloceanobjects.reconciler import (
+    DropletGroupSpec,
+    Reconciler,
+)
+
+from fakeapi import FakeResponse, action_body
+
+
+class FakeAccountManager:
+    def __init__(self, droplet_limit):
+        self.limit = droplet_limit
+
+    def droplet_limit(self):
+        return self.limit
+
+
+def droplet_manager(droplet_limit=25, droplet_count=0):
+    manager = DropletManager()
+    manager.account_manager = FakeAccountManager(droplet_limit)
+    manager.retrieve_all_droplet_records = lambda: [{"id": n} for n in range(droplet_count)]
+    return manager
+
+
+def droplet(id, name, size_slug="s-1vcpu-1gb", status="active"):
+    return {"id": id, "name": name, "size_slug": size_slug, "status": status}
+
+
+def volume(id, name, droplet_ids, size_gigabytes=10):
+    return {
+        "id": id,
+        "name": name,
+        "droplet_ids": droplet_ids,
+        "size_gigabytes": size_gigabytes,
+        "region": {"slug": "nyc3"},
+    }
+
+
+def spec(**kwargs):
+    arguments = dict(name="web", count=1, region="nyc3", size="s-1vcpu-1gb", image="ubuntu-20-04-x64")
+    arguments.update(kwargs)
+    return DropletGroupSpec(**arguments)
+
+
+def test_surplus_volume_attached_to_a_kept_droplet_is_left_alone():
+    inventory = {
+        "droplets": [droplet(1, "web-1"), droplet(2, "web-2")],
+        # web-2-volume was moved to web-1 by hand, web-1-volume is where it belongs.
+        "volumes": [volume("v1", "web-1-volume", [1]), volume("v2", "web-2-volume", [1])],
+        "floating_ips": [],
+    }
+    plan = Reconciler(droplet_manager()).plan([spec(volume_size_gigabytes=10)], inventory)
+    assert sorted(plan.steps) == ["droplet:web-2:delete"]
+    assert plan.steps["droplet:web-2:delete"].depends_on == []
+
+
+def test_surplus_volume_is_detached_before_it_is_deleted():
+    inventory = {
+        "droplets": [droplet(1, "web-1"), droplet(2, "web-2")],
+        "volumes": [volume("v1", "web-1-volume", [1]), volume("v2", "web-2-volume", [2])],
+        "floating_ips": [],
+    }
+    plan = Reconciler(droplet_manager()).plan([spec(volume_size_gigabytes=10)], inventory)
+    assert plan.steps["volume:v2"].depends_on == ["volume:v2:detach"]
+    assert plan.steps["droplet:web-2:delete"].depends_on == ["volume:v2:detach"]
+
+
+@pytest.mark.parametrize(
+    "status, expected",
+    [
+        ("active", ["droplet:web-1:power_off", "droplet:web-1:resize", "droplet:web-1:power_on"]),
+        ("off", ["droplet:web-1:resize"]),
+    ],
+)
+def test_resize_only_powers_on_droplets_that_were_active(status, expected):
+    inventory = {"droplets": [droplet(1, "web-1", status=status)], "volumes": [], "floating_ips": []}
+    plan = Reconciler(droplet_manager()).plan([spec(size="s-2vcpu-2gb")], inventory)
+    assert list(plan.steps) == expected
+
+
+def test_new_droplet_names_are_validated():
+    inventory = {"droplets": [], "volumes": [], "floating_ips": []}
+    with pytest.raises(ErrorDropletNameContainsInvalidChars):
+        Reconciler(droplet_manager()).plan([spec(name="web_tier")], inventory)
+
+
+def test_new_droplets_must_fit_the_droplet_limit():
+    inventory = {"droplets": [droplet(1, "web-1")], "volumes": [], "floating_ips": []}
+    reconciler = Reconciler(droplet_manager(droplet_limit=3, droplet_count=1))
+    assert len(reconciler.plan([spec(count=3)], inventory).steps) == 2
+    with pytest.raises(ErrorAccountDropletLimitReached):
+        reconciler.plan([spec(count=4)], inventory)
+
+
+def test_leftover_volume_is_grown_before_the_new_droplet_uses_it():
+    inventory = {
+        "droplets": [],
+        "volumes": [volume("v1", "web-1-volume", [], size_gigabytes=5)],
+        "floating_ips": [],
+    }
+    plan = Reconciler(droplet_manager()).plan([spec(volume_size_gigabytes=10)], inventory)
+    assert sorted(plan.steps) == ["droplet:web-1", "volume:v1:resize"]
+    assert plan.steps["droplet:web-1"].depends_on == ["volume:v1:resize"]
+
+
+class FakeCreates:
+    def create_new_droplet(self, **kwargs):
+        return FakeResponse(
+            202,
+            {"droplet": {"id": 5001, "name": kwargs["name"]}, "links": {"actions": [{"id": 960001}]}},
+        )
+
+
+def test_failed_create_action_fails_the_step(monkeypatch):
+    monkeypatch.setattr(
+        Actions,
+        "retrieve_existing_action",
+        lambda actions, action_id: FakeResponse(200, action_body(action_id, status="errored", type="create")),
+    )
+    reconciler = Reconciler(droplet_manager())
+    reconciler.dropletapi = FakeCreates()
+    inventory = {"droplets": [], "volumes": [], "floating_ips": []}
+    plan = reconciler.plan([spec(floating_ip=True)], inventory).execute()
+    assert plan.steps["droplet:web-1"].status == "failed"
+    assert "960001" in plan.steps["droplet:web-1"].error
+    assert plan.steps["floating_ip:web-1"].status == "skipped"
@@ -0,0 +1,128 @@
+import threading
+import time
+
+import pytest
+
+from cloudapi_digitalocean.common.cloudapiexceptions import ErrorActionTimeout
+from cloudapi_digitalocean.digitaloceanapi.actions import Actions
+from cloudapi_digitalocean.digitaloceanobjects.action import ActionManager
+from cloudapi_digitalocean.digitaloceanobjects.resourceplan import ResourcePlan, action_step
+from cloudapi_digitalocean.digitaloceanobjects.teardown import TeardownPlanner
+
+from fakeapi import FakeResponse, action_body
+
+
+def test_unknown_dependency_is_rejected():
+    plan = ResourcePlan()
+    plan.add("detach", "Detach volume", lambda: None)
+    with pytest.raises(KeyError):
+        plan.add("delete", "Delete volume", lambda: None, depends_on=["dettach"])
+    assert list(plan.steps) == ["detach"]
+
+
+def test_steps_do_not_share_a_default_dependency_list():
+    plan = ResourcePlan()
+    first = plan.add("first", "First", lambda: None)
+    second = plan.add("second", "Second", lambda: None)
+    first.depends_on.append("second")
+    assert second.depends_on == []
+
+
+def test_dependencies_run_first_and_failures_skip_dependents():
+    plan = ResourcePlan()
+    ran = []
+    lock = threading.Lock()
+
+    def step(name, result=None):
+        def run():
+            with lock:
+                ran.append(name)
+            return result
+
+        return run
+
+    plan.add("detach", "Detach volume", step("detach"))
+    plan.add("delete_volume", "Delete volume", step("delete_volume"), depends_on=["detach"])
+    plan.add("unassign", "Unassign floating ip", step("unassign", False))
+    plan.add("delete_ip", "Delete floating ip", step("delete_ip"), depends_on=["unassign"])
+    plan.add("delete_droplet", "Delete droplet", step("delete_droplet"), depends_on=["detach", "unassign"])
+    plan.execute()
+
+    assert ran.index("detach") < ran.index("delete_volume")
+    assert not "delete_ip" in ran and not "delete_droplet" in ran
+    assert plan.steps["delete_volume"].status == "completed"
+    assert plan.steps["unassign"].status == "failed"
+    assert plan.steps["delete_ip"].status == "skipped"
+    assert plan.steps["delete_droplet"].status == "skipped"
+    assert [len(level) for level in plan.levels()] == [2, 3]
+
+
+def test_dry_run_runs_nothing():
+    plan = ResourcePlan()
+    plan.add("only", "Only step", lambda: pytest.fail("ran in a dry run"))
+    plan.execute(dry_run=True)
+    assert plan.steps["only"].status == "planned"
+
+
+def test_action_step_fails_on_an_errored_action(monkeypatch):
+    monkeypatch.setattr(
+        Actions,
+        "retrieve_existing_action",
+        lambda actions, action_id: FakeResponse(200, action_body(action_id, status="errored")),
+    )
+    plan = ResourcePlan()
+    plan.add("detach", "Detach volume", action_step(lambda: FakeResponse(202, action_body(950001))))
+    plan.add("gone", "Detach a volume already gone", action_step(lambda: FakeResponse(404)))
+    plan.execute()
+    assert plan.steps["detach"].status == "failed"
+    assert "950001" in plan.steps["detach"].error
+    assert plan.steps["gone"].status == "completed"
+
+
+def test_action_step_is_bounded_by_the_wait_timeout(monkeypatch):
+    statuses = {950002: "in-progress"}
+    monkeypatch.setattr(
+        Actions,
+        "retrieve_existing_action",
+        lambda actions, action_id: FakeResponse(200, action_body(action_id, status=statuses[action_id])),
+    )
+    monkeypatch.setattr(ActionManager, "wait_timeout", 0.2)
+    plan = ResourcePlan()
+    plan.add("detach", "Detach volume", action_step(lambda: FakeResponse(202, action_body(950002))))
+    plan.execute()
+    assert plan.steps["detach"].status == "failed"
+    assert "didn't finish" in plan.steps["detach"].error
+    # Let the poller finish with it.
+    statuses[950002] = "completed"
+    deadline = time.monotonic() + 30
+    while any(action.attributes.id == 950002 for action in ActionManager.poller.pending()):
+        assert time.monotonic() < deadline
+        time.sleep(0.1)
+
+
+class FakeDestroyStatus:
+    def check_destroy_with_associated_resources_status(self, droplet_id):
+        return FakeResponse(
+            200,
+            {
+                "droplet": {"id": droplet_id, "name": "web-1", "destroyed_at": None},
+                "resources": {
+                    "volumes": [
+                        {"id": "v1", "name": "web-1-data", "destroyed_at": "2024-01-01T00:00:00Z"},
+                        {"id": "v2", "name": "web-1-logs", "destroyed_at": None},
+                    ],
+                },
+                "completed_at": None,
+            },
+        )
+
+
+def test_wait_for_destroy_reports_what_remains():
+    planner = TeardownPlanner()
+    planner.dropletapi = FakeDestroyStatus()
+    planner.status_interval = 0.01
+    with pytest.raises(ErrorActionTimeout) as raised:
+        planner.wait_for_destroy(1, timeout=0.1)
+    assert "droplet web-1" in str(raised.value)
+    assert "volumes web-1-logs" in str(raised.value)
+    assert not "web-1-data" in str(raised.value)
@@ -0,0 +1,122 @@
+import json
+
+import pytest
+
+from cloudapi_digitalocean.common.cloudapiexceptions import ErrorSnapshotTransferNotSupported
+from cloudapi_digitalocean.digitaloceanapi.actions import Actions
+from cloudapi_digitalocean.digitaloceanapi.images import Images
+from cloudapi_digitalocean.digitaloceanobjects.snapshot import (
+    Snapshot,
+    SnapshotAttributes,
+    SnapshotManager,
+)
+
+from fakeapi import FakeResponse, action_body
+
+
+class RecordedRequests:
+    def __init__(self, response=None):
+        self.requests = []
+        self.response = response or FakeResponse(200, {})
+
+    def __call__(self, method):
+        def request(endpoint, headers=None, **kwargs):
+            self.requests.append((method, endpoint, kwargs))
+            return self.response
+
+        return request
+
+
+def test_transfer_image_posts_a_transfer_action():
+    images = Images()
+    recorded = RecordedRequests()
+    images.post_request = recorded("post")
+    images.transfer_image(7001, "ams3")
+    method, endpoint, kwargs = recorded.requests[0]
+    assert (method, endpoint) == ("post", "/v2/images/7001/actions")
+    assert json.loads(kwargs["data"]) == {"type": "transfer", "region": "ams3"}
+
+
+def test_image_listings_and_updates():
+    images = Images()
+    recorded = RecordedRequests()
+    images.get_request = recorded("get")
+    images.put_request = recorded("put")
+    images.list_all_private_images(page=2, per_page=50)
+    images.update_image(7001, name="base")
+    assert recorded.requests[0] == ("get", "/v2/images", {"params": {"page": 2, "per_page": 50, "private": "true"}})
+    method, endpoint, kwargs = recorded.requests[1]
+    assert (method, endpoint) == ("put", "/v2/images/7001")
+    assert json.loads(kwargs["data"]) == {"name": "base"}
+
+
+class FakeTransfers:
+    """
+    Transfers answer with action 940000 + n for the n-th region, the poller sees the status set for it.
+    """
+
+    def __init__(self, monkeypatch, refused=()):
+        self.regions = []
+        self.statuses = {}
+        self.refused = refused
+
+        def transfer_image(images, id, region):
+            if region in self.refused:
+                return FakeResponse(422, {"message": "region unavailable"})
+            self.regions.append(region)
+            return FakeResponse(201, action_body(940000 + len(self.regions), type="transfer"))
+
+        monkeypatch.setattr(Images, "transfer_image", transfer_image)
+        monkeypatch.setattr(
+            Actions,
+            "retrieve_existing_action",
+            lambda actions, action_id: FakeResponse(
+                200, action_body(action_id, status=self.statuses.get(action_id, "completed"))
+            ),
+        )
+
+
+def snapshot(resource_type="droplet", regions=("nyc1",)):
+    newsnapshot = Snapshot()
+    newsnapshot.attributes = SnapshotAttributes(id="7001", regions=list(regions), resource_type=resource_type)
+    return newsnapshot
+
+
+def test_replicate_reports_each_region(monkeypatch):
+    transfers = FakeTransfers(monkeypatch, refused=["sgp1"])
+    transfers.statuses[940002] = "errored"
+    copied = snapshot()
+
+    replication = SnapshotManager().replicate(copied, ["nyc1", "ams3", "fra1", "sgp1", "ams3"])
+
+    assert [(result.region, result.status) for result in replication.results] == [
+        ("nyc1", "already-present"),
+        ("ams3", "completed"),
+        ("fra1", "errored"),
+        ("sgp1", "failed"),
+    ]
+    assert not replication.ok
+    assert copied.attributes.regions == ["nyc1", "ams3"]
+    assert not replication.results[1].seconds == None
+
+
+def test_replicate_times_out(monkeypatch):
+    transfers = FakeTransfers(monkeypatch)
+    transfers.statuses[940001] = "in-progress"
+    copied = snapshot()
+    try:
+        replication = SnapshotManager().replicate(copied, ["ams3"], timeout=0.2)
+        assert replication.results[0].status == "failed"
+        assert "didn't finish" in replication.results[0].error
+        assert copied.attributes.regions == ["nyc1"]
+    finally:
+        # Let the poller finish with it.
+        transfers.statuses[940001] = "completed"
+        replication.results[0].action.finished.wait(30)
+
+
+def test_volume_snapshots_are_not_transferred(monkeypatch):
+    transfers = FakeTransfers(monkeypatch)
+    with pytest.raises(ErrorSnapshotTransferNotSupported):
+        SnapshotManager().replicate(snapshot(resource_type="volume"), ["ams3"])
+    assert transfers.regions == []
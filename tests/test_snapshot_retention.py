@@ -0,0 +1,160 @@
+import pytest
+
+from cloudapi_digitalocean.digitaloceanobjects.bulkfetch import bulk_fetch_cost_model
+from cloudapi_digitalocean.digitaloceanobjects.snapshot import SnapshotManager
+from cloudapi_digitalocean.digitaloceanobjects.snapshotretention import (
+    SnapshotRetentionPolicy,
+    select_snapshots_to_keep,
+)
+
+from fakeapi import FakeResponse
+
+
+def snapshot(id, resource_id, created_at, tags=(), resource_type="droplet", size_gigabytes=1.0):
+    return {
+        "id": id,
+        "name": f"snapshot-{id}",
+        "resource_id": resource_id,
+        "resource_type": resource_type,
+        "created_at": created_at,
+        "tags": list(tags),
+        "size_gigabytes": size_gigabytes,
+    }
+
+
+def kept(records, policy):
+    in_scope, reasons = select_snapshots_to_keep(records, policy)
+    return sorted(reasons)
+
+
+def test_keep_last_is_per_resource():
+    records = [
+        snapshot(1, 100, "2024-01-01T00:00:00Z"),
+        snapshot(2, 100, "2024-01-02T00:00:00Z"),
+        snapshot(3, 200, "2024-01-01T00:00:00Z"),
+    ]
+    assert kept(records, SnapshotRetentionPolicy(keep_last=1)) == ["2", "3"]
+
+
+def test_keep_daily_keeps_the_newest_of_each_day():
+    records = [
+        snapshot(1, 100, "2024-01-01T01:00:00Z"),
+        snapshot(2, 100, "2024-01-01T23:00:00Z"),
+        snapshot(3, 100, "2024-01-02T01:00:00Z"),
+        snapshot(4, 100, "2023-12-25T01:00:00Z"),
+    ]
+    assert kept(records, SnapshotRetentionPolicy(keep_daily=2)) == ["2", "3"]
+
+
+def test_untagged_snapshots_are_grouped_by_resource():
+    records = [
+        snapshot(1, 100, "2024-01-01T00:00:00Z", tags=["nightly"]),
+        snapshot(2, 100, "2024-01-02T00:00:00Z", tags=["nightly"]),
+        snapshot(3, 100, "2024-01-01T00:00:00Z"),
+        snapshot(4, 100, "2024-01-02T00:00:00Z"),
+        snapshot(5, 200, "2024-01-01T00:00:00Z"),
+        snapshot(6, 300, "2024-01-03T00:00:00Z", resource_type="volume"),
+    ]
+    # Untagged, droplet 200 and volume 300 each keep their own newest snapshot.
+    assert kept(records, SnapshotRetentionPolicy(keep_last=1, group_by="tag")) == ["2", "4", "5", "6"]
+
+
+def test_policy_that_keeps_nothing_is_refused():
+    with pytest.raises(ValueError):
+        select_snapshots_to_keep([], SnapshotRetentionPolicy())
+
+
+class FakeSnapshots:
+    def __init__(self, pages, delete_status=None):
+        self.pages = pages
+        self.delete_status = delete_status or {}
+        self.deleted = []
+
+    def list_all_snapshots(self, page=1, per_page=200):
+        links = {"pages": {"next": "more"}} if page < len(self.pages) else {}
+        return FakeResponse(200, {"snapshots": self.pages[page - 1], "links": links})
+
+    list_all_droplet_snapshots = list_all_snapshots
+    list_all_volume_snapshots = list_all_snapshots
+
+    def delete_snapshot_id(self, id):
+        self.deleted.append(id)
+        return FakeResponse(self.delete_status.get(id, 204))
+
+
+def test_apply_retention_deletes_the_rest_oldest_first(monkeypatch):
+    monkeypatch.setattr(bulk_fetch_cost_model, "rate_limit_remaining", None)
+    manager = SnapshotManager()
+    manager.snapshotapi = FakeSnapshots(
+        [
+            [snapshot(1, 100, "2024-01-01T00:00:00Z"), snapshot(2, 100, "2024-01-02T00:00:00Z")],
+            [snapshot(3, 100, "2024-01-03T00:00:00Z"), snapshot(4, 100, "2024-01-04T00:00:00Z")],
+        ],
+        # Someone else already deleted 2, and 1 can't be deleted right now.
+        delete_status={2: 404, 1: 500},
+    )
+
+    dry_run = manager.apply_retention(SnapshotRetentionPolicy(keep_last=2), dry_run=True)
+    assert manager.snapshotapi.deleted == []
+    assert [record["id"] for record in dry_run.delete] == [1, 2]
+    assert dry_run.gigabytes_reclaimed == 2.0
+
+    report = manager.apply_retention(SnapshotRetentionPolicy(keep_last=2))
+    assert [record["id"] for record in report.keep] == [4, 3]
+    assert [record["id"] for record in report.deleted] == [2]
+    assert list(report.errors) == ["1"]
+
+
+def test_keep_weekly_and_reasons_combine():
+    records = [
+        snapshot(1, 100, "2024-01-01T00:00:00Z"),  # Monday, ISO week 1
+        snapshot(2, 100, "2024-01-07T00:00:00Z"),  # Sunday, ISO week 1
+        snapshot(3, 100, "2024-01-08T00:00:00Z"),  # ISO week 2
+        snapshot(4, 100, "2023-12-20T00:00:00Z"),
+    ]
+    in_scope, reasons = select_snapshots_to_keep(records, SnapshotRetentionPolicy(keep_last=1, keep_weekly=2))
+    assert reasons == {"3": ["last", "weekly"], "2": ["weekly"]}
+
+
+def test_tag_name_leaves_other_snapshots_alone():
+    records = [
+        snapshot(1, 100, "2024-01-01T00:00:00Z", tags=["nightly"]),
+        snapshot(2, 100, "2024-01-02T00:00:00Z", tags=["nightly"]),
+        snapshot(3, 100, "2023-01-01T00:00:00Z"),
+    ]
+    in_scope, reasons = select_snapshots_to_keep(records, SnapshotRetentionPolicy(keep_last=1, tag_name="nightly"))
+    assert [record["id"] for record in in_scope] == [1, 2]
+    assert sorted(reasons) == ["2"]
+
+
+def six_daily_snapshots():
+    return FakeSnapshots([[snapshot(n, 100, f"2024-01-0{n}T00:00:00Z") for n in range(1, 7)]])
+
+
+def test_apply_retention_stays_within_the_rate_budget(monkeypatch):
+    # Room for two deletes above the reserved budget.
+    monkeypatch.setattr(
+        bulk_fetch_cost_model, "rate_limit_remaining", bulk_fetch_cost_model.reserved_rate_budget + 2
+    )
+    manager = SnapshotManager()
+    manager.snapshotapi = six_daily_snapshots()
+
+    report = manager.apply_retention(SnapshotRetentionPolicy(keep_last=1))
+    # The oldest go first, the newest are deferred to a later run.
+    assert sorted(manager.snapshotapi.deleted) == [1, 2]
+    assert [record["id"] for record in report.deleted] == [1, 2]
+    assert [record["id"] for record in report.deferred] == [3, 4, 5]
+    assert [record["id"] for record in report.keep] == [6]
+
+
+def test_apply_retention_defers_everything_once_the_budget_is_spent(monkeypatch):
+    monkeypatch.setattr(
+        bulk_fetch_cost_model, "rate_limit_remaining", bulk_fetch_cost_model.reserved_rate_budget - 10
+    )
+    manager = SnapshotManager()
+    manager.snapshotapi = six_daily_snapshots()
+
+    report = manager.apply_retention(SnapshotRetentionPolicy(keep_last=1))
+    assert manager.snapshotapi.deleted == []
+    assert report.deleted == []
+    assert [record["id"] for record in report.deferred] == [1, 2, 3, 4, 5]
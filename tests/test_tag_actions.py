@@ -0,0 +1,62 @@
+import time
+
+import pytest
+
+from cloudapi_digitalocean.common.cloudapiexceptions import ErrorActionTimeout
+from cloudapi_digitalocean.digitaloceanapi.actions import Actions
+from cloudapi_digitalocean.digitaloceanapi.droplets import Droplets
+from cloudapi_digitalocean.digitaloceanobjects.action import ActionManager
+from cloudapi_digitalocean.digitaloceanobjects.droplet import DropletManager
+
+from fakeapi import FakeResponse, action_body
+
+
+class FakeTaggedDroplets:
+    """
+    Three droplets tagged "web", every POST the droplets api gets is recorded.
+    """
+
+    def __init__(self):
+        self.requests = []
+        self.status = "in-progress"
+
+    def post_request(self, endpoint, headers=None, params=None, data=None):
+        self.requests.append(("POST", endpoint, params, data))
+        return FakeResponse(
+            201,
+            {"actions": [action_body(id, type="power_off")["action"] for id in [901, 902, 903]]},
+        )
+
+    def retrieve_existing_action(self, action_id):
+        return FakeResponse(200, action_body(action_id, status=self.status, type="power_off"))
+
+
+@pytest.fixture
+def api(monkeypatch):
+    api = FakeTaggedDroplets()
+    monkeypatch.setattr(Droplets, "post_request", lambda self, *args, **kwargs: api.post_request(*args, **kwargs))
+    monkeypatch.setattr(Actions, "retrieve_existing_action", lambda self, action_id: api.retrieve_existing_action(action_id))
+    yield api
+    # Let the poller finish with the actions before the fakes are removed.
+    api.status = "completed"
+    while any(action.attributes.id in [901, 902, 903] for action in ActionManager.poller.pending()):
+        time.sleep(0.1)
+
+
+def test_one_request_acts_on_every_tagged_droplet(api):
+    api.status = "completed"
+    actions = DropletManager().poweroff_droplets_with_tag("web")
+
+    assert len(api.requests) == 1
+    method, endpoint, params, data = api.requests[0]
+    assert (method, params) == ("POST", {"tag_name": "web"})
+    assert endpoint.endswith("/droplets/actions")
+    assert '"type": "power_off"' in data
+    assert [a.attributes.id for a in actions] == [901, 902, 903]
+    assert all(a.attributes.status == "completed" for a in actions)
+
+
+def test_waiting_on_tag_actions_times_out(api):
+    with pytest.raises(ErrorActionTimeout):
+        DropletManager().perform_action_on_tag("web", "power_off", timeout=0.2)
+    assert len(api.requests) == 1
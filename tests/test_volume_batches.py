@@ -0,0 +1,84 @@
+import pytest
+
+from cloudapi_digitalocean.common.cloudapiexceptions import (
+    ErrorActionFailed,
+    ErrorVolumeDetachFailed,
+    ErrorVolumeResizeDirection,
+)
+from cloudapi_digitalocean.digitaloceanapi.actions import Actions
+from cloudapi_digitalocean.digitaloceanapi.volumes import Volumes
+from cloudapi_digitalocean.digitaloceanobjects.volume import Volume, VolumeManager
+
+from fakeapi import FakeResponse, action_body
+
+
+@pytest.fixture
+def actions(monkeypatch):
+    """
+    Action id -> the status the api reports for it, every other action completed.
+    """
+    statuses = {}
+    monkeypatch.setattr(
+        Actions,
+        "retrieve_existing_action",
+        lambda self, action_id: FakeResponse(
+            200, action_body(action_id, status=statuses.get(action_id, "completed"))
+        ),
+    )
+    return statuses
+
+
+def volume(id, size_gigabytes=10):
+    newvolume = Volume()
+    newvolume.attributes.id = id
+    newvolume.attributes.size_gigabytes = size_gigabytes
+    newvolume.attributes.region = {"slug": "nyc1"}
+    return newvolume
+
+
+def test_resize_failures_are_reported_per_volume(monkeypatch, actions):
+    # Each volume's resize action gets the id 900000 + its number.
+    monkeypatch.setattr(
+        Volumes,
+        "resize_volume",
+        lambda self, id, size_gigabytes, region: FakeResponse(
+            202, action_body(900000 + int(id[1:]), type="resize")
+        ),
+    )
+    actions[900002] = "errored"
+    volumes = [volume("v1"), volume("v2"), volume("v3")]
+
+    results = VolumeManager().resize_volumes({volumes[0]: 20, volumes[1]: 20, volumes[2]: 5})
+
+    assert results[0].error == None
+    assert results[0].action.attributes.status == "completed"
+    assert isinstance(results[1].error, ErrorActionFailed)
+    assert volumes[1].lastaction is results[1].action
+    assert isinstance(results[2].error, ErrorVolumeResizeDirection)
+    assert results[2].action == None
+
+
+def test_failed_detaches_raise_detach_failed(monkeypatch, actions):
+    attaches = []
+    # Each detach action gets the id 910000 + the droplet id.
+    monkeypatch.setattr(
+        Volumes,
+        "detach_volume_from_droplet",
+        lambda self, id, droplet_id: FakeResponse(202, action_body(910000 + droplet_id, type="detach"))
+        if droplet_id < 3
+        else FakeResponse(422, {"message": "droplet is locked"}),
+    )
+    monkeypatch.setattr(
+        Volumes,
+        "attach_volume_to_droplet",
+        lambda self, *args: attaches.append(args) or FakeResponse(202, action_body(919999)),
+    )
+    actions[910002] = "errored"
+    detached = volume("v1")
+
+    with pytest.raises(ErrorVolumeDetachFailed) as raised:
+        detached.detach_from_droplet_ids([1, 2, 3], attach_to=4)
+
+    assert "910002" in str(raised.value) and "droplet is locked" in str(raised.value)
+    assert detached.lastaction.attributes.id == 910002
+    assert attaches == []
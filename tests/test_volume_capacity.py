@@ -0,0 +1,46 @@
+import pytest
+
+from cloudapi_digitalocean.digitaloceanobjects.volume import VolumeManager
+
+from fakeapi import FakeResponse
+
+
+class FakeAccount:
+    def __init__(self, status_code=200):
+        self.status_code = status_code
+
+    def list_account_information(self):
+        if not self.status_code == 200:
+            return FakeResponse(self.status_code, {"id": "unauthorized", "message": "Unable to authenticate you"})
+        return FakeResponse(200, {"account": {"volume_limit": 100, "droplet_limit": 25}})
+
+
+class FakeVolumeCount:
+    def __init__(self, status_code=200):
+        self.status_code = status_code
+
+    def list_all_volumes(self, page=0, per_page=0):
+        if not self.status_code == 200:
+            return FakeResponse(self.status_code, {"id": "server_error", "message": "try again"})
+        return FakeResponse(200, {"volumes": [{"id": "v1"}], "meta": {"total": 42}})
+
+
+def volume_manager(account_status=200, volumes_status=200):
+    manager = VolumeManager()
+    manager.account_manager.accountapi = FakeAccount(account_status)
+    manager.volumeapi = FakeVolumeCount(volumes_status)
+    return manager
+
+
+def test_remaining_volume_capacity():
+    assert volume_manager().remaining_volume_capacity() == (100, 58)
+
+
+def test_failed_account_fetch_is_raised():
+    with pytest.raises(Exception, match="Could not retrieve the account, 401"):
+        volume_manager(account_status=401).remaining_volume_capacity()
+
+
+def test_failed_volume_count_is_raised():
+    with pytest.raises(Exception, match="Could not count volumes, 500"):
+        volume_manager(volumes_status=500).remaining_volume_capacity()
@@ -0,0 +1,66 @@
+import json
+
+import pytest
+
+from cloudapi_digitalocean.common.cloudapiexceptions import ErrorVolumeNotFound
+from cloudapi_digitalocean.digitaloceanapi.volumes import Volumes
+from cloudapi_digitalocean.digitaloceanobjects.volume import Volume
+
+from fakeapi import FakeResponse
+
+
+class RecordedVolumes:
+    """
+    Records every request the volumes api sends. Only volume "v1" exists.
+    """
+
+    def __init__(self):
+        self.requests = []
+
+    def request(self, method, endpoint, data=None):
+        self.requests.append((method, endpoint))
+        if not "/v1/" in endpoint + "/":
+            return FakeResponse(404, {"id": "not_found", "message": "The resource you requested could not be found."})
+        if method == "POST":
+            body = json.loads(data)
+            return FakeResponse(
+                201,
+                {"snapshot": {"id": "s1", "name": body["name"], "tags": body["tags"], "resource_id": "v1"}},
+            )
+        return FakeResponse(200, {"volume": {"id": "v1"}, "volumes": [{"id": "v1"}], "links": {}, "meta": {"total": 1}})
+
+
+@pytest.fixture
+def api(monkeypatch):
+    api = RecordedVolumes()
+    for method in ["get", "post", "put", "delete"]:
+        monkeypatch.setattr(
+            Volumes,
+            f"{method}_request",
+            lambda self, endpoint, method=method.upper(), **kwargs: api.request(method, endpoint, kwargs.get("data")),
+        )
+    return api
+
+
+def volume(id):
+    volume = Volume()
+    volume.attributes.id = id
+    volume.attributes.name = f"volume-{id}"
+    return volume
+
+
+def test_create_snapshot_sends_only_the_create_request(api):
+    snapshot = volume("v1").create_snapshot("nightly", tags=["backup"])
+
+    assert snapshot.attributes.id == "s1"
+    assert snapshot.attributes.tags == ["backup"]
+    # No existence pre-scan of the volume listing, before or after the create.
+    assert len(api.requests) == 1
+    assert api.requests[0][0] == "POST"
+    assert api.requests[0][1].endswith("/volumes/v1/snapshots")
+
+
+def test_snapshot_of_a_missing_volume_is_one_request(api):
+    with pytest.raises(ErrorVolumeNotFound):
+        volume("gone").create_snapshot("nightly")
+    assert [method for method, _ in api.requests] == ["POST"]